@@ -1,33 +1,58 @@
 # app_including_Activities (old).py
 # Grant Application Portal – Logframe + Workplan + Budget
+# pandas / openpyxl are only imported by the resume-import and Excel-export
+# paths below; `streamlit run app.py -- --profile-startup` prints phase timings
+# and `-- --instrument` adds the sidebar debug panel (see profiling.py).
+import profiling
+_profile = profiling.begin_run()
+
 import streamlit as st
-import pandas as pd
 from io import BytesIO
-from openpyxl import Workbook
-import uuid
 import base64
 import os
 import html, re
 from html import escape
 from datetime import datetime, date
 import hashlib
+import functools
+import logging
+import uuid
+
+from budget_table import CATEGORIES as BUDGET_CATEGORIES, BudgetTable
+from currency import REPORTING_CURRENCY, format_unconverted, load_rates
+from drafts import DraftStore, pending_records
+from formatting import strip_label_prefix, fmt_dd_mmm_yyyy, fmt_money
+from logframe_store import KINDS, LogframeStore, generate_id
+_profile.mark("imports")
 
 # ---------------- Page config ----------------
 st.set_page_config(page_title="Falcon Awards Application Portal", layout="wide")
 
 # ---------------- Logo (top-right PNG, simple) ----------------
-def add_logo(path="glide_logo.png", width_px=140):
+@st.cache_resource(show_spinner=False)
+def logo_data_uri(path="glide_logo.png", width_px=140):
+    """PNG data URI of the logo at 2x display width, built once per process (None if missing)."""
     if not os.path.exists(path):
+        return None
+    from PIL import Image
+
+    buf = BytesIO()
+    with Image.open(path) as im:
+        im.thumbnail((2 * width_px, 20 * width_px))
+        im.save(buf, "PNG", optimize=True)
+    return "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode("utf-8")
+
+def add_logo(path="glide_logo.png", width_px=140):
+    uri = logo_data_uri(path, width_px)
+    if uri is None:
         return
-    with open(path, "rb") as f:
-        b64 = base64.b64encode(f.read()).decode("utf-8")
     st.markdown(
         f"""
         <div style="
             position: fixed;
             top: 40px; right: 900px;
             width: {width_px}px; z-index: 1000;">
-            <img src="data:image/png;base64,{b64}" style="width:100%;height:auto;" alt="GLIDE Logo">
+            <img src="{uri}" style="width:100%;height:auto;" alt="GLIDE Logo">
         </div>
         """,
         unsafe_allow_html=True,
@@ -35,42 +60,123 @@ def add_logo(path="glide_logo.png", width_px=140):
 
 add_logo()
 
-# ---------------- Helpers & State ----------------
-def generate_id():
-    return str(uuid.uuid4())[:8]
+# ---------------- Draft autosave ----------------
+# Every change is journaled to a server-side draft (drafts.py) at the end of the
+# script run, or of the fragment run for edits made inside a fragment; a new
+# session for the same draft restores it. Signed-in users have one draft per
+# e-mail address, everyone else a random draft id kept in the page URL.
+# "Clear application" deletes the draft; stale drafts expire (drafts.prune).
+draft_store = DraftStore()
+
+def signed_in_email():
+    return st.user.get("email") if st.user.get("is_logged_in") else None
+
+def current_draft_id() -> str:
+    if "draft_id" not in st.session_state:
+        email = signed_in_email()
+        if email:
+            did = hashlib.sha256(email.strip().lower().encode("utf-8")).hexdigest()
+        else:
+            did = st.query_params.get("draft", "")
+            if not re.fullmatch(r"[0-9a-f]{32}", did):
+                did = uuid.uuid4().hex
+        st.session_state.draft_id = did
+    if not signed_in_email() and st.query_params.get("draft") != st.session_state.draft_id:
+        st.query_params["draft"] = st.session_state.draft_id
+    return st.session_state.draft_id
+
+def restore_draft():
+    """Load the saved draft (if any) into a fresh session's store / budget / id_info."""
+    try:
+        draft_store.prune_if_due()
+    except OSError:
+        logging.getLogger(__name__).exception("draft cleanup failed")
+    draft = draft_store.load(current_draft_id())
+    if draft is None:
+        return
+    for kind in KINDS:
+        lf.load(kind, draft["items"][kind])
+    lf.drain_changes()              # already saved
+    st.session_state.budget.load(draft["budget"])
+    st.session_state.budget.drain_changes()
+    if draft["id_info"] is not None:
+        st.session_state.id_info = draft["id_info"]
+    st.session_state._draft_saved = {"id_info": dict(draft["id_info"] or {})}
+    st.toast("Draft restored.")
+
+def clear_application():
+    """Delete the saved draft and start an empty application (the draft id is kept)."""
+    draft_store.delete(current_draft_id())
+    for key in list(st.session_state):
+        if key in ("lf", "budget", "id_info", "_draft_saved") or key.startswith(("id_", "edit_")):
+            del st.session_state[key]
+
+def autosave_draft():
+    """Append this run's changes to the draft journal."""
+    saved = st.session_state.setdefault("_draft_saved", {})
+    records = pending_records(lf, st.session_state.budget, st.session_state.get("id_info"), saved)
+    try:
+        draft_store.append(current_draft_id(), records)
+    except OSError:
+        logging.getLogger(__name__).exception("draft autosave failed")
+
+def autosaved(fragment_body):
+    """Wrap a fragment body so edits made in a fragment-only rerun are saved too."""
+    @functools.wraps(fragment_body)
+    def run(*args, **kwargs):
+        try:
+            return fragment_body(*args, **kwargs)
+        finally:
+            autosave_draft()
+    return run
 
+# ---------------- Helpers & State ----------------
 # app state
-for key in ["impacts", "outcomes", "outputs", "kpis", "workplan", "budget"]:
-    if key not in st.session_state:
-        st.session_state[key] = []
+new_session = "lf" not in st.session_state
+if new_session:
+    st.session_state.lf = LogframeStore()   # goals/outcomes/outputs/KPIs/activities
+lf = st.session_state.lf
+
+if "budget" not in st.session_state:
+    st.session_state.budget = BudgetTable()    # columnar budget lines (budget_table.py)
+
+if new_session:
+    restore_draft()
 
 # edit-state for inline editing
 for key in ["edit_goal", "edit_outcome", "edit_output", "edit_kpi", "edit_activity", "edit_budget_row"]:
     if key not in st.session_state:
         st.session_state[key] = None
 
-def _find_by_id(lst, _id):
-    for i, x in enumerate(lst):
-        if x.get("id") == _id:
-            return i
-    return None
-
 def delete_cascade(*, goal_id=None, outcome_id=None, output_id=None):
     """Delete an item and its children in the Goal->Outcome->Output->KPI hierarchy."""
-    if goal_id:
-        for oc in [o for o in st.session_state.outcomes if o.get("parent_id") == goal_id]:
-            delete_cascade(outcome_id=oc["id"])
-        st.session_state.impacts = [g for g in st.session_state.impacts if g["id"] != goal_id]
-
-    if outcome_id:
-        for out in [o for o in st.session_state.outputs if o.get("parent_id") == outcome_id]:
-            delete_cascade(output_id=out["id"])
-        st.session_state.outcomes = [o for o in st.session_state.outcomes if o["id"] != outcome_id]
-
-    if output_id:
-        # delete KPIs under output
-        st.session_state.kpis = [k for k in st.session_state.kpis if k.get("parent_id") != output_id]
-        st.session_state.outputs = [o for o in st.session_state.outputs if o["id"] != output_id]
+    for _id in (goal_id, outcome_id, output_id):
+        if _id:
+            lf.delete(_id)
+
+# ---------------- Fragment-scoped edits ----------------
+# Cards are drawn inside @st.fragment groups and their ✏️ / 💾 / ✖️ / 🗑️ buttons
+# act in on_click callbacks, so a click only reruns the card's own group instead
+# of the whole script. Callbacks that change more than their group (deleting a
+# Goal / Outcome / Output, budget totals) call st.rerun() for a full-app rerun.
+def set_state(key, value):
+    st.session_state[key] = value
+
+def save_item(item_id, list_name, edit_flag_key, wid, field_keys):
+    """on_click for 💾: copy the edit widgets' values (read from session_state) onto the item."""
+    if lf.get(item_id) is not None:
+        new_values = {f: st.session_state.get(f"{wid}_{f}") for f in field_keys}
+        # Defensive: prevent users from saving names that include labels
+        if isinstance(new_values.get("name"), str):
+            if list_name == "workplan":
+                new_values["name"] = strip_label_prefix(new_values["name"], "Activity")
+            elif list_name == "kpis":
+                new_values["name"] = strip_label_prefix(new_values["name"], "KPI")
+
+        lf.update(item_id, **{k: (v.strip() if isinstance(v, str) else v)
+                              for k, v in new_values.items()})
+    if st.session_state.get(edit_flag_key) == item_id:
+        st.session_state[edit_flag_key] = None
 
 def render_editable_item(
     *,
@@ -89,354 +195,67 @@ def render_editable_item(
     wid = f"{key_prefix}_{list_name}_{item['id']}"
 
     if st.session_state.get(edit_flag_key) == item["id"]:
-        new_values = {}
         if fields:
             for fkey, widget_func, label in fields:
-                new_values[fkey] = widget_func(label, value=item.get(fkey, ""), key=f"{wid}_{fkey}")
+                widget_func(label, value=item.get(fkey, ""), key=f"{wid}_{fkey}")
         else:
-            new_values["name"] = c1.text_input(default_label, value=item.get("name", ""), key=f"{wid}_name")
-
-        if c2.button("💾", key=f"{wid}_save"):
-            idx = _find_by_id(st.session_state[list_name], item["id"])
-            if idx is not None:
-                # Defensive: prevent users from saving names that include labels
-                if "name" in new_values:
-                    if list_name == "activities":
-                        new_values["name"] = strip_label_prefix(new_values["name"], "Activity")
-                    elif list_name == "kpis":
-                        new_values["name"] = strip_label_prefix(new_values["name"], "KPI")
-
-                for k, v in new_values.items():
-                    st.session_state[list_name][idx][k] = v.strip() if isinstance(v, str) else v
-            st.session_state[edit_flag_key] = None
-            st.rerun()
+            c1.text_input(default_label, value=item.get("name", ""), key=f"{wid}_name")
+        field_keys = [f[0] for f in fields] if fields else ["name"]
 
-        if c3.button("✖️", key=f"{wid}_cancel"):
-            st.session_state[edit_flag_key] = None
-            st.rerun()
+        c2.button("💾", key=f"{wid}_save", on_click=save_item,
+                  args=(item["id"], list_name, edit_flag_key, wid, field_keys))
+        c3.button("✖️", key=f"{wid}_cancel", on_click=set_state, args=(edit_flag_key, None))
     else:
         c1.markdown(view_md_func(item), unsafe_allow_html=True)
-        if c2.button("✏️", key=f"{wid}_edit"):
-            st.session_state[edit_flag_key] = item["id"]
-            st.rerun()
-        if c3.button("🗑️", key=f"{wid}_del"):
-            if on_delete:
-                on_delete()
+        c2.button("✏️", key=f"{wid}_edit", on_click=set_state, args=(edit_flag_key, item["id"]))
+        c3.button("🗑️", key=f"{wid}_del", on_click=on_delete)
 
-from datetime import date
-
-from datetime import date
+# Goal / Outcome cards: each one reruns on its own
+render_editable_item_fragment = st.fragment(profiling.fragment()(autosaved(render_editable_item)))
 
+@profiling.timed()
 def compute_numbers(include_activities: bool = False):
     """
     Preserve user/excel order.
     Outputs: numbered per Outcome in list order.
-    KPIs:    numbered per Output in list order (as stored in st.session_state.kpis).
+    KPIs:    numbered per Output in list order.
     Activities (if requested): numbered per Output in list order.
+    Labels come from the store's numbering cache, which is only refreshed for
+    the parts of the tree that changed since the last structural edit.
     """
-    out_num, kpi_num = {}, {}
-    outcomes = st.session_state.get("outcomes", [])
-    outputs  = st.session_state.get("outputs", [])
-    kpis     = st.session_state.get("kpis", [])
-
-    # Outputs numbered per Outcome (list order)
-    for oc in outcomes:
-        oc_outs = [o for o in outputs if o.get("parent_id") == oc["id"]]  # list order preserved
-        for i, out in enumerate(oc_outs, start=1):
-            out_num[out["id"]] = f"{i}"
-
-    # KPIs numbered per Output (list order)
-    for out_id, n in out_num.items():
-        p = 1
-        for k in kpis:                       # iterate as-is → preserves entry/import order
-            if k.get("parent_id") == out_id:
-                kpi_num[k["id"]] = f"{n}.{p}"
-                p += 1
-
+    nums = lf.numbering()
     if not include_activities:
-        return out_num, kpi_num
-
-    # Activities numbered per Output (list order)
-    act_num = {}
-    workplan = st.session_state.get("workplan", [])
-    for out_id, n in out_num.items():
-        q = 1
-        for a in workplan:
-            if a.get("output_id") == out_id:
-                act_num[a["id"]] = f"{n}.{q}"
-                q += 1
-    return out_num, kpi_num, act_num
-
-def strip_label_prefix(text: str, kind: str) -> str:
-    """
-    Remove labels like 'Activity 1.2 — ' or 'KPI 1.2.3: ' from a string.
-    Accepts separators '—', ':', or '-'.
-    """
-    if not isinstance(text, str):
-        return text
-    pat = rf'^\s*{kind}\s+\d+(?:\.\d+)*\s*[—:\-]\s*'
-    return re.sub(pat, '', text).strip()
-
-def parse_date_like(v):
-    """Return a datetime.date or None from common date formats or existing date/datetime/pandas types."""
-    if v is None:
-        return None
-
-    # Handle pandas NaT / NaN early
-    try:
-        import pandas as pd
-        if pd.isna(v):
-            return None
-        if isinstance(v, pd.Timestamp):
-            return v.date()
-    except Exception:
-        pass
-
-    if isinstance(v, datetime):
-        return v.date()
-    if isinstance(v, date):
-        return v
-
-    # Strings
-    s = str(v).strip()
-    if not s or s.lower() in ("none", "nan", "nat"):
-        return None
-
-    # Try a bunch of common formats (with and without HH:MM:SS)
-    fmts = (
-        "%Y-%m-%d",
-        "%Y-%m-%d %H:%M:%S",
-        "%d/%m/%Y",
-        "%d/%m/%Y %H:%M:%S",
-        "%m/%d/%Y",
-        "%m/%d/%Y %H:%M:%S",
-        "%Y/%m/%d",
-        "%Y/%m/%d %H:%M:%S",
-        "%d/%b/%Y",            # 03/Sep/2025
-        "%d/%b/%Y %H:%M:%S",
-        "%d-%b-%Y",            # 03-Sep-2025
-        "%d-%b-%Y %H:%M:%S",
-    )
-    for fmt in fmts:
-        try:
-            return datetime.strptime(s, fmt).date()
-        except ValueError:
-            continue
-
-    return None
-
-def fmt_dd_mmm_yyyy(v):
-    """Return 'DD/MMM/YYYY' (e.g., 03/Sep/2025) or '' if not set/parsable."""
-    try:
-        import pandas as pd
-        if pd.isna(v):                   # handles NaT / NaN
-            return ""
-        if isinstance(v, pd.Timestamp):  # valid timestamp -> format directly
-            return v.strftime("%d/%b/%Y")
-    except Exception:
-        pass
-
-    d = parse_date_like(v)
-    return d.strftime("%d/%b/%Y") if d else ""
-
-def fmt_money(val) -> str:
-    """Return number with thousands dot and 2 decimals, e.g., 1.234.567,89."""
-    try:
-        x = float(val)
-    except (TypeError, ValueError):
-        return ""
-    # First format in US style, then swap separators
-    s = f"{x:,.2f}"                  # -> 1,234,567.89
-    return s.replace(",", "␟").replace(".", ",").replace("␟", ".")
+        return nums.outputs, nums.kpis
+    return nums.outputs, nums.kpis, nums.activities
+
+# ---------------- Preview virtualization ----------------
+# Previews only build widgets for what is on screen: outputs are paged, their
+# KPIs / activities are rendered only while the output's expander is open, and
+# the read-only mode draws everything as one HTML block (no widgets at all).
+OUTPUTS_PER_PAGE = 20
+ITEMS_PER_PAGE = 25
+
+def paginate(items: list, per_page: int, key: str, label: str = "Page") -> list:
+    """Slice of `items` for the page chosen in a small pager (no pager for a single page)."""
+    n_pages = max(1, -(-len(items) // per_page))
+    if n_pages == 1:
+        return items
+    if st.session_state.get(key, 1) > n_pages:    # list shrank since the last rerun
+        st.session_state[key] = n_pages
+    page = st.number_input(f"{label} (1–{n_pages})", min_value=1, max_value=n_pages, step=1, key=key)
+    start = (int(page) - 1) * per_page
+    return items[start:start + per_page]
+
+def lazy_expander(label: str, key: str, force_open: bool = False):
+    """Expander whose body is only built while it is open; check `.open` before filling it."""
+    if force_open:
+        st.session_state[key] = True
+    return st.expander(label, key=key, on_change="rerun")
 
 def view_logframe_element(inner_html: str, kind: str = "output") -> str:
     """Wrap inner HTML in a styled card. kind: 'output' | 'kpi' (or others later)."""
     return f"<div class='lf-card lf-card--{kind}'>{inner_html}</div>"
 
-def build_logframe_docx():
-    # Lazy import so app loads even if package is missing
-    try:
-        from docx import Document
-        from docx.shared import Cm, RGBColor, Pt
-        from docx.enum.text import WD_ALIGN_PARAGRAPH
-        from docx.enum.table import WD_TABLE_ALIGNMENT
-        from docx.enum.section import WD_ORIENT
-        from docx.oxml import OxmlElement
-        from docx.oxml.ns import qn
-        from docx.shared import Pt
-    except Exception:
-        st.error("`python-docx` is required. In your venv run:\n  pip uninstall -y docx\n  pip install -U python-docx")
-        raise
-
-    PRIMARY_SHADE = "0A2F41"
-
-    def _shade(cell, hex_fill):
-        tcPr = cell._tc.get_or_add_tcPr()
-        shd = OxmlElement("w:shd")
-        shd.set(qn("w:val"), "clear")
-        shd.set(qn("w:color"), "auto")
-        shd.set(qn("w:fill"), hex_fill)
-        tcPr.append(shd)
-
-    def _repeat_header(row):
-        trPr = row._tr.get_or_add_trPr()
-        tblHeader = OxmlElement("w:tblHeader")
-        trPr.append(tblHeader)
-
-    def _set_cell_text(cell, text, *, bold=False, white=False, align_left=True):
-        cell.text = ""
-        p = cell.paragraphs[0]
-        if align_left:
-            p.alignment = WD_ALIGN_PARAGRAPH.LEFT
-        run = p.add_run(text or "")
-        run.bold = bool(bold)
-        run.font.name = "Calibri"
-        run.font.size = Pt(11)
-        try:
-            rpr = run._element.rPr
-            rpr.rFonts.set(qn("w:ascii"), "Calibri")
-            rpr.rFonts.set(qn("w:hAnsi"), "Calibri")
-            rpr.rFonts.set(qn("w:cs"), "Calibri")
-        except Exception:
-            pass
-        if white:
-            run.font.color.rgb = RGBColor(255, 255, 255)
-
-    def _add_run(p, text, bold=False):
-        run = p.add_run(text or "")
-        run.bold = bold
-        run.font.name = "Calibri"
-        run.font.size = Pt(11)
-        return run
-
-    # ---- Document setup: Portrait + standard margins
-    doc = Document()
-    sec = doc.sections[0]
-    sec.orientation = WD_ORIENT.PORTRAIT
-    for side in ("top_margin", "bottom_margin", "left_margin", "right_margin"):
-        setattr(sec, side, Cm(2.54))
-
-    # ---- Data & numbering
-    goal_text = (st.session_state.impacts[0]["name"] if st.session_state.get("impacts") else "")
-    outcome_text = (st.session_state.outcomes[0]["name"] if st.session_state.get("outcomes") else "")
-    out_nums, kpi_nums = compute_numbers()
-
-    def _sort_by_num(label):
-        if not label:
-            return (9999,)
-        try:
-            return tuple(int(x) for x in str(label).split("."))
-        except Exception:
-            return (9999,)
-
-    # ---- Helper: add a 2-row banner (label row shaded, content row unshaded)
-    def _add_banner_block(label_text, content_text):
-        t = doc.add_table(rows=2, cols=4)
-        t.style = "Table Grid"
-        t.alignment = WD_TABLE_ALIGNMENT.LEFT
-        # Row 0: label
-        r0 = t.rows[0]
-        c0 = r0.cells[0]
-        c0.merge(r0.cells[3])
-        _shade(c0, PRIMARY_SHADE)
-        _set_cell_text(c0, label_text.upper(), bold=True, white=True)
-        # Row 1: content
-        r1 = t.rows[1]
-        c1 = r1.cells[0]
-        c1.merge(r1.cells[3])
-        _set_cell_text(c1, content_text or "")
-        doc.add_paragraph("")
-
-    # ---- GOAL & OUTCOME banners (keep these)
-    if goal_text:
-        _add_banner_block("GOAL", goal_text)
-    if outcome_text:
-        _add_banner_block("OUTCOME", outcome_text)
-
-    # ---- ONE main table for all Outputs & KPIs (no per-output banners)
-    tbl = doc.add_table(rows=1, cols=4)
-    tbl.style = "Table Grid"
-    tbl.alignment = WD_TABLE_ALIGNMENT.LEFT
-    hdr = tbl.rows[0]
-    labels = ("Output", "KPI", "Means of Verification", "Key Assumptions")
-    for i, lab in enumerate(labels):
-        _set_cell_text(hdr.cells[i], lab, bold=True, white=True)
-        _shade(hdr.cells[i], PRIMARY_SHADE)
-    _repeat_header(hdr)
-
-    outputs = st.session_state.get("outputs", [])
-    outputs = sorted(outputs, key=lambda o: _sort_by_num(out_nums.get(o["id"], "")))
-
-    for out in outputs:
-        out_num = out_nums.get(out["id"], "")
-        kpis = [k for k in st.session_state.get("kpis", []) if k.get("parent_id") == out["id"]]
-
-        if not kpis:
-            r = tbl.add_row()
-            _set_cell_text(r.cells[0], f"Output {out_num} — {out.get('name','')}")
-            _set_cell_text(r.cells[1], "—")
-            _set_cell_text(r.cells[2], "—")
-            _set_cell_text(r.cells[3], out.get("assumptions","") or "—")
-            continue
-
-        first = len(tbl.rows)  # first KPI row index for this output in the main table
-        for k in kpis:
-            r = tbl.add_row()
-            k_lab = kpi_nums.get(k["id"], "")
-            bp = (k.get("baseline", "") or "").strip()
-            tg = (k.get("target", "") or "").strip()
-            sd = fmt_dd_mmm_yyyy(k.get("start_date"))
-            ed = fmt_dd_mmm_yyyy(k.get("end_date"))
-
-            # Reset KPI cell
-            kcell = r.cells[1]
-            kcell.text = ""
-            p = kcell.paragraphs[0]
-
-            # Title line
-            # Title
-            title = f"KPI ({k_lab}) — {k.get('name', '')}" if k_lab else k.get('name', '')
-            _add_run(p, title);
-            p.add_run("\n")
-
-            # Baseline
-            if bp:
-                _add_run(p, "Baseline: ", bold=True);
-                _add_run(p, bp);
-                p.add_run("\n")
-
-            # Target
-            if tg:
-                _add_run(p, "Target: ", bold=True);
-                _add_run(p, tg);
-                p.add_run("\n")
-
-            # Start / End (separate lines)
-            if sd or ed:
-                _add_run(p, "Start: ", bold=True);
-                _add_run(p, sd or "—");
-                p.add_run("\n")
-                _add_run(p, "End: ", bold=True);
-                _add_run(p, ed or "—")
-
-            # MoV column (third col)
-            mov_text = (k.get("mov") or "").strip() or "—"
-            _set_cell_text(r.cells[2], mov_text)
-
-        last = len(tbl.rows) - 1
-        # Merge Output & Assumptions cells across the KPI block
-        _set_cell_text(tbl.cell(first, 0), f"Output {out_num} — {out.get('name','')}")
-        _set_cell_text(tbl.cell(first, 3), out.get("assumptions","") or "—")
-        if last > first:
-            tbl.cell(first, 0).merge(tbl.cell(last, 0))
-            tbl.cell(first, 3).merge(tbl.cell(last, 3))
-
-    # ---- Save to buffer
-    buf = BytesIO()
-    doc.save(buf)
-    buf.seek(0)
-    return buf
-
 def view_activity_readonly(a, label, id_to_output, id_to_kpi):
     out_name = id_to_output.get(a.get("output_id"), "(unassigned)")
     kpis_txt = ", ".join(id_to_kpi.get(kid, "") for kid in (a.get("kpi_ids") or [])) or "—"
@@ -460,6 +279,82 @@ def view_activity_readonly(a, label, id_to_output, id_to_kpi):
 
     return view_logframe_element(body, kind="activity")
 
+ACTIVITY_STATUSES = ["planned", "in_progress", "completed", "cancelled"]
+
+def save_activity(activity_id):
+    """on_click for an Activity's 💾: read the edit widgets from session_state."""
+    v = lambda f: st.session_state.get(f"a_{f}_{activity_id}")
+    lf.update(
+        activity_id,
+        name=(v("name") or "").strip(),
+        owner=(v("owner") or "").strip(),
+        start=v("start"),
+        end=v("end"),
+        status=v("status"),
+        progress=int(v("prog") or 0),
+        notes=(v("notes") or "").strip(),
+    )
+    if st.session_state.get("edit_activity") == activity_id:
+        st.session_state["edit_activity"] = None
+
+def render_activity_card(a, act_nums, id_to_output, id_to_kpi):
+    """One Activity card: read-only with ✏️ / 🗑️, or the inline edit form."""
+    label = act_nums.get(a["id"], "?")
+    # Edit mode?
+    if st.session_state.get("edit_activity") == a["id"]:
+        e1, e2, e3 = st.columns([0.90, 0.05, 0.05])
+        with e1:
+            st.text_input("Activity", value=a.get("name", ""), key=f"a_name_{a['id']}")
+            st.text_input("Owner", value=a.get("owner", ""), key=f"a_owner_{a['id']}")
+            cA, cB = st.columns(2)
+            with cA:
+                st.date_input("Start date", value=a.get("start"), key=f"a_start_{a['id']}")
+            with cB:
+                st.date_input("End date", value=a.get("end"), key=f"a_end_{a['id']}")
+            st.selectbox(
+                "Status", ACTIVITY_STATUSES,
+                index=ACTIVITY_STATUSES.index(a.get("status", "planned")),
+                key=f"a_status_{a['id']}"
+            )
+            st.slider("% complete", 0, 100, int(a.get("progress", 0)), key=f"a_prog_{a['id']}")
+            st.text_area("Notes", value=a.get("notes", ""), key=f"a_notes_{a['id']}")
+        e2.button("💾", key=f"a_save_{a['id']}", on_click=save_activity, args=(a["id"],))
+        e3.button("✖️", key=f"a_cancel_{a['id']}", on_click=set_state, args=("edit_activity", None))
+    else:
+        v1, v2, v3 = st.columns([0.90, 0.05, 0.05])
+        v1.markdown(
+            view_activity_readonly(a, label, id_to_output, id_to_kpi),
+            unsafe_allow_html=True
+        )
+        v2.button("✏️", key=f"a_edit_{a['id']}", on_click=set_state, args=("edit_activity", a["id"]))
+        v3.button("🗑️", key=f"a_del_{a['id']}", on_click=lf.delete, args=(a["id"],))
+
+@st.fragment
+@profiling.fragment()
+@autosaved
+def workplan_output_group(output_id, id_to_output, id_to_kpi):
+    """Output header plus its Activity cards; edits and deletes rerun only this group."""
+    out = lf.get(output_id)
+    if out is None:
+        return
+    act_nums = compute_numbers(include_activities=True)[2]   # labels after a delete here
+
+    # green Output header card
+    st.markdown(view_output_header(out), unsafe_allow_html=True)
+
+    # orange Activity cards (with edit/delete), built only while expanded
+    edited_act = lf.get(st.session_state.get("edit_activity"))
+    n_acts = lf.child_count("workplan", output_id)
+    exp = lazy_expander(f"{n_acts} activit{'y' if n_acts == 1 else 'ies'}",
+                        key=f"wp_exp_{output_id}",
+                        force_open=(edited_act or {}).get("output_id") == output_id)
+    if not exp.open:
+        return
+    with exp:
+        for a in paginate(lf.children("workplan", output_id), ITEMS_PER_PAGE,
+                          key=f"wp_act_page_{output_id}", label="Activities page"):
+            render_activity_card(a, act_nums, id_to_output, id_to_kpi)
+
 def view_budget_item_card(row, id_to_output) -> str:
     """
     row: [OutputID, Item, Category, Unit, Qty, Unit Cost, Currency, Total]
@@ -486,8 +381,7 @@ def view_budget_item_card(row, id_to_output) -> str:
     return f"<div class='lf-card lf-card--budget'>{body}</div>"
 
 # ---------------- CSS for cards ----------------
-def inject_logframe_css():
-    st.markdown("""
+LOGFRAME_CSS = """
     <style>
 /* Base card */
 .lf-card{
@@ -640,7 +534,19 @@ def inject_logframe_css():
 .lf-subtotal{ font-weight:700; margin:6px 0 12px; text-align:right; }
 .lf-grandtotal{ font-weight:800; margin-top:12px; text-align:right; }
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+@st.cache_resource(show_spinner=False)
+def minified_logframe_css() -> str:
+    """LOGFRAME_CSS without comments and runs of whitespace, built once per process."""
+    css = re.sub(r"/\*.*?\*/", "", LOGFRAME_CSS, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{};:,])\s*", r"\1", css).strip()
+
+def inject_logframe_css():
+    st.markdown(minified_logframe_css(), unsafe_allow_html=True)
+
+_profile.mark("page setup")
 
 # ---------------- Tabs ----------------
 tabs = st.tabs([
@@ -680,311 +586,42 @@ if uploaded_file is not None:
 
         # Only (re)load if this is a new file or changed content
         if st.session_state.get("_resume_file_sig") != file_sig:
-            xls = pd.ExcelFile(BytesIO(file_bytes))
-
-            # ---- RESET state containers
-            st.session_state.impacts = []
-            st.session_state.outcomes = []
-            st.session_state.outputs = []
-            st.session_state.kpis = []
+            from resume_import import read_resume_workbook   # pulls in pandas
+            with profiling.timer("resume import"):
+                imported = read_resume_workbook(file_bytes)
 
             # (optional) clear edit flags so they won't point to old IDs
             for _f in ("edit_goal", "edit_outcome", "edit_output", "edit_kpi"):
                 st.session_state[_f] = None
 
-            # ---- Read Summary and build items (without trusting parent ids yet)
-            summary_df = pd.read_excel(xls, sheet_name="Summary")
-
-            goals_by_text = {}
-            outcomes_by_text = {}
-            pending_outcome_parent_ref = {}   # temp: outcome_id -> raw parent cell
-            pending_output_parent_ref  = {}   # temp: output_id  -> raw parent cell
-
-            def _clean_str(v):
-                if pd.isna(v):
-                    return ""
-                return str(v).strip()
-
-            for _, row in summary_df.iterrows():
-                lvl    = _clean_str(row.get("Level", ""))
-                text   = _clean_str(row.get("Text / Title", ""))
-                parent = _clean_str(row.get("Parent ID", ""))  # may hold old UUID or a name (older files)
-
-                if lvl.lower() == "goal":
-                    gid = generate_id()
-                    st.session_state.impacts.append({"id": gid, "level": "Goal", "name": text})
-                    if text:
-                        goals_by_text[text] = gid
-
-                elif lvl.lower() == "outcome":
-                    oid = generate_id()
-                    st.session_state.outcomes.append({"id": oid, "level": "Outcome", "name": text, "parent_id": None})
-                    pending_outcome_parent_ref[oid] = parent
-                    if text:
-                        outcomes_by_text[text] = oid
-
-                elif lvl.lower() == "output":
-                    pid = generate_id()
-                    name_clean = strip_label_prefix(text, "Output") or "Output"
-                    assumptions = _clean_str(row.get("Assumptions", ""))  # <-- read column if present
-                    st.session_state.outputs.append({
-                        "id": pid,
-                        "level": "Output",
-                        "name": name_clean,
-                        "parent_id": None,
-                        "assumptions": assumptions,  # <-- store it
-                    })
-                    pending_output_parent_ref[pid] = parent
-
-            # ---- Resolve parents for Outcomes
-            single_goal_id = st.session_state.impacts[0]["id"] if len(st.session_state.impacts) == 1 else None
-            for oc in st.session_state.outcomes:
-                raw = pending_outcome_parent_ref.get(oc["id"], "")
-                if raw in goals_by_text:
-                    oc["parent_id"] = goals_by_text[raw]
-                elif single_goal_id:
-                    oc["parent_id"] = single_goal_id
-
-            # ---- Resolve parents for Outputs
-            single_outcome_id = st.session_state.outcomes[0]["id"] if len(st.session_state.outcomes) == 1 else None
-            for out in st.session_state.outputs:
-                raw = pending_output_parent_ref.get(out["id"], "")
-                if raw in outcomes_by_text:
-                    out["parent_id"] = outcomes_by_text[raw]
-                elif single_outcome_id:
-                    out["parent_id"] = single_outcome_id
-
-            # ---- KPI Matrix (preferred in hybrid model)
-            if "KPI Matrix" in xls.sheet_names:
-                kdf = pd.read_excel(xls, sheet_name="KPI Matrix")
-
-
-                def _clean(v):
-                    try:
-                        import pandas as pd
-                        if pd.isna(v):
-                            return ""
-                    except Exception:
-                        pass
-                    return str(v).strip()
-
-
-                # Build quick lookup maps by name
-                outputs_by_name = {(o.get("name") or "").strip(): o["id"] for o in st.session_state.outputs}
-
-                for _, row in kdf.iterrows():
-                    parent_label = _clean(row.get("Parent (label)", ""))  # e.g., "Output 1 — Title"
-
-                    # Always Output in hybrid:
-                    plevel = "Output"
-                    tail = parent_label.split("—", 1)[1].strip() if "—" in parent_label else parent_label
-                    parent_id = outputs_by_name.get(tail)
-                    if not parent_id:  # fallback: try full label, then plain
-                        parent_id = outputs_by_name.get(parent_label) or outputs_by_name.get(tail)
-
-                    # Pull KPI fields
-                    kpi_raw = _clean(row.get("KPI", ""))
-                    # strip any leading "KPI x.y — "
-                    kpi_text = re.sub(r'^\s*KPI\s+[\w\.\-]+\s*[—:\-]\s*', '', kpi_raw).strip()
-
-                    baseline = _clean(row.get("Baseline", ""))
-                    target = _clean(row.get("Target", ""))
-                    sd = parse_date_like(row.get("Start Date", ""))
-                    ed = parse_date_like(row.get("End Date", ""))
-                    linked = _clean(row.get("Linked to Payment", "")).lower() in ("yes", "y", "true", "1")
-                    mov = _clean(row.get("Means of Verification", ""))
-
-                    # Only add if we found a parent
-                    if parent_id:
-                        st.session_state.kpis.append({
-                            "id": generate_id(),
-                            "level": "KPI",
-                            "name": kpi_text,
-                            "parent_id": parent_id,
-                            "baseline": baseline,
-                            "target": target,
-                            "start_date": sd,
-                            "end_date": ed,
-                            "linked_payment": bool(linked),
-                            "mov": mov,
-                        })
-
-            # ---- Workplan (supports both "rich" and "simple" exports)
-            if "Workplan" in xls.sheet_names:
-                wdf = pd.read_excel(xls, sheet_name="Workplan")
-                # normalize headers
-                wdf.columns = [str(c).strip() for c in wdf.columns]
-
-
-                def _s(v):
-                    try:
-                        import pandas as pd
-                        if pd.isna(v):
-                            return ""
-                    except Exception:
-                        pass
-                    return str(v).strip()
-
-
-                def _split_csv(s):
-                    return [t.strip() for t in (_s(s).split(",") if _s(s) else []) if t.strip()]
-
-                # lookups
-                outputs_by_name = {(o.get("name") or "").strip(): o["id"] for o in st.session_state.outputs}
-                kpis_by_name = {(k.get("name") or "").strip(): k["id"] for k in st.session_state.kpis}
-                kpi_id_set = set(kpis_by_name.values())
-
-                # detect "rich" vs "simple" format
-                rich = {"Activity ID", "Output", "Activity", "Owner", "Start", "End", "Status", "% complete",
-                        "Linked KPIs", "Milestones", "Notes", "Dependencies"}.issubset(set(wdf.columns))
-
-                st.session_state.workplan = []  # reset before loading
-
-                if rich:
-                    for _, row in wdf.iterrows():
-                        act_id = _s(row.get("Activity ID")) or generate_id()
-                        out_name = _s(row.get("Output"))
-                        out_id = outputs_by_name.get(out_name)
-
-                        # map KPI names to ids (export wrote names)
-                        kpi_names = _split_csv(row.get("Linked KPIs"))
-                        kpi_ids = [kpis_by_name.get(n) for n in kpi_names if kpis_by_name.get(n)]
-
-                        # dependencies: prefer IDs if they exist, else leave empty
-                        deps = _split_csv(row.get("Dependencies"))
-                        dep_ids = [d for d in deps if d in kpi_id_set or len(d) >= 6]  # crude but safe; keep as-is
-
-                        st.session_state.workplan.append({
-                            "id": act_id,
-                            "output_id": out_id,
-                            "name": _s(row.get("Activity")),
-                            "owner": _s(row.get("Owner")),
-                            "start": parse_date_like(row.get("Start")),
-                            "end": parse_date_like(row.get("End")),
-                            "status": _s(row.get("Status") or "planned"),
-                            "progress": int(float(row.get("% complete") or 0)),
-                            "kpi_ids": kpi_ids,
-                            "milestones": [m.strip() for m in _s(row.get("Milestones")).split("|") if m.strip()],
-                            "dependencies": dep_ids,
-                            "notes": _s(row.get("Notes")),
-                        })
-                else:
-                    # SIMPLE legacy format: Activity | Owner | Start Date | End Date | Milestone
-                    # No Output/KPI info in this shape; if there is exactly one Output, attach to it.
-                    only_output_id = st.session_state.outputs[0]["id"] if len(st.session_state.outputs) == 1 else None
-                    for _, row in wdf.iterrows():
-                        st.session_state.workplan.append({
-                            "id": generate_id(),
-                            "output_id": only_output_id,  # None if multiple outputs; user can reassign in UI
-                            "name": _s(row.get("Activity")),
-                            "owner": _s(row.get("Owner")),
-                            "start": parse_date_like(row.get("Start Date")),
-                            "end": parse_date_like(row.get("End Date")),
-                            "status": "planned",
-                            "progress": 0,
-                            "kpi_ids": [],
-                            "milestones": [_s(row.get("Milestone"))] if _s(row.get("Milestone")) else [],
-                            "dependencies": [],
-                            "notes": "",
-                        })
-
-            # ---- Budget import (optional sheet)
-            if "Budget" in xls.sheet_names:
-                bdf = pd.read_excel(xls, sheet_name="Budget")
-                bdf.columns = [str(c).strip() for c in bdf.columns]
-
-                # Current Outputs (created from Summary) -> build name map
-                outputs_by_name = {(o.get("name") or "").strip(): o["id"] for o in st.session_state.outputs}
-                current_ids = {o["id"] for o in st.session_state.outputs}
-
-                imported = []
-                for _, r in bdf.iterrows():
-                    # 1) Prefer Output name if present
-                    out_name = str(r.get("Output", "")).strip()
-                    out_id = outputs_by_name.get(out_name)
-
-                    # 2) Fallback: try OutputID *only* if it matches a current id
-                    if not out_id:
-                        raw_id = r.get("OutputID")
-                        if raw_id and str(raw_id) in current_ids:
-                            out_id = str(raw_id)
-
-                    # Read row values
-                    item = str(r.get("Item", "")).strip()
-                    cat = str(r.get("Category", "")).strip()
-                    unit = str(r.get("Unit", "")).strip()
-                    qty = float(r.get("Qty", 0) or 0)
-                    uc = float(r.get("Unit Cost", 0) or 0)
-                    cur = str(r.get("Currency", "USD")).strip() or "USD"
-                    tot = float(r.get("Total", qty * uc) or (qty * uc))
-
-                    # Only keep rows we can link to an Output and that have an item
-                    if out_id and item:
-                        imported.append([out_id, item, cat, unit, qty, uc, cur, tot])
-
-                if imported:
-                    st.session_state.budget = imported
-
-            # --- Enforce single Goal and single Outcome after import ---
-            # Keep the first Goal only
-            if len(st.session_state.impacts) > 1:
-                keep_goal_id = st.session_state.impacts[0]["id"]
-                st.session_state.impacts = [st.session_state.impacts[0]]
-            else:
-                keep_goal_id = st.session_state.impacts[0]["id"] if st.session_state.impacts else None
-
-            # Keep the first Outcome only; reattach all Outputs to it
-            if len(st.session_state.outcomes) > 1:
-                keep_outcome = st.session_state.outcomes[0]
-                keep_outcome_id = keep_outcome["id"]
-                st.session_state.outcomes = [keep_outcome]
-                for o in st.session_state.outputs:
-                    o["parent_id"] = keep_outcome_id   # << this is the line you asked about
-            elif st.session_state.outcomes:
-                keep_outcome_id = st.session_state.outcomes[0]["id"]
-            else:
-                keep_outcome_id = None
-
-            # Ensure the (single) Outcome points at the (single) Goal, if both exist
-            if keep_goal_id and keep_outcome_id:
-                st.session_state.outcomes[0]["parent_id"] = keep_goal_id
+            # ---- Logframe + workplan into the store (workplan only if the sheet exists)
+            for _kind in ("impacts", "outcomes", "outputs", "kpis", "workplan"):
+                _items = getattr(imported, _kind)
+                if _items is not None:
+                    lf.load(_kind, _items)
 
-            # --- Import Identification sheet (if present) and update ID page state ---
-            if "Identification" in xls.sheet_names:
-                id_df = pd.read_excel(xls, sheet_name="Identification")
-                try:
-                    kv = {str(r["Field"]).strip(): str(r["Value"]) if not pd.isna(r["Value"]) else ""
-                          for _, r in id_df.iterrows()}
-                except Exception:
-                    kv = {}
-
-                def _g(field):  # helper to get a string from the kv map
-                    return (kv.get(field, "") or "").strip()
+            if imported.budget is not None:
+                st.session_state.budget.load(imported.budget)
 
+            # --- Identification sheet (if present): update ID page state ---
+            if imported.id_info is not None:
                 id_info = st.session_state.get("id_info", {}) or {}
-                id_info.update({
-                    "title": _g("Project title"),
-                    "pi_name": _g("Principal Investigator (PI) name"),
-                    "pi_email": _g("PI email"),
-                    "institution": _g("Institution / Organization"),
-                    "start_date": parse_date_like(kv.get("Project start date", "")) or id_info.get("start_date"),
-                    "end_date": parse_date_like(kv.get("Project end date", "")) or id_info.get("end_date"),
-                    "contact_name": _g("Contact person (optional)"),
-                    "contact_email": _g("Contact email"),
-                    "contact_phone": _g("Contact phone"),
-                })
+                new_info = dict(imported.id_info)
+                for _k in ("start_date", "end_date"):
+                    new_info[_k] = new_info.get(_k) or id_info.get(_k)
+                id_info.update(new_info)
                 st.session_state.id_info = id_info
 
                 # also prime the live widget keys so the inputs show the imported values immediately
-                st.session_state["id_title"]        = id_info["title"]
-                st.session_state["id_pi_name"]      = id_info["pi_name"]
-                st.session_state["id_pi_email"]     = id_info["pi_email"]
-                st.session_state["id_institution"]  = id_info["institution"]
-                st.session_state["id_start_date"]   = id_info["start_date"]
-                st.session_state["id_end_date"]     = id_info["end_date"]
-                st.session_state["id_contact_name"] = id_info["contact_name"]
-                st.session_state["id_contact_email"]= id_info["contact_email"]
-                st.session_state["id_contact_phone"]= id_info["contact_phone"]
+                st.session_state["id_title"]        = id_info.get("title", "")
+                st.session_state["id_pi_name"]      = id_info.get("pi_name", "")
+                st.session_state["id_pi_email"]     = id_info.get("pi_email", "")
+                st.session_state["id_institution"]  = id_info.get("institution", "")
+                st.session_state["id_start_date"]   = id_info.get("start_date")
+                st.session_state["id_end_date"]     = id_info.get("end_date")
+                st.session_state["id_contact_name"] = id_info.get("contact_name", "")
+                st.session_state["id_contact_email"]= id_info.get("contact_email", "")
+                st.session_state["id_contact_phone"]= id_info.get("contact_phone", "")
 
             # Remember we loaded this file content; prevents re-import on button clicks
             st.session_state["_resume_file_sig"] = file_sig
@@ -994,6 +631,7 @@ if uploaded_file is not None:
         # else: same file uploaded again → skip re-import so edit/delete works
     except Exception as e:
         tabs[0].error(f"Could not parse uploaded Excel: {e}")
+_profile.mark("instructions + resume")
 
 # ===== TAB 2: Identification =====
 with tabs[1]:
@@ -1067,30 +705,23 @@ with tabs[1]:
             st.error(e)
 
     # --- Read-only summary (live)
-    # Budget total (computed from detailed budget)
-    def _sum_budget():
-        total = 0.0
-        for row in st.session_state.get("budget", []):
-            try:
-                # your budget rows are [OutputID, Item, Category, Unit, Qty, Unit Cost, Currency, Total]
-                total += float(row[7])
-            except Exception:
-                pass
-        return total
-
-    budget_total = _sum_budget()
+    # Budget total in the reporting currency (cached until the lines or the rates change)
+    budget_converted = st.session_state.budget.converted(load_rates())
 
     # Live counts
-    outputs_count = len(st.session_state.get("outputs", []))
-    # activities_count = len(st.session_state.get("activities", []))
-    kpis_count = len(st.session_state.get("kpis", []))
+    outputs_count = lf.count("outputs")
+    # activities_count = lf.count("workplan")
+    kpis_count = lf.count("kpis")
 
     st.markdown("### Summary")
     c1, c2 = st.columns(2)
     with c1:
         st.markdown("**Funding requested (from Budget)**")
-        st.markdown(f"<div style='font-size:1.5em; font-weight:600;'>{fmt_money(budget_total)}</div>",
-                    unsafe_allow_html=True)
+        st.markdown(f"<div style='font-size:1.5em; font-weight:600;'>{REPORTING_CURRENCY} "
+                    f"{fmt_money(budget_converted.grand)}</div>", unsafe_allow_html=True)
+        if budget_converted.unconverted:
+            st.error("Not included (no exchange rate): "
+                     + format_unconverted(budget_converted.unconverted, fmt_money))
     with c2:
         st.markdown("**Logframe indicators**")
         st.markdown(
@@ -1109,7 +740,7 @@ with tabs[1]:
     if warnings:
         for w in warnings:
             st.warning(w)
-
+_profile.mark("identification")
 
 # ===== TAB 3: Logframe =====
 tabs[2].header("📊 Build Your Logframe")
@@ -1119,39 +750,41 @@ out_nums, kpi_nums = compute_numbers()   # outputs -> 'n', KPIs -> 'n.p'
 
 # --- Add forms ---
 with tabs[2].expander("➕ Add Goal"):
-    if len(st.session_state.impacts) >= 1:
+    if lf.count("impacts") >= 1:
         st.info("Only one Goal is allowed. Edit the existing Goal in the preview below.")
     else:
         with st.form("goal_form"):
             goal_text = st.text_area("Goal (single, high-level statement)")
             if st.form_submit_button("Add Goal") and goal_text.strip():
-                st.session_state.impacts.append({"id": generate_id(), "level": "Goal", "name": goal_text.strip()})
+                lf.add("impacts", {"id": generate_id(), "level": "Goal", "name": goal_text.strip()})
 
 with tabs[2].expander("➕ Add Outcome"):
-    if not st.session_state.impacts:
+    if not lf.count("impacts"):
         st.warning("Add the Goal first.")
-    elif len(st.session_state.outcomes) >= 1:
+    elif lf.count("outcomes") >= 1:
         st.info("Only one Outcome is allowed. Edit the existing Outcome in the preview below.")
     else:
         with st.form("outcome_form"):
             outcome_text = st.text_area("Outcome (statement)")
             # since there is only one goal, no need to pick it; link to the single goal
-            linked_goal_id = st.session_state.impacts[0]["id"]
+            linked_goal_id = lf.first("impacts")["id"]
             if st.form_submit_button("Add Outcome") and outcome_text.strip():
-                st.session_state.outcomes.append(
+                lf.add(
+                    "outcomes",
                     {"id": generate_id(), "level": "Outcome", "name": outcome_text.strip(), "parent_id": linked_goal_id}
                 )
 
 with tabs[2].expander("➕ Add Output"):
-    if not st.session_state.outcomes:
+    if not lf.count("outcomes"):
         tabs[2].warning("Add the Outcome first.")
     else:
         with st.form("output_form"):
             output_title = st.text_input("Output title (e.g., 'Output 1')")
             output_assumptions = st.text_area("Key Assumptions (optional)")
             if st.form_submit_button("Add Output") and output_title.strip():
-                linked_outcome_id = st.session_state.outcomes[0]["id"]
-                st.session_state.outputs.append(
+                linked_outcome_id = lf.first("outcomes")["id"]
+                lf.add(
+                    "outputs",
                     {
                         "id": generate_id(),
                         "level": "Output",
@@ -1162,13 +795,13 @@ with tabs[2].expander("➕ Add Output"):
                 )
 
 with tabs[2].expander("➕ Add KPI"):
-    if not st.session_state.outputs:
+    if not lf.count("outputs"):
         tabs[2].warning("Add an Output first.")
     else:
         with st.form("kpi_form"):
             parent = st.selectbox(
                 "Parent Output",
-                st.session_state.outputs,
+                lf.items("outputs"),
                 format_func=lambda o: f"Output {out_nums.get(o['id'],'?')} — {o.get('name','Output')}"
             )
             kpi_text = st.text_area("KPI*")
@@ -1183,7 +816,7 @@ with tabs[2].expander("➕ Add KPI"):
             mov = st.text_area("Means of Verification")
 
             if st.form_submit_button("Add KPI") and kpi_text.strip():
-                st.session_state.kpis.append({
+                lf.add("kpis", {
                     "id": generate_id(),
                     "level": "KPI",
                     "name": strip_label_prefix(kpi_text.strip(), "KPI"),
@@ -1285,7 +918,7 @@ def view_kpi(k):
 def view_activity(a: dict, act_label: str, id_to_output: dict, id_to_kpi: dict) -> str:
     """
     Render one activity as a card.
-    - a: activity dict from st.session_state.workplan
+    - a: activity dict from the logframe store (workplan)
     - act_label: precomputed label like "1.2"
     - id_to_output: {output_id -> output name}
     - id_to_kpi:    {kpi_id -> kpi name}
@@ -1324,13 +957,75 @@ def view_activity(a: dict, act_label: str, id_to_output: dict, id_to_kpi: dict)
     # Use your generic card wrapper (orange indicators style)
     return view_logframe_element(title_html + body, kind="activity")
 
+KPI_FIELDS = [
+    ("name", st.text_area, "KPI"),
+    ("baseline", st.text_input, "Baseline"),
+    ("target", st.text_input, "Target"),
+    ("start_date",
+     lambda label, value, key: st.date_input(label, value=value or date.today(), key=key),
+     "Start date"),
+    ("end_date",
+     lambda label, value, key: st.date_input(label, value=value or date.today(), key=key),
+     "End date"),
+    ("linked_payment",
+     lambda label, value, key: st.checkbox(label, value=bool(value), key=key),
+     "Linked to Payment"),
+    ("mov", st.text_area, "Means of Verification"),
+]
+
+@st.fragment
+@profiling.fragment()
+@autosaved
+def logframe_output_group(output_id):
+    """One Output with its KPIs; edits and KPI deletes rerun only this group."""
+    global out_nums, kpi_nums
+    out = lf.get(output_id)
+    if out is None:         # deleted since the last full run
+        return
+    out_nums, kpi_nums = compute_numbers()   # KPI labels after a delete in this group
+
+    edited_kpi = lf.get(st.session_state.get("edit_kpi"))
+    n_kpis = lf.child_count("kpis", output_id)
+    exp = lazy_expander(
+        f"Output {out_nums.get(output_id, '?')}: {out.get('name', 'Output')} · {n_kpis} KPI(s)",
+        key=f"lf_exp_{output_id}",
+        force_open=(st.session_state.get("edit_output") == output_id
+                    or (edited_kpi or {}).get("parent_id") == output_id),
+    )
+    if not exp.open:
+        return    # collapsed: its cards and buttons are not built at all
+    with exp:
+        render_editable_item(
+            item=out,
+            list_name="outputs",
+            edit_flag_key="edit_output",
+            view_md_func=view_output,
+            fields=[
+                ("name", st.text_input, "Output title"),
+                ("assumptions", st.text_area, "Key Assumptions"),
+            ],
+            on_delete=lambda: (delete_cascade(output_id=output_id), st.rerun()),
+            key_prefix="lf"
+        )
+
+        for k in paginate(lf.children("kpis", output_id), ITEMS_PER_PAGE,
+                          key=f"lf_kpi_page_{output_id}", label="KPIs page"):
+            render_editable_item(
+                item=k, list_name="kpis", edit_flag_key="edit_kpi",
+                view_md_func=view_kpi,
+                fields=KPI_FIELDS,
+                on_delete=lambda _id=k["id"]: lf.delete(_id),
+                key_prefix="lf"
+            )
+
 # --- Inline preview with Edit / Delete buttons (refactored, card layout) ---
 with tabs[2]:
     st.markdown("---")
     st.subheader("Current Logframe (preview) — click ✏️ to edit, 🗑️ to delete")
+    readonly_preview = st.toggle("Read-only preview (whole logframe, no edit buttons)", key="lf_readonly")
 
-    for g in st.session_state.get("impacts", []):
-        render_editable_item(
+    for g in lf.items("impacts"):
+        render_editable_item_fragment(
             item=g,
             list_name="impacts",
             edit_flag_key="edit_goal",
@@ -1340,9 +1035,8 @@ with tabs[2]:
             key_prefix="lf"
         )
 
-        outcomes_here = [o for o in st.session_state.get("outcomes", []) if o.get("parent_id") == g["id"]]
-        for oc in outcomes_here:
-            render_editable_item(
+        for oc in lf.children("outcomes", g["id"]):
+            render_editable_item_fragment(
                 item=oc,
                 list_name="outcomes",
                 edit_flag_key="edit_outcome",
@@ -1352,49 +1046,20 @@ with tabs[2]:
                 key_prefix="lf"
             )
 
-            outs_here = [o for o in st.session_state.get("outputs", []) if o.get("parent_id") == oc["id"]]
-            for out in outs_here:
-                with st.container():  # now this container lives inside the Logframe tab
-                    render_editable_item(
-                        item=out,
-                        list_name="outputs",
-                        edit_flag_key="edit_output",
-                        view_md_func=view_output,
-                        fields=[
-                            ("name", st.text_input, "Output title"),
-                            ("assumptions", st.text_area, "Key Assumptions"),
-                        ],
-                        on_delete=lambda _id=out["id"]: (delete_cascade(output_id=_id), st.rerun()),
-                        key_prefix="lf"
-                    )
+            outputs = paginate(lf.children("outputs", oc["id"]), OUTPUTS_PER_PAGE,
+                               key=f"lf_out_page_{oc['id']}", label="Outputs page")
+            if readonly_preview:
+                # one HTML block, no widgets
+                st.markdown(
+                    "".join(view_output(out) + "".join(view_kpi(k) for k in lf.children("kpis", out["id"]))
+                            for out in outputs),
+                    unsafe_allow_html=True,
+                )
+                continue
 
-                    k_children = [k for k in st.session_state.get("kpis", [])
-                                  if (k.get("parent_id") == out["id"])]  # parent_level check optional if you dropped outcome-level KPIs
-                    for k in k_children:
-                        render_editable_item(
-                            item=k, list_name="kpis", edit_flag_key="edit_kpi",
-                            view_md_func=view_kpi,
-                            fields=[
-                                ("name", st.text_area, "KPI"),
-                                ("baseline", st.text_input, "Baseline"),
-                                ("target", st.text_input, "Target"),
-                                ("start_date",
-                                 lambda label, value, key: st.date_input(label, value=value or date.today(), key=key),
-                                 "Start date"),
-                                ("end_date",
-                                 lambda label, value, key: st.date_input(label, value=value or date.today(), key=key),
-                                 "End date"),
-                                ("linked_payment",
-                                 lambda label, value, key: st.checkbox(label, value=bool(value), key=key),
-                                 "Linked to Payment"),
-                                ("mov", st.text_area, "Means of Verification"),
-                            ],
-                            on_delete=lambda _id=k["id"]: (
-                                setattr(st.session_state, "kpis", [x for x in st.session_state.kpis if x["id"] != _id]),
-                                st.rerun()
-                            ),
-                            key_prefix="lf"
-                        )
+            for out in outputs:
+                logframe_output_group(out["id"])
+_profile.mark("logframe")
 
 # ===== TAB 4: Workplan =====
 with tabs[3]:
@@ -1404,13 +1069,13 @@ with tabs[3]:
             # Required: link to Output
             output_parent = st.selectbox(
                 "Linked Output*",
-                st.session_state.outputs,
+                lf.items("outputs"),
                 format_func=lambda x: x.get("name") or "Output"
             )
 
             # Optional: link to KPI(s) under that Output
             output_id = output_parent["id"] if output_parent else None
-            kpis_for_output = [k for k in st.session_state.kpis if k.get("parent_id") == output_id]
+            kpis_for_output = lf.children("kpis", output_id)
             kpi_links = st.multiselect(
                 "Linked KPI(s) (optional)",
                 kpis_for_output,
@@ -1431,7 +1096,7 @@ with tabs[3]:
             notes = st.text_area("Notes (optional)")
 
             # Dependencies: choose among existing activities (by name)
-            existing_acts = st.session_state.get("workplan", [])
+            existing_acts = lf.items("workplan")
             deps = st.multiselect(
                 "Depends on (optional)",
                 existing_acts,
@@ -1440,7 +1105,7 @@ with tabs[3]:
 
             submitted = st.form_submit_button("Add to Workplan")
             if submitted and name.strip() and owner.strip() and output_parent and start and end and start <= end:
-                st.session_state.workplan.append({
+                lf.add("workplan", {
                     "id": generate_id(),
                     "output_id": output_id,
                     "name": name.strip(),
@@ -1460,87 +1125,49 @@ with tabs[3]:
 
     # --- Card view (optional: put this below or instead of the table) ---
     out_nums, kpi_nums, act_nums = compute_numbers(include_activities=True)
-    id_to_output = {o["id"]: (o.get("name") or "Output") for o in st.session_state.outputs}
-    id_to_kpi    = {k["id"]: (k.get("name") or "")       for k in st.session_state.kpis}
-
-    for oc in st.session_state.outcomes:
-        outs_here = [o for o in st.session_state.outputs if o.get("parent_id") == oc["id"]]
-        for out in outs_here:
-            # green Output header card
-            st.markdown(view_output_header(out), unsafe_allow_html=True)
-
-            # orange Activity cards (with edit/delete)
-            acts_here = [a for a in st.session_state.workplan if a.get("output_id") == out["id"]]
-            for a in acts_here:
-                label = act_nums.get(a["id"], "?")
-                # Edit mode?
-                if st.session_state.get("edit_activity") == a["id"]:
-                    e1, e2, e3 = st.columns([0.90, 0.05, 0.05])
-                    with e1:
-                        new_name = st.text_input("Activity", value=a.get("name", ""), key=f"a_name_{a['id']}")
-                        new_owner = st.text_input("Owner", value=a.get("owner", ""), key=f"a_owner_{a['id']}")
-                        cA, cB = st.columns(2)
-                        with cA:
-                            new_start = st.date_input("Start date", value=a.get("start"), key=f"a_start_{a['id']}")
-                        with cB:
-                            new_end = st.date_input("End date", value=a.get("end"), key=f"a_end_{a['id']}")
-                        new_status = st.selectbox(
-                            "Status", ["planned", "in_progress", "completed", "cancelled"],
-                            index=["planned", "in_progress", "completed", "cancelled"].index(
-                                a.get("status", "planned")),
-                            key=f"a_status_{a['id']}"
-                        )
-                        new_prog = st.slider("% complete", 0, 100, int(a.get("progress", 0)), key=f"a_prog_{a['id']}")
-                        new_notes = st.text_area("Notes", value=a.get("notes", ""), key=f"a_notes_{a['id']}")
-                    if e2.button("💾", key=f"a_save_{a['id']}"):
-                        idx = _find_by_id(st.session_state.workplan, a["id"])
-                        if idx is not None:
-                            st.session_state.workplan[idx].update({
-                                "name": new_name.strip(),
-                                "owner": new_owner.strip(),
-                                "start": new_start,
-                                "end": new_end,
-                                "status": new_status,
-                                "progress": int(new_prog),
-                                "notes": new_notes.strip(),
-                            })
-                        st.session_state["edit_activity"] = None
-                        st.rerun()
-                    if e3.button("✖️", key=f"a_cancel_{a['id']}"):
-                        st.session_state["edit_activity"] = None
-                        st.rerun()
-                else:
-                    v1, v2, v3 = st.columns([0.90, 0.05, 0.05])
-                    v1.markdown(
-                        view_activity_readonly(a, label, id_to_output, id_to_kpi),
-                        unsafe_allow_html=True
-                    )
-                    if v2.button("✏️", key=f"a_edit_{a['id']}"):
-                        st.session_state["edit_activity"] = a["id"]
-                        st.rerun()
-                    if v3.button("🗑️", key=f"a_del_{a['id']}"):
-                        st.session_state.workplan = [x for x in st.session_state.workplan if x["id"] != a["id"]]
-                        st.rerun()
+    id_to_output = {o["id"]: (o.get("name") or "Output") for o in lf.items("outputs")}
+    id_to_kpi    = {k["id"]: (k.get("name") or "")       for k in lf.items("kpis")}
+
+    readonly_wp = st.toggle("Read-only preview (whole workplan, no edit buttons)", key="wp_readonly")
+
+    for oc in lf.items("outcomes"):
+        outputs = paginate(lf.children("outputs", oc["id"]), OUTPUTS_PER_PAGE,
+                           key=f"wp_out_page_{oc['id']}", label="Outputs page")
+        if readonly_wp:
+            st.markdown(
+                "".join(view_output_header(out) + "".join(
+                    view_activity_readonly(a, act_nums.get(a["id"], "?"), id_to_output, id_to_kpi)
+                    for a in lf.children("workplan", out["id"]))
+                    for out in outputs),
+                unsafe_allow_html=True,
+            )
+            continue
+
+        for out in outputs:
+            workplan_output_group(out["id"], id_to_output, id_to_kpi)
+_profile.mark("workplan")
 
 # ===== TAB 5: Budget =====
 with tabs[4]:
-    st.header("💵 Define Budget\nEnter amounts in USD")
+    st.header("💵 Define Budget")
+    st.caption(f"Enter each line in its own currency; subtotals and the total are shown in "
+               f"{REPORTING_CURRENCY} at the rates in fx_rates.csv.")
 
     # ---------- Add new budget item ----------
     with st.expander("➕ Add Budget Item"):
         with st.form("budget_form"):
-            if not st.session_state.outputs:
+            if not lf.count("outputs"):
                 st.warning("Add an Output first (in the Logframe tab) before adding budget lines.")
                 st.form_submit_button("Add to Budget", disabled=True)
             else:
                 output_parent = st.selectbox(
                     "Linked Output*",
-                    st.session_state.outputs,
+                    lf.items("outputs"),
                     format_func=lambda x: x.get("name") or "Output",
                     index=0
                 )
                 item      = st.text_input("Item*")
-                category  = st.selectbox("Category", ["Personnel","Supplies","Travel","Equipment","Services","Other"])
+                category  = st.selectbox("Category", BUDGET_CATEGORIES)
                 unit      = st.text_input("Unit (e.g., day, set, PM)")
                 quantity  = st.number_input("Quantity", min_value=0.0, value=1.0)
                 unit_cost = st.number_input("Unit Cost", min_value=0.0, value=0.0)
@@ -1552,21 +1179,14 @@ with tabs[4]:
                     if not item.strip():
                         st.warning("Item is required.")
                     else:
-                        # canonical 8-column schema
-                        st.session_state.budget.append([
-                            output_parent["id"],         # OutputID
-                            item.strip(),                # Item
-                            category,                    # Category
-                            unit.strip(),                # Unit
-                            float(quantity),             # Qty
-                            float(unit_cost),            # Unit Cost
-                            currency.strip(),            # Currency
-                            float(total)                 # Total
-                        ])
+                        st.session_state.budget.append(
+                            output_parent["id"], item.strip(), category, unit.strip(),
+                            float(quantity), float(unit_cost), currency.strip(), float(total),
+                        )
                         st.rerun()
 
     # ---------- Grouped by Output, compact blue rows ----------
-    id_to_output_name = {o["id"]: (o.get("name") or "Output") for o in st.session_state.outputs}
+    id_to_output_name = {o["id"]: (o.get("name") or "Output") for o in lf.items("outputs")}
 
     def render_budget_row_inline(row):
         """Return compact inline HTML for one budget row."""
@@ -1585,259 +1205,256 @@ with tabs[4]:
             "</div>"
         )
 
-    grand_total = 0.0
+    budget = st.session_state.budget
 
-    # outputs in the same order as in Logframe
-    out_nums, _ = compute_numbers()
-    outputs_sorted = sorted(st.session_state.outputs, key=lambda o: int(out_nums.get(o["id"], "9999").split('.')[0]))
+    def save_budget_row(row_uid):
+        """on_click for a budget row's 💾; totals change, so the whole tab reruns."""
+        v = lambda f: st.session_state.get(f"b_{f}_{row_uid}")
+        st.session_state.budget.update(
+            row_uid, output_id=v("out")["id"], item=v("item"), category=v("cat"), unit=v("unit"),
+            qty=v("qty"), unit_cost=v("uc"), currency=v("cur"),
+        )
+        st.session_state["edit_budget_row"] = None
+        st.rerun()
+
+    def delete_budget_row(row_uid):
+        st.session_state.budget.delete(row_uid)
+        st.rerun()
+
+    # grid columns -> BudgetTable fields
+    GRID_FIELDS = {"Item": "item", "Category": "category", "Unit": "unit", "Qty": "qty",
+                   "Unit Cost": "unit_cost", "Currency": "currency"}
+
+    def apply_budget_grid(output_id, grid_key):
+        """on_change for an Output's grid: apply only the edited / added / deleted rows."""
+        delta = st.session_state[grid_key]
+        uids = st.session_state[f"budget_grid_uids_{output_id}"]
+        b = st.session_state.budget
+        for pos, changes in delta.get("edited_rows", {}).items():
+            b.update(uids[int(pos)], **{GRID_FIELDS[c]: v for c, v in changes.items() if c in GRID_FIELDS})
+        for row in delta.get("added_rows", []):
+            values = {GRID_FIELDS[c]: v for c, v in row.items() if c in GRID_FIELDS}
+            if (values.get("item") or "").strip():
+                b.append(output_id, **dict({"currency": "USD"}, **values))
+        b.delete(*(uids[int(pos)] for pos in delta.get("deleted_rows", [])))
+        st.rerun()
+
+    def budget_grid(output_id, positions):
+        """st.data_editor over one Output's lines (pandas is only imported for the grid)."""
+        import pandas as pd
 
-    for out in outputs_sorted:
+        grid_key = f"budget_grid_{output_id}_{budget.version}"   # fresh editor after each change
+        st.session_state[f"budget_grid_uids_{output_id}"] = budget.uid[positions].tolist()
+        frame = pd.DataFrame({
+            "Item": budget.item[positions], "Category": budget.category[positions],
+            "Unit": budget.unit[positions], "Qty": budget.qty[positions],
+            "Unit Cost": budget.unit_cost[positions], "Currency": budget.currency[positions],
+            "Total": budget.total[positions],
+        })
+        st.data_editor(
+            frame, key=grid_key, num_rows="dynamic", hide_index=True,
+            column_config={
+                "Category": st.column_config.SelectboxColumn(options=list(BUDGET_CATEGORIES)),
+                "Qty": st.column_config.NumberColumn(min_value=0.0),
+                "Unit Cost": st.column_config.NumberColumn(min_value=0.0, format="%.2f"),
+                "Total": st.column_config.NumberColumn(format="%.2f", disabled=True),
+            },
+            on_change=apply_budget_grid, args=(output_id, grid_key),
+        )
+
+    @st.fragment
+    @profiling.fragment()
+    @autosaved
+    def budget_output_group(output_id):
+        """Header, rows and subtotal of one Output; ✏️ / ✖️ rerun only this group."""
+        out = lf.get(output_id)
         # Header like Workplan
         st.markdown(view_output_header(out), unsafe_allow_html=True)
 
         # Items for this output (keep order they were added)
-        rows_here = [(idx, r) for idx, r in enumerate(st.session_state.budget) if r[0] == out["id"]]
-        if not rows_here:
+        positions = budget.positions(output_id)
+        if st.session_state.get("budget_grid"):
+            budget_grid(output_id, positions)
+            positions = positions[:0]            # the grid replaces the compact rows
+        elif not len(positions):
             st.info("No budget items for this output.")
-            continue
+            return
 
-        subtotal = 0.0
-        for idx, r in rows_here:
+        for pos in positions:
+            r = budget.row(pos)
             out_id, item, cat, unit, qty, uc, cur, tot = r
-            subtotal += float(tot or 0.0)
-            grand_total += float(tot or 0.0)
-
-            # Unique suffix for keys (prevents duplicate keys even if order changes)
-            row_uid = f"{idx}_{out_id}_{hash(item)}_{int(qty)}_{int(uc)}"
+            row_uid = budget.uid[pos]
 
-            if st.session_state.get("edit_budget_row") == idx:
+            if st.session_state.get("edit_budget_row") == row_uid:
                 # ----- inline edit mode (row replaced by small form) -----
                 e1, e2, e3 = st.columns([0.90, 0.05, 0.05])
                 with e1:
-                    out_sel = st.selectbox(
-                        "Output", st.session_state.outputs,
+                    all_outputs = lf.items("outputs")
+                    st.selectbox(
+                        "Output", all_outputs,
                         format_func=lambda x: x.get("name") or "Output",
-                        index=next((j for j,o in enumerate(st.session_state.outputs) if o["id"] == out_id), 0),
+                        index=next((j for j,o in enumerate(all_outputs) if o["id"] == out_id), 0),
                         key=f"b_out_{row_uid}"
                     )
-                    new_item = st.text_input("Item", value=item, key=f"b_item_{row_uid}")
-                    new_cat  = st.selectbox(
-                        "Category", ["Personnel","Supplies","Travel","Equipment","Services","Other"],
-                        index=(["Personnel","Supplies","Travel","Equipment","Services","Other"].index(cat)
-                               if cat in ["Personnel","Supplies","Travel","Equipment","Services","Other"] else 0),
+                    st.text_input("Item", value=item, key=f"b_item_{row_uid}")
+                    st.selectbox(
+                        "Category", BUDGET_CATEGORIES,
+                        index=(BUDGET_CATEGORIES.index(cat) if cat in BUDGET_CATEGORIES else 0),
                         key=f"b_cat_{row_uid}"
                     )
                     cols = st.columns(3)
                     with cols[0]:
-                        new_unit = st.text_input("Unit", value=unit, key=f"b_unit_{row_uid}")
+                        st.text_input("Unit", value=unit, key=f"b_unit_{row_uid}")
                     with cols[1]:
                         new_qty  = st.number_input("Qty", min_value=0.0, value=float(qty or 0), key=f"b_qty_{row_uid}")
                     with cols[2]:
                         new_uc   = st.number_input("Unit Cost", min_value=0.0, value=float(uc or 0), key=f"b_uc_{row_uid}")
-                    new_cur = st.text_input("Currency", value=cur or "USD", key=f"b_cur_{row_uid}")
-                    new_tot = round(float(new_qty) * float(new_uc), 2)
-                    st.caption(f"New total: {fmt_money(new_tot)}")
-
-                if e2.button("💾", key=f"b_save_{row_uid}"):
-                    st.session_state.budget[idx] = [
-                        out_sel["id"], new_item.strip(), new_cat, new_unit.strip(),
-                        float(new_qty), float(new_uc), new_cur.strip(), float(new_tot)
-                    ]
-                    st.session_state["edit_budget_row"] = None
-                    st.rerun()
-
-                if e3.button("✖️", key=f"b_cancel_{row_uid}"):
-                    st.session_state["edit_budget_row"] = None
-                    st.rerun()
+                    st.text_input("Currency", value=cur or "USD", key=f"b_cur_{row_uid}")
+                    st.caption(f"New total: {fmt_money(round(float(new_qty) * float(new_uc), 2))}")
+
+                e2.button("💾", key=f"b_save_{row_uid}", on_click=save_budget_row, args=(row_uid,))
+                e3.button("✖️", key=f"b_cancel_{row_uid}", on_click=set_state, args=("edit_budget_row", None))
 
             else:
                 # ----- view mode: compact row + buttons -----
                 c1, c2, c3 = st.columns([0.92, 0.04, 0.04])
                 c1.markdown(render_budget_row_inline(r), unsafe_allow_html=True)
-                if c2.button("✏️", key=f"b_edit_{row_uid}"):
-                    st.session_state["edit_budget_row"] = idx
-                    st.rerun()
-                if c3.button("🗑️", key=f"b_del_{row_uid}"):
-                    del st.session_state.budget[idx]
-                    st.rerun()
+                c2.button("✏️", key=f"b_edit_{row_uid}", on_click=set_state, args=("edit_budget_row", row_uid))
+                c3.button("🗑️", key=f"b_del_{row_uid}", on_click=delete_budget_row, args=(row_uid,))
 
         # Subtotal under the group
-        st.markdown(f"<div class='lf-subtotal'>Subtotal: {fmt_money(subtotal)}</div>", unsafe_allow_html=True)
-
-    # Grand total at the bottom
-    st.markdown(f"<div class='lf-grandtotal'>Total: {fmt_money(grand_total)}</div>", unsafe_allow_html=True)
+        converted = budget.converted(load_rates())
+        subtotal = converted.by_key.get(output_id, 0.0)
+        partial = " <i>(excludes lines without an exchange rate)</i>" if output_id in converted.unconverted_keys else ""
+        st.markdown(f"<div class='lf-subtotal'>Subtotal: {REPORTING_CURRENCY} {fmt_money(subtotal)}{partial}</div>",
+                    unsafe_allow_html=True)
 
+    st.toggle("Edit as table", key="budget_grid",
+              help="Edit each Output's lines in a spreadsheet-style grid (add rows at the bottom, "
+                   "delete by selecting rows).")
 
-# ===== TAB 6: Export =====
-tabs[5].header("📤 Export Your Application")
-if tabs[5].button("Generate Excel File"):
-    wb = Workbook()
-    if "Sheet" in wb.sheetnames:
-        wb.remove(wb["Sheet"])
-
-    # --- Sheet 0: Identification (Project ID page) ---
-    def _sum_budget_for_export():
-        total = 0.0
-        for r in st.session_state.get("budget", []):
-            try:
-                total += float(r[7])  # Total at index 7 in current budget schema
-            except Exception:
-                pass
-        return total
-
-
-    id_info = st.session_state.get("id_info", {}) or {}
-
-    proj_title = id_info.get("title", "")
-    pi_name = id_info.get("pi_name", "")
-    pi_email = id_info.get("pi_email", "")
-    institution = id_info.get("institution", "")
-    start_date = id_info.get("start_date", "")
-    end_date = id_info.get("end_date", "")
-    contact_name = id_info.get("contact_name", "")
-    contact_mail = id_info.get("contact_email", "")
-    contact_phone = id_info.get("contact_phone", "")
-
-    # live computed
-    budget_total = _sum_budget_for_export()
-    outputs_count = len(st.session_state.get("outputs", []))
-    kpis_count = len(st.session_state.get("kpis", []))
-
-    ws_id = wb.create_sheet("Identification", 0)  # put it first
-    ws_id.append(["Field", "Value"])
-    ws_id.append(["Project title", proj_title])
-    ws_id.append(["Principal Investigator (PI) name", pi_name])
-    ws_id.append(["PI email", pi_email])
-    ws_id.append(["Institution / Organization", institution])
-    ws_id.append(["Project start date", fmt_dd_mmm_yyyy(start_date)])
-    ws_id.append(["Project end date", fmt_dd_mmm_yyyy(end_date)])
-    ws_id.append(["Contact person (optional)", contact_name])
-    ws_id.append(["Contact email", contact_mail])
-    ws_id.append(["Contact phone", contact_phone])
-
-    # read-only summary values
-    ws_id.append(["Funding requested (from Budget)", f"{budget_total:,.2f}"])
-    ws_id.append(["Outputs (count)", outputs_count])
-    ws_id.append(["KPIs (count)", kpis_count])
-
-    # Sheet 1: Summary (Goal/Outcome/Output)
-    s1 = wb.create_sheet("Summary", 1)  # index 1 = after "Identification"
-    s1.append(["Level", "Text / Title", "Parent ID", "Assumptions"])
-
-    # Goal row(s) – no assumptions
-    for row in st.session_state.get("impacts", []):
-        s1.append([row.get("level", "Goal"), row.get("name", ""), "", ""])
-
-    # Outcome row(s) – no assumptions
-    for row in st.session_state.get("outcomes", []):
-        s1.append([row.get("level", "Outcome"), row.get("name", ""), row.get("parent_id", ""), ""])
-
-    # Output row(s) – include assumptions
-    for row in st.session_state.get("outputs", []):
-        s1.append([
-            row.get("level", "Output"),
-            row.get("name", ""),
-            row.get("parent_id", ""),
-            row.get("assumptions", "")
-        ])
-
-    # Sheet 2: KPI Matrix (Output > KPI)
-    s2 = wb.create_sheet("KPI Matrix")
-    s2.append([
-        "Parent Level",
-        "Parent (label)",
-        "KPI",
-        "Baseline",
-        "Target",
-        "Start Date",
-        "End Date",
-        "Linked to Payment",
-        "Means of Verification",
-    ])
-
-    out_nums, kpi_nums = compute_numbers()
-    output_title = {o["id"]: (o.get("name") or "Output") for o in st.session_state.outputs}
-
-    for k in st.session_state.kpis:  # keep order as-is
-        pid = k.get("parent_id", "")
-        parent_label = f"Output {out_nums.get(pid, '')} — {output_title.get(pid, '')}"
-        s2.append([
-            "Output",
-            parent_label,
-            f"KPI {kpi_nums.get(k['id'], '')} — {k.get('name', '')}",
-            k.get("baseline", ""),
-            k.get("target", ""),
-            fmt_dd_mmm_yyyy(k.get("start_date")),
-            fmt_dd_mmm_yyyy(k.get("end_date")),
-            "Yes" if k.get("linked_payment") else "No",
-            k.get("mov", ""),
-        ])
-
-    # Workplan (export)
-    out_nums, kpi_nums, act_nums = compute_numbers(include_activities=True)
-    ws2 = wb.create_sheet("Workplan")
-    ws2.append(["Activity ID", "Activity #", "Output", "Activity", "Owner", "Start", "End", "Status", "% complete",
-                "Linked KPIs", "Milestones", "Notes", "Dependencies"])
-    id_to_output = {o["id"]: (o.get("name") or "Output") for o in st.session_state.outputs}
-    id_to_kpi = {k["id"]: (k.get("name") or "") for k in st.session_state.kpis}
-
-    for a in st.session_state.workplan:
-        ws2.append([
-            a["id"],
-            act_nums.get(a["id"], ""),  # ← uses act_nums
-            id_to_output.get(a["output_id"], ""),
-            a["name"], a["owner"],
-            fmt_dd_mmm_yyyy(a["start"]), fmt_dd_mmm_yyyy(a["end"]),
-            a["status"], a["progress"],
-            ", ".join(id_to_kpi.get(i, "") for i in (a.get("kpi_ids") or [])),
-            " | ".join(a.get("milestones") or []),
-            a.get("notes", ""),
-            ", ".join(filter(None, a.get("dependencies") or [])),
-        ])
-
-    # Budget
-    # --- Budget (export) ---
-    ws3 = wb.create_sheet("Budget")
-    ws3.append(["OutputID", "Output", "Item", "Category", "Unit", "Qty", "Unit Cost", "Currency", "Total"])
-
-    # map id -> plain output name (not label)
-    id_to_output_name = {o["id"]: (o.get("name") or "Output") for o in st.session_state.outputs}
-
-    for r in st.session_state.budget:
-        out_id, item, cat, unit, qty, unit_cost, curr, total = r
-        out_name = id_to_output_name.get(out_id, "")
-        ws3.append([out_id, out_name, item, cat, unit, qty, unit_cost, curr, total])
-
-    # OPTIONAL Excel number formats (update column indices because we added "Output")
-    for row in ws3.iter_rows(min_row=2):
-        # columns (1-indexed): 1 OutputID, 2 Output, 3 Item, 4 Category, 5 Unit, 6 Qty, 7 Unit Cost, 8 Currency, 9 Total
-        row[5].number_format = '#,##0.00'  # Qty
-        row[6].number_format = '#,##0.00'  # Unit Cost
-        row[8].number_format = '#,##0.00'  # Total
+    # outputs in the same order as in Logframe
+    out_nums, _ = compute_numbers()
+    outputs_sorted = sorted(lf.items("outputs"), key=lambda o: int(out_nums.get(o["id"], "9999").split('.')[0]))
 
-    buf = BytesIO()
-    wb.save(buf)
-    buf.seek(0)
-    tabs[5].download_button(
-        "📥 Download Excel File",
-        data=buf,
-        file_name="Application_Submission.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-    )
+    for out in outputs_sorted:
+        budget_output_group(out["id"])
+
+    # Grand total at the bottom (lines of deleted Outputs are not counted)
+    totals, converted = budget.totals(), budget.converted(load_rates())
+    grand_total = sum(converted.by_key.get(o["id"], 0.0) for o in outputs_sorted)
+    st.markdown(f"<div class='lf-grandtotal'>Total: {REPORTING_CURRENCY} {fmt_money(grand_total)}</div>",
+                unsafe_allow_html=True)
+    if converted.unconverted:
+        st.error("No exchange rate for " + format_unconverted(converted.unconverted, fmt_money)
+                 + " – those lines are not included in the totals. Add the rate to fx_rates.csv.")
+    if len(totals.by_currency) > 1:
+        st.caption("By currency: " + " • ".join(f"{cur}: {fmt_money(t)}"
+                                                  for cur, t in totals.by_currency.items()))
+    elif totals.by_category:                  # one currency: category sums need no conversion
+        st.caption("By category: " + " • ".join(f"{cat or '—'}: {fmt_money(t)}"
+                                                  for cat, t in totals.by_category.items()))
+_profile.mark("budget")
 
-# --- Word export (Logframe as table)
-if tabs[5].button("Generate Word Logframe"):
-    try:
-        word_buf = build_logframe_docx()
-        proj_title = (st.session_state.get("id_info", {}) or {}).get("title", "") or "Project"
-        safe = re.sub(r"[^A-Za-z0-9]+", "_", proj_title).strip("_") or "Project"
-        tabs[5].download_button(
-            "📥 Download Word Logframe",
-            data=word_buf,
-            file_name=f"Logframe_{safe}.docx",
-            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+# ===== TAB 6: Export =====
+# The files are built by background jobs (export_jobs.py), so the app stays
+# usable while a large application is written; the status of each job is a
+# fragment that polls once a second until the job finishes.
+def export_file_name(kind: str) -> str:
+    if kind == "xlsx":
+        return "Application_Submission.xlsx"
+    proj_title = (st.session_state.get("id_info", {}) or {}).get("title", "") or "Project"
+    safe = re.sub(r"[^A-Za-z0-9]+", "_", proj_title).strip("_") or "Project"
+    return f"Logframe_{safe}.docx"
+
+def export_subscriber() -> str:
+    """This session's name as a waiter on shared export jobs (jobs.Job.subscribe)."""
+    return st.session_state.setdefault("export_subscriber", uuid.uuid4().hex)
+
+def cancel_export(kind: str, job):
+    """Cancel callback: this session stops waiting; the job stops if no other session waits for it."""
+    job.cancel(export_subscriber())
+    st.session_state[f"export_cancelled_{kind}"] = job.key
+
+def export_cancelled(kind: str) -> bool:
+    key = st.session_state.get(f"export_job_{kind}")
+    return bool(key) and st.session_state.get(f"export_cancelled_{kind}") == key
+
+def export_status(kind: str):
+    """Progress / Cancel while the job runs, then the download button (or the error)."""
+    from jobs import get_job_runner
+    from export_jobs import DOCX_MIME, XLSX_MIME
+
+    job = get_job_runner().get(st.session_state.get(f"export_job_{kind}", ""))
+    if job is None:
+        st.session_state.pop(f"export_job_{kind}", None)     # pruned, or the server restarted
+        return
+    if job.active and not export_cancelled(kind):
+        st.progress(job.progress, text=f"{job.label}: {job.step or job.status}…")
+        st.button("Cancel", key=f"export_cancel_{kind}", on_click=cancel_export, args=(kind, job))
+        return
+    if st.session_state.pop(f"export_polling_{kind}", False):
+        st.rerun()                   # full rerun: draw the result without the polling timer
+
+    if export_cancelled(kind) or job.status == job.CANCELLED:
+        st.info(f"{job.label} cancelled.")
+    elif job.status == job.DONE:
+        data, timings = job.result if kind == "xlsx" else (job.result, None)
+        st.download_button(
+            "📥 Download Excel File" if kind == "xlsx" else "📥 Download Word Logframe",
+            data=data,
+            file_name=export_file_name(kind),
+            mime=XLSX_MIME if kind == "xlsx" else DOCX_MIME,
+            key=f"export_download_{kind}",
+            on_click="ignore",
         )
-    except ModuleNotFoundError:
-        tabs[5].error("`python-docx` is required. Install it with: pip install python-docx")
-    except Exception as e:
-        tabs[5].error(f"Could not generate the Word logframe: {e}")
+        if timings:
+            st.caption("Built in " + " • ".join(f"{name}: {sec * 1000:.0f} ms" for name, sec in timings.items()))
+    elif isinstance(job.error, ModuleNotFoundError):
+        st.error("`python-docx` is required. Install it with: pip install python-docx")
+    elif kind == "docx":
+        st.error(f"Could not generate the Word logframe: {job.error}")
+    else:
+        st.error(f"Could not generate the Excel file: {job.error}")
+
+def render_export_status(kind: str):
+    from jobs import get_job_runner
+
+    job = get_job_runner().get(st.session_state.get(f"export_job_{kind}", ""))
+    polling = bool(job and job.active and not export_cancelled(kind))
+    st.session_state[f"export_polling_{kind}"] = polling
+    st.fragment(profiling.fragment()(export_status), run_every=1.0 if polling else None)(kind)
+
+with tabs[5]:
+    st.header("📤 Export Your Application")
+    if st.button("Generate Excel File"):
+        from export_jobs import submit_excel
+        job = submit_excel(lf, st.session_state.get("id_info", {}), st.session_state.budget,
+                           subscriber=export_subscriber())
+        st.session_state["export_job_xlsx"] = job.key
+        st.session_state.pop("export_cancelled_xlsx", None)
+    render_export_status("xlsx")
+
+    # --- Word export (Logframe as table)
+    if st.button("Generate Word Logframe"):
+        try:
+            from export_jobs import submit_docx
+            st.session_state["export_job_docx"] = submit_docx(lf, subscriber=export_subscriber()).key
+            st.session_state.pop("export_cancelled_docx", None)
+        except ModuleNotFoundError:
+            st.error("`python-docx` is required. Install it with: pip install python-docx")
+        except Exception as e:
+            st.error(f"Could not generate the Word logframe: {e}")
+    render_export_status("docx")
+_profile.mark("export")
+autosave_draft()
+st.sidebar.caption("💾 Your application is saved as a draft as you work"
+                   + ("." if signed_in_email() else " – bookmark this page's link to come back to it."))
+with st.sidebar.popover("🗑️ Clear application"):
+    st.caption("Deletes everything entered so far, including the saved draft.")
+    st.button("Delete draft and start over", type="primary", on_click=clear_application)
+
+if profiling.INSTRUMENT:
+    from ui.debug_panel import render_debug_panel
+    render_debug_panel(_profile)
+profiling.end_run(_profile)
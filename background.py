@@ -0,0 +1,53 @@
+# background.py
+# Process-wide background work for the Streamlit server.
+#
+# Threads here are started through st.cache_resource, so each one exists once
+# per server process no matter how many sessions / reruns ask for it.
+import logging
+import threading
+
+import streamlit as st
+from sqlalchemy.orm import Session
+
+from db import mark_overdue_periods
+
+log = logging.getLogger(__name__)
+
+OVERDUE_SWEEP_SECONDS = 24 * 60 * 60
+
+
+class PeriodicTask(threading.Thread):
+    """Daemon thread calling `fn()` now and then every `interval` seconds until stopped."""
+
+    def __init__(self, name: str, fn, interval: float):
+        super().__init__(name=name, daemon=True)
+        self.fn = fn
+        self.interval = interval
+        self.last_result = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.run_once()
+
+    def run_once(self):
+        try:
+            self.last_result = self.fn()
+        except Exception:  # keep the schedule alive; the next run retries
+            log.exception("background task %s failed", self.name)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+@st.cache_resource(show_spinner=False)
+def start_overdue_sweeper(_engine, interval: float = OVERDUE_SWEEP_SECONDS) -> PeriodicTask:
+    """Mark past-due periods 'overdue' now, then once a day, in a background thread."""
+    def sweep():
+        with Session(_engine) as session:
+            return mark_overdue_periods(session)
+
+    task = PeriodicTask("overdue-period-sweeper", sweep, interval)
+    task.run_once()          # first sweep inline, so statuses are current for this render
+    task.start()
+    return task
@@ -0,0 +1,198 @@
+# batch_export.py
+# Portfolio export: one logframe DOCX and one workbook per Project in glide.db.
+#
+#   python batch_export.py --out exports --workers 8
+#   python batch_export.py --project 12 --project 15 --format docx
+#
+# Each project is loaded with its framework nodes, indicators (+ targets),
+# activities and budget lines in a handful of eager-loading queries, mapped onto
+# the same LogframeStore shape the application form uses, and rendered with the
+# existing Word / Excel builders. The schema is migrated once (db.migrate, as
+# the app does on startup) before projects are fanned out over a process pool;
+# every worker opens its own database connections.
+#
+# Mapping notes: projects have no Goal node, so the project description (or
+# title) is used as the Goal; KPI baseline/target come from the "Baseline"
+# period and the latest period targets; budget lines become one row per
+# activity + fiscal year.
+import argparse
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from db import (
+    SessionLocal, engine, migrate, Project, FrameworkLevel, Indicator,
+)
+from budget_table import BudgetTable
+from excel_export import build_application_workbook
+from logframe_docx import build_logframe_docx, logframe_payload
+from logframe_store import LogframeStore
+
+FORMATS = ("docx", "xlsx")
+
+
+class ExportResult(NamedTuple):
+    project_id: int
+    title: str
+    files: tuple
+    error: str = ""
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", text or "").strip("_")[:60] or "Project"
+
+
+def _fmt_value(v) -> str:
+    return "" if v is None else f"{v:g}"
+
+
+def _load_project(session, project_id: int):
+    return session.execute(
+        select(Project)
+        .where(Project.id == project_id)
+        .options(
+            selectinload(Project.framework_nodes),
+            selectinload(Project.indicators).selectinload(Indicator.targets),
+            selectinload(Project.periods),
+            selectinload(Project.activities),
+            selectinload(Project.budgets),
+        )
+    ).scalar_one_or_none()
+
+
+def project_to_application(p: Project):
+    """Map a Project graph onto (LogframeStore, id_info, BudgetTable)."""
+    lf = LogframeStore()
+    goal_id = f"g{p.id}"
+    lf.add("impacts", {"id": goal_id, "level": "Goal", "name": p.description or p.title})
+
+    nodes = sorted(p.framework_nodes, key=lambda n: (n.sort_order or 0, n.id))
+    outcomes = [n for n in nodes if n.level == FrameworkLevel.outcome]
+    first_outcome = f"n{outcomes[0].id}" if outcomes else None
+    for n in outcomes:
+        lf.add("outcomes", {"id": f"n{n.id}", "level": "Outcome", "name": n.title, "parent_id": goal_id})
+    for n in nodes:
+        if n.level == FrameworkLevel.output:
+            parent = f"n{n.parent_node_id}" if n.parent_node_id else first_outcome
+            lf.add("outputs", {"id": f"n{n.id}", "level": "Output", "name": n.title,
+                               "parent_id": parent, "assumptions": n.description or ""})
+
+    periods = sorted(p.periods, key=lambda r: (r.end_date, r.id))
+    baseline_ids = {r.id for r in periods if r.label == "Baseline"}
+    period_order = {r.id: i for i, r in enumerate(periods)}
+    for ind in sorted(p.indicators, key=lambda i: i.id):
+        targets = sorted(ind.targets, key=lambda t: period_order.get(t.period_id, -1))
+        baseline = next((t.target_value for t in targets if t.period_id in baseline_ids), None)
+        latest = next((t.target_value for t in reversed(targets) if t.period_id not in baseline_ids), None)
+        lf.add("kpis", {
+            "id": f"i{ind.id}", "level": "KPI", "name": f"{ind.name} ({ind.unit})",
+            "parent_id": f"n{ind.framework_node_id}",
+            "baseline": _fmt_value(baseline), "target": _fmt_value(latest),
+            "start_date": p.start_date, "end_date": p.end_date,
+            "linked_payment": False, "mov": "",
+        })
+
+    act_output = {}
+    for a in sorted(p.activities, key=lambda a: (a.start_date, a.id)):
+        act_output[a.id] = f"n{a.framework_node_id}"
+        lf.add("workplan", {
+            "id": f"a{a.id}", "output_id": f"n{a.framework_node_id}", "name": a.title,
+            "owner": a.owner_user, "start": a.start_date, "end": a.end_date,
+            "status": a.status.value if hasattr(a.status, "value") else a.status,
+            "progress": 0, "kpi_ids": [], "milestones": [], "dependencies": [], "notes": "",
+        })
+
+    titles = {a.id: a.title for a in p.activities}
+    budget = BudgetTable.from_rows(
+        [act_output.get(b.activity_id), titles.get(b.activity_id, ""), b.fiscal_year, "",
+         1.0, float(b.planned_amount or 0), b.currency or "USD", float(b.planned_amount or 0)]
+        for b in sorted(p.budgets, key=lambda b: (b.fiscal_year, b.id))
+    )
+    id_info = {
+        "title": p.title, "pi_name": p.manager_user, "pi_email": p.manager_user,
+        "institution": p.funder, "start_date": p.start_date, "end_date": p.end_date,
+        "contact_name": "", "contact_email": "", "contact_phone": "",
+    }
+    return lf, id_info, budget
+
+
+def export_project(project_id: int, out_dir: str, formats=FORMATS) -> ExportResult:
+    """Build and write the files for one project (runs inside a worker process)."""
+    with SessionLocal() as s:
+        p = _load_project(s, project_id)
+        if p is None:
+            return ExportResult(project_id, "", (), "project not found")
+        title = p.title
+        lf, id_info, budget = project_to_application(p)
+
+    base = os.path.join(out_dir, f"{project_id:05d}_{_slug(title)}")
+    files = []
+    try:
+        if "docx" in formats:
+            path = f"{base}_logframe.docx"
+            with open(path, "wb") as f:
+                f.write(build_logframe_docx(logframe_payload(lf)))
+            files.append(path)
+        if "xlsx" in formats:
+            export = build_application_workbook(
+                id_info=id_info, impacts=lf.items("impacts"), outcomes=lf.items("outcomes"),
+                outputs=lf.items("outputs"), kpis=lf.items("kpis"), workplan=lf.items("workplan"),
+                budget=budget, numbering=lf.numbering(),
+            )
+            path = f"{base}_application.xlsx"
+            with open(path, "wb") as f:
+                f.write(export.data.getbuffer())
+            files.append(path)
+    except Exception as e:  # one bad project must not sink the batch
+        return ExportResult(project_id, title, tuple(files), f"{type(e).__name__}: {e}")
+    return ExportResult(project_id, title, tuple(files))
+
+
+def _init_worker():
+    # connections inherited from the parent process must not be shared
+    engine.dispose(close=False)
+
+
+def export_portfolio(out_dir: str, project_ids=None, workers: int | None = None,
+                     formats=FORMATS) -> list:
+    """Export every project (or the given ids) over a process pool; returns ExportResults."""
+    os.makedirs(out_dir, exist_ok=True)
+    migrate(engine)                      # e.g. budget_line.currency on an older glide.db
+    if project_ids is None:
+        with SessionLocal() as s:
+            project_ids = s.execute(select(Project.id).order_by(Project.id)).scalars().all()
+    if not project_ids:
+        return []
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(export_project, pid, out_dir, tuple(formats)) for pid in project_ids]
+        for fut in as_completed(futures):
+            results.append(fut.result())
+    return sorted(results, key=lambda r: r.project_id)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Export logframe DOCX + workbook for every project.")
+    ap.add_argument("--out", default="exports", help="output directory (default: exports)")
+    ap.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    ap.add_argument("--project", type=int, action="append", dest="projects",
+                    help="only export this project id (repeatable)")
+    ap.add_argument("--format", choices=("docx", "xlsx", "both"), default="both")
+    args = ap.parse_args(argv)
+
+    formats = FORMATS if args.format == "both" else (args.format,)
+    results = export_portfolio(args.out, args.projects, args.workers, formats)
+    failed = [r for r in results if r.error]
+    for r in failed:
+        print(f"[{r.project_id}] {r.title}: {r.error}")
+    print(f"Exported {len(results) - len(failed)} / {len(results)} projects to {args.out}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
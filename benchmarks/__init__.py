@@ -0,0 +1,7 @@
+# benchmarks/__init__.py
+# Timed scenarios over synthetic applications and glide.db portfolios.
+#
+#   python -m benchmarks.run --scale medium --out bench.json
+#
+# generators.py builds the data, scenarios.py holds what is timed and run.py
+# times it and writes JSON (see run.py for diffing two runs).
@@ -0,0 +1,197 @@
+# benchmarks/generators.py
+# Synthetic data at configurable scale.
+#
+# Applications come in the shape app.py keeps in st.session_state (lists of
+# item dicts + a BudgetTable), as a LogframeStore, and as the workbook
+# "Generate Excel File" produces (which is also what the resume import reads).
+# Portfolios are written into a glide.db (any GLIDE_DATABASE_URL-style URL)
+# with bulk inserts; everything is deterministic for a given seed.
+import datetime as dt
+import random
+from types import SimpleNamespace
+
+from sqlalchemy import insert
+
+from db import (
+    Activity, BudgetLine, Direction, FrameworkLevel, FrameworkNode, Indicator, IndicatorActual,
+    IndicatorMapping, IndicatorTarget, PeriodStatus, Project, ReportingPeriod, Status,
+    StrategicIndicator, _period_rows, make_engine, migrate,
+)
+from budget_table import CATEGORIES as BUDGET_CATEGORIES, BudgetTable
+from logframe_store import LogframeStore
+
+ACTIVITY_STATUSES = ("planned", "in_progress", "completed", "cancelled")
+CURRENCIES = ("USD", "USD", "EUR", "AED")          # mixed portfolio, mostly USD
+WORDS = ("community", "health", "training", "water", "survey", "clinic", "school", "outreach",
+         "network", "capacity", "data", "policy", "district", "supply", "quality", "access")
+
+
+def _text(rng, n=6):
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize()
+
+
+# ---------------- applications ----------------
+def synthetic_application(outputs=20, kpis=3, activities=4, budget_rows=5, seed=0) -> dict:
+    """One Goal / Outcome with `outputs` Outputs, each with `kpis` KPIs,
+    `activities` activities and `budget_rows` budget rows (st.session_state shapes)."""
+    rng = random.Random(seed)
+    start = dt.date(2025, 1, 1)
+    ids = (f"s{seed}-{i}" for i in range(10**9))
+    app = {
+        "id_info": {
+            "title": _text(rng, 4), "pi_name": "Synthetic PI", "pi_email": "pi@example.org",
+            "institution": "Benchmark Institute", "start_date": start,
+            "end_date": dt.date(2027, 12, 31), "contact_name": "", "contact_email": "",
+            "contact_phone": "",
+        },
+        "impacts": [], "outcomes": [], "outputs": [], "kpis": [], "workplan": [],
+    }
+    budget_lines = []
+    goal = {"id": next(ids), "level": "Goal", "name": _text(rng)}
+    outcome = {"id": next(ids), "level": "Outcome", "name": _text(rng), "parent_id": goal["id"]}
+    app["impacts"].append(goal)
+    app["outcomes"].append(outcome)
+    for _ in range(outputs):
+        out = {"id": next(ids), "level": "Output", "name": _text(rng), "parent_id": outcome["id"],
+               "assumptions": _text(rng, 10)}
+        app["outputs"].append(out)
+        kpi_ids = []
+        for _ in range(kpis):
+            k_start = start + dt.timedelta(days=rng.randrange(365))
+            k = {"id": next(ids), "level": "KPI", "name": _text(rng), "parent_id": out["id"],
+                 "parent_level": "Output", "baseline": str(rng.randrange(100)),
+                 "target": str(rng.randrange(100, 1000)), "start_date": k_start,
+                 "end_date": k_start + dt.timedelta(days=rng.randrange(30, 700)),
+                 "linked_payment": rng.random() < 0.3, "mov": _text(rng, 3)}
+            app["kpis"].append(k)
+            kpi_ids.append(k["id"])
+        for _ in range(activities):
+            a_start = start + dt.timedelta(days=rng.randrange(600))
+            app["workplan"].append({
+                "id": next(ids), "output_id": out["id"], "name": _text(rng),
+                "kpi_ids": rng.sample(kpi_ids, min(len(kpi_ids), 2)), "owner": "Team " + rng.choice(WORDS),
+                "start": a_start, "end": a_start + dt.timedelta(days=rng.randrange(14, 180)),
+                "status": rng.choice(ACTIVITY_STATUSES), "progress": rng.randrange(0, 101, 5),
+                "milestones": [_text(rng, 2) for _ in range(rng.randrange(3))],
+                "dependencies": [], "notes": _text(rng, 5) if rng.random() < 0.5 else "",
+            })
+        for _ in range(budget_rows):
+            qty, unit_cost = float(rng.randrange(1, 50)), round(rng.uniform(10, 5000), 2)
+            budget_lines.append([out["id"], _text(rng, 3), rng.choice(BUDGET_CATEGORIES), "unit",
+                                 qty, unit_cost, rng.choice(CURRENCIES), round(qty * unit_cost, 2)])
+    app["budget"] = BudgetTable.from_rows(budget_lines)
+    return app
+
+
+def application_store(app: dict) -> LogframeStore:
+    """The application's logframe items loaded into a fresh LogframeStore."""
+    lf = LogframeStore()
+    for kind in ("impacts", "outcomes", "outputs", "kpis", "workplan"):
+        lf.load(kind, [dict(item) for item in app[kind]])
+    return lf
+
+
+def application_workbook(app: dict) -> bytes:
+    """The application as exported by "Generate Excel File" (input for the resume import)."""
+    from excel_export import build_application_workbook
+
+    lf = application_store(app)
+    return build_application_workbook(
+        id_info=app["id_info"], impacts=lf.items("impacts"), outcomes=lf.items("outcomes"),
+        outputs=lf.items("outputs"), kpis=lf.items("kpis"), workplan=lf.items("workplan"),
+        budget=app["budget"], numbering=lf.numbering(),
+    ).data.getvalue()
+
+
+# ---------------- portfolios ----------------
+def synthetic_portfolio(url: str, projects=200, indicators=4, activities=5, budget_lines=2,
+                        strategic=10, seed=0) -> dict:
+    """Fill an empty database at `url` with a portfolio; returns {table: rows inserted}.
+
+    Every project gets an Outcome with one Output per indicator, the Baseline +
+    quarterly reporting periods, a target per indicator and period, actuals for
+    periods that have ended, activities with `budget_lines` lines each, and
+    about half of the indicators are mapped to one of `strategic` KPIs.
+    """
+    rng = random.Random(seed)
+    eng = make_engine(url)
+    migrate(eng)
+    today = dt.date.today()
+    rows = {name: [] for name in ("project", "framework_node", "indicator", "reporting_period",
+                                  "indicator_target", "indicator_actual", "activity",
+                                  "budget_line", "strategic_indicator", "indicator_mapping")}
+    node_id = ind_id = period_id = act_id = 0
+
+    rows["strategic_indicator"] = [
+        dict(id=i, code=f"SKPI-{i:03d}", name=_text(rng, 3), unit="n",
+             direction=rng.choice(list(Direction)))
+        for i in range(1, strategic + 1)
+    ]
+    for pid in range(1, projects + 1):
+        start = dt.date(2023, 1, 1) + dt.timedelta(days=rng.randrange(900))
+        end = start + dt.timedelta(days=rng.randrange(365, 1100))
+        rows["project"].append(dict(
+            id=pid, title=f"Project {pid} – {_text(rng, 3)}", description=_text(rng, 8),
+            start_date=start, end_date=end, status=rng.choice(list(Status)),
+            manager_user=f"manager{pid % 50}@example.org", funder=f"Funder {pid % 12}",
+            overhead_rate=0.15, revised_on=today,
+        ))
+        periods = []
+        for r in _period_rows(SimpleNamespace(id=pid, start_date=start, end_date=end)):
+            period_id += 1
+            r.update(id=period_id, status=PeriodStatus.open)
+            periods.append(r)
+        rows["reporting_period"] += periods
+
+        node_id += 1
+        outcome_id = node_id
+        rows["framework_node"].append(dict(id=outcome_id, project_id=pid, level=FrameworkLevel.outcome,
+                                           parent_node_id=None, title=_text(rng), sort_order=1))
+        for j in range(indicators):
+            node_id += 1
+            rows["framework_node"].append(dict(id=node_id, project_id=pid, level=FrameworkLevel.output,
+                                               parent_node_id=outcome_id, title=_text(rng),
+                                               sort_order=j + 1))
+            ind_id += 1
+            rows["indicator"].append(dict(id=ind_id, project_id=pid, framework_node_id=node_id,
+                                          name=_text(rng, 4), unit="n",
+                                          direction=rng.choice(list(Direction)),
+                                          requires_disaggregation=False))
+            if strategic and rng.random() < 0.5:
+                rows["indicator_mapping"].append(dict(indicator_id=ind_id,
+                                                      strategic_indicator_id=rng.randint(1, strategic)))
+            for p in periods:
+                target = float(rng.randrange(10, 500))
+                rows["indicator_target"].append(dict(indicator_id=ind_id, period_id=p["id"],
+                                                     target_value=target))
+                if p["end_date"] < today:
+                    rows["indicator_actual"].append(dict(indicator_id=ind_id, period_id=p["id"],
+                                                         actual_value=target * rng.uniform(0.5, 1.3),
+                                                         qa_status="draft"))
+            for _ in range(activities):
+                act_id += 1
+                a_start = start + dt.timedelta(days=rng.randrange(max(1, (end - start).days)))
+                rows["activity"].append(dict(id=act_id, project_id=pid, framework_node_id=node_id,
+                                             title=_text(rng, 4), start_date=a_start,
+                                             end_date=min(end, a_start + dt.timedelta(days=90)),
+                                             status=rng.choice(list(Status)),
+                                             owner_user=f"owner{act_id % 40}@example.org"))
+                for k in range(budget_lines):
+                    planned = round(rng.uniform(1_000, 50_000), 2)
+                    rows["budget_line"].append(dict(project_id=pid, activity_id=act_id,
+                                                    fiscal_year=str(a_start.year + k),
+                                                    planned_amount=planned,
+                                                    actual_amount=round(planned * rng.uniform(0, 1.1), 2),
+                                                    currency=rng.choice(CURRENCIES)))
+
+    models = {m.__tablename__: m for m in (Project, FrameworkNode, Indicator, ReportingPeriod,
+                                           IndicatorTarget, IndicatorActual, Activity, BudgetLine,
+                                           StrategicIndicator, IndicatorMapping)}
+    with eng.begin() as conn:     # parents before children
+        for name in ("project", "strategic_indicator", "framework_node", "indicator",
+                     "reporting_period", "indicator_target", "indicator_actual", "activity",
+                     "budget_line", "indicator_mapping"):
+            if rows[name]:
+                conn.execute(insert(models[name]), rows[name])
+    eng.dispose()
+    return {name: len(r) for name, r in rows.items()}
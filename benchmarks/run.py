@@ -0,0 +1,140 @@
+# benchmarks/run.py
+# Time the scenarios and write the results as JSON.
+#
+#   python -m benchmarks.run --scale medium --out bench.json
+#   python -m benchmarks.run --only resume_import --only excel_export --set outputs=500
+#   python -m benchmarks.run --scale large --baseline bench.json      (prints the ratio per scenario)
+#
+# Every scenario is called once untimed (warm-up: imports, caches), then timed
+# --repeat times; the JSON holds min / median / mean / max in milliseconds plus
+# the scale parameters, so two files can be diffed directly. The portfolio goes
+# into a throwaway SQLite file unless --db points at an existing database.
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.scenarios import SCENARIOS, Context
+
+SCALES = {
+    #          application (one form)                        portfolio (glide.db)
+    "small":  dict(outputs=10, kpis=3, activities=3, budget_rows=3,
+                   projects=50, indicators=3, project_activities=3, budget_lines=2, strategic=5),
+    "medium": dict(outputs=50, kpis=5, activities=8, budget_rows=6,
+                   projects=500, indicators=4, project_activities=5, budget_lines=2, strategic=20),
+    "large":  dict(outputs=200, kpis=8, activities=15, budget_rows=10,
+                   projects=5000, indicators=5, project_activities=5, budget_lines=3, strategic=50),
+}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def time_scenario(run, repeat: int) -> dict:
+    run()                                   # warm-up, not counted
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return {
+        "runs": repeat,
+        "min_ms": round(min(samples), 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+def run_benchmarks(params: dict, names, repeat: int = 5, db_url: str | None = None) -> dict:
+    """Time `names` (default: all scenarios) at `params`; returns the JSON-ready result."""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = Context(params, db_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+                      populate=db_url is None)
+        results = {}
+        for name in names:
+            t0 = time.perf_counter()
+            run = SCENARIOS[name](ctx)
+            setup_s = time.perf_counter() - t0
+            results[name] = time_scenario(run, repeat)
+            print(f"{name:28s} median {results[name]['median_ms']:10.2f} ms"
+                  f"   (setup {setup_s:.1f} s)", file=sys.stderr)
+        if "engine" in ctx.__dict__:
+            ctx.engine.dispose()            # release the SQLite file before the directory goes
+    return {
+        "meta": {
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": params,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict) -> list:
+    """Lines 'name  baseline -> current  (ratio)' for scenarios present in both runs."""
+    lines = []
+    for name, res in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if not old:
+            continue
+        ratio = res["median_ms"] / old["median_ms"] if old["median_ms"] else float("inf")
+        lines.append(f"{name:28s} {old['median_ms']:10.2f} -> {res['median_ms']:10.2f} ms   x{ratio:.2f}")
+    return lines
+
+
+def _parse_set(items) -> dict:
+    out = {}
+    for item in items or ():
+        key, _, value = item.partition("=")
+        if key not in SCALES["small"] or not value:
+            raise SystemExit(f"--set expects one of {sorted(SCALES['small'])}=<int>, got {item!r}")
+        out[key] = int(value)
+    return out
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Run the synthetic benchmarks and write JSON results.")
+    ap.add_argument("--scale", choices=sorted(SCALES), default="small")
+    ap.add_argument("--set", action="append", metavar="PARAM=N",
+                    help="override one scale parameter (repeatable), e.g. outputs=500")
+    ap.add_argument("--only", action="append", choices=sorted(SCENARIOS),
+                    help="run only this scenario (repeatable)")
+    ap.add_argument("--repeat", type=int, default=5, help="timed runs per scenario (default: 5)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--db", help="benchmark an existing database URL instead of a synthetic one")
+    ap.add_argument("--out", help="write the JSON here (default: stdout)")
+    ap.add_argument("--baseline", help="earlier JSON result to compare against")
+    args = ap.parse_args(argv)
+
+    params = dict(SCALES[args.scale], **_parse_set(args.set), seed=args.seed, scale=args.scale)
+    result = run_benchmarks(params, args.only or list(SCENARIOS), args.repeat, args.db)
+
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            print("\n".join(compare(result, json.load(fh))), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,186 @@
+# benchmarks/scenarios.py
+# What run.py times. Each scenario gets the prepared Context and returns the
+# zero-argument callable to time (its setup is not timed).
+from functools import cached_property
+
+from sqlalchemy.orm import Session
+
+from benchmarks.generators import (
+    application_store, application_workbook, synthetic_application, synthetic_portfolio,
+)
+from db import make_engine
+
+SCENARIOS = {}      # name -> setup(ctx) -> callable
+
+
+class Context:
+    """Data for one run, generated on first use so app-only runs never build a database."""
+
+    def __init__(self, params: dict, db_url: str, populate: bool = True):
+        self.params = params
+        self.db_url = db_url
+        self.populate = populate          # False: db_url already holds a portfolio
+
+    @cached_property
+    def app(self) -> dict:
+        p = self.params
+        return synthetic_application(p["outputs"], p["kpis"], p["activities"], p["budget_rows"],
+                                     seed=p["seed"])
+
+    @cached_property
+    def workbook(self) -> bytes:
+        return application_workbook(self.app)
+
+    @cached_property
+    def engine(self):
+        p = self.params
+        if self.populate:
+            synthetic_portfolio(self.db_url, p["projects"], p["indicators"], p["project_activities"],
+                                p["budget_lines"], p["strategic"], seed=p["seed"])
+        return make_engine(self.db_url)
+
+
+def scenario(name):
+    def register(setup):
+        SCENARIOS[name] = setup
+        return setup
+    return register
+
+
+# ---------------- application (session state / exports) ----------------
+@scenario("compute_numbers")
+def _compute_numbers(ctx):
+    """Full numbering of a freshly loaded logframe (first rerun after a resume)."""
+    def run():
+        application_store(ctx.app).numbering()
+    return run
+
+
+@scenario("compute_numbers_after_edit")
+def _compute_numbers_after_edit(ctx):
+    """Numbering after deleting and re-adding one KPI (incremental renumbering)."""
+    lf = application_store(ctx.app)
+    lf.numbering()
+    kpi = dict(lf.items("kpis")[len(lf.items("kpis")) // 2])
+
+    def run():
+        lf.delete(kpi["id"])
+        lf.add("kpis", dict(kpi))
+        lf.numbering()
+    return run
+
+
+@scenario("excel_export")
+def _excel_export(ctx):
+    from excel_export import build_application_workbook
+
+    lf = application_store(ctx.app)
+
+    def run():
+        build_application_workbook(
+            id_info=ctx.app["id_info"], impacts=lf.items("impacts"), outcomes=lf.items("outcomes"),
+            outputs=lf.items("outputs"), kpis=lf.items("kpis"), workplan=lf.items("workplan"),
+            budget=ctx.app["budget"], numbering=lf.numbering(),
+        )
+    return run
+
+
+@scenario("resume_import")
+def _resume_import(ctx):
+    from resume_import import read_resume_workbook
+
+    return lambda: read_resume_workbook(ctx.workbook)
+
+
+@scenario("docx_build")
+def _docx_build(ctx):
+    """Uncached Word build (render_logframe_docx would return cached bytes after the first run)."""
+    from logframe_docx import build_logframe_docx, logframe_payload
+
+    lf = application_store(ctx.app)
+    return lambda: build_logframe_docx(logframe_payload(lf))
+
+
+@scenario("workplan_dates")
+def _workplan_dates(ctx):
+    """DD/MMM/YYYY for every activity's start / end, stored as dates and as text (a card rerun)."""
+    from formatting import fmt_dd_mmm_yyyy
+
+    acts = ctx.app["workplan"]
+    values = [a[k] for a in acts for k in ("start", "end")]
+    values += [v.strftime("%d/%b/%Y") for v in values]
+
+    def run():
+        for v in values:
+            fmt_dd_mmm_yyyy(v)
+    return run
+
+
+@scenario("budget_totals_after_edit")
+def _budget_totals_after_edit(ctx):
+    """Subtotals / breakdowns after editing one budget line (the Budget tab's rerun)."""
+    budget = ctx.app["budget"].copy()
+    uid = budget.uid[len(budget) // 2]
+
+    def run():
+        budget.update(uid, qty=float(budget.version % 7 + 1))
+        budget.totals()
+    return run
+
+
+@scenario("budget_converted_totals")
+def _budget_converted_totals(ctx):
+    """Reporting-currency totals after editing one line (FX conversion of every line)."""
+    from currency import load_rates
+
+    budget, rates = ctx.app["budget"].copy(), load_rates()
+    uid = budget.uid[len(budget) // 2]
+
+    def run():
+        budget.update(uid, qty=float(budget.version % 7 + 1))
+        budget.converted(rates)
+    return run
+
+
+@scenario("draft_restore")
+def _draft_restore(ctx):
+    """Restore an autosaved draft: snapshot plus a journal just short of compaction."""
+    import tempfile
+
+    from drafts import COMPACT_EVERY, DraftStore
+    from logframe_store import KINDS
+
+    lf = application_store(ctx.app)
+    tmp = tempfile.TemporaryDirectory()
+    store, draft_id = DraftStore(tmp.name), "0" * 32
+    store.compact(draft_id, {"items": {kind: lf.items(kind) for kind in KINDS},
+                             "budget": ctx.app["budget"].rows_by_uid(), "id_info": ctx.app["id_info"]})
+    kpis = lf.items("kpis")
+    store.append(draft_id, [{"op": "set", "kind": "kpis", "item": dict(kpis[i % len(kpis)], name=f"edit {i}")}
+                            for i in range(COMPACT_EVERY - 1)])
+
+    def run():
+        tmp.name                                # keep the directory alive with the closure
+        store.load(draft_id)
+    return run
+
+
+# ---------------- portfolio (glide.db) ----------------
+@scenario("dashboard_metrics")
+def _dashboard_metrics(ctx):
+    from db import portfolio_metrics
+
+    def run():
+        with Session(ctx.engine) as s:
+            portfolio_metrics(s)
+    return run
+
+
+@scenario("strategic_rollup")
+def _strategic_rollup(ctx):
+    from queries import strategic_rollup
+
+    def run():
+        with Session(ctx.engine) as s:
+            strategic_rollup(s)
+    return run
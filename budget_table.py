@@ -0,0 +1,257 @@
+# budget_table.py
+# The application budget (Budget tab) as typed columns instead of a list of
+# 8-element lists.
+#
+# Each column is a NumPy array (quantity / unit cost / total as float64, text
+# as object arrays) and the Output a line belongs to is stored categorically:
+# a small-int code into `output_ids`. Per-Output subtotals and the category /
+# currency breakdowns are then single np.bincount calls, computed once per
+# change (cached on `version`) instead of every rerun walking every row.
+# converted() does the same in one reporting currency (currency.py rates),
+# cached until the rows or the rates change. Currency codes are stored
+# upper-case, blank meaning USD.
+# Rows carry a stable uid for widget keys and the draft journal (changed uids
+# are recorded until drain_changes()). rows() / load() convert to and from the
+# 8-column lists of the Excel "Budget" sheet:
+#   [OutputID, Item, Category, Unit, Qty, Unit Cost, Currency, Total]
+import datetime as dt
+from collections.abc import Mapping
+from typing import NamedTuple
+
+import numpy as np
+
+from currency import REPORTING_CURRENCY, Converted, normalize_currency
+from logframe_store import generate_id
+
+CATEGORIES = ("Personnel", "Supplies", "Travel", "Equipment", "Services", "Other")
+ROW_FIELDS = ("output_id", "item", "category", "unit", "qty", "unit_cost", "currency", "total")
+TEXT_FIELDS = ("item", "category", "unit", "currency")
+NUMBER_FIELDS = ("qty", "unit_cost", "total")
+
+
+class BudgetTotals(NamedTuple):
+    """Totals of one budget version (read-only)."""
+    grand: float
+    by_output: Mapping[str, float]
+    by_category: Mapping[str, float]
+    by_currency: Mapping[str, float]
+
+
+def _text(values) -> np.ndarray:
+    return np.array(["" if v is None else str(v) for v in values], dtype=object)
+
+
+def _currencies(values) -> np.ndarray:
+    return np.array([normalize_currency(v) for v in values], dtype=object)
+
+
+def _numbers(values) -> np.ndarray:
+    """float64 column; blanks / unparsable values become 0."""
+    out = np.zeros(len(values), dtype=np.float64)
+    for i, v in enumerate(values):
+        try:
+            out[i] = float(v)
+        except (TypeError, ValueError):
+            pass
+    return np.nan_to_num(out)
+
+
+def _breakdown(keys: np.ndarray, weights: np.ndarray) -> dict:
+    if not len(keys):
+        return {}
+    labels, codes = np.unique(keys, return_inverse=True)
+    return dict(zip(labels.tolist(), np.bincount(codes, weights=weights).tolist()))
+
+
+class BudgetTable:
+    """Columnar budget lines for one application, in entry order."""
+
+    def __init__(self):
+        self.output_ids = []                       # code -> output id (the categories)
+        self._codes = {}                           # output id -> code
+        self.out = np.empty(0, dtype=np.int32)     # output code per row
+        self.uid = np.empty(0, dtype=object)
+        for f in TEXT_FIELDS:
+            setattr(self, f, np.empty(0, dtype=object))
+        for f in NUMBER_FIELDS:
+            setattr(self, f, np.empty(0, dtype=np.float64))
+        self.version = 0                           # bumped on every change
+        self._totals = None                        # (version, BudgetTotals)
+        self._converted = None                     # (cache key, Converted)
+        self._changes = {}                         # uid -> op since drain_changes()
+        self._reloaded = False                     # load() since then
+
+    @classmethod
+    def from_rows(cls, rows) -> "BudgetTable":
+        table = cls()
+        table.load(rows)
+        return table
+
+    # ---------------- read ----------------
+    def __len__(self) -> int:
+        return len(self.out)
+
+    def output_of(self, pos: int):
+        return self.output_ids[self.out[pos]]
+
+    def row(self, pos: int) -> list:
+        """One line in the 8-column order (plain Python values)."""
+        return [self.output_of(pos), self.item[pos], self.category[pos], self.unit[pos],
+                float(self.qty[pos]), float(self.unit_cost[pos]), self.currency[pos],
+                float(self.total[pos])]
+
+    def rows(self) -> list:
+        """All lines as 8-column lists (Excel sheet)."""
+        outs = np.array(self.output_ids, dtype=object)[self.out] if len(self) else []
+        return [list(r) for r in zip(outs, self.item.tolist(), self.category.tolist(),
+                                     self.unit.tolist(), self.qty.tolist(), self.unit_cost.tolist(),
+                                     self.currency.tolist(), self.total.tolist())]
+
+    def rows_by_uid(self) -> dict:
+        """{uid: 8-column list} in entry order (draft snapshot); load() accepts it back."""
+        return dict(zip(self.uid.tolist(), self.rows()))
+
+    def positions(self, output_id) -> np.ndarray:
+        """Row positions of one Output's lines, in entry order."""
+        code = self._codes.get(output_id)
+        if code is None:
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero(self.out == code)
+
+    def position_of(self, uid):
+        hits = np.flatnonzero(self.uid == uid)
+        return int(hits[0]) if len(hits) else None
+
+    def totals(self) -> BudgetTotals:
+        """Grand total and breakdowns, recomputed only after a change."""
+        if self._totals is None or self._totals[0] != self.version:
+            by_code = np.bincount(self.out, weights=self.total, minlength=len(self.output_ids))
+            self._totals = (self.version, BudgetTotals(
+                grand=float(self.total.sum()),
+                by_output=dict(zip(self.output_ids, by_code.tolist())),
+                by_category=_breakdown(self.category, self.total),
+                by_currency=_breakdown(self.currency, self.total),
+            ))
+        return self._totals[1]
+
+    def converted(self, rates, to: str = REPORTING_CURRENCY, as_of=None) -> Converted:
+        """Grand total and per-Output subtotals in `to`, plus the amounts that had no rate;
+        cached until the rows or the rates change."""
+        as_of = as_of or dt.date.today()
+        key = (self.version, rates.version, to, as_of)
+        if self._converted is None or self._converted[0] != key:
+            amounts = rates.convert(self.total, self.currency, to, as_of)
+            missing = np.isnan(amounts)
+            amounts[missing] = 0.0
+            by_code = np.bincount(self.out, weights=amounts, minlength=len(self.output_ids))
+            self._converted = (key, Converted(
+                currency=to,
+                grand=float(amounts.sum()),
+                by_key=dict(zip(self.output_ids, by_code.tolist())),
+                unconverted=_breakdown(self.currency[missing], self.total[missing]),
+                unconverted_keys=frozenset(self.output_ids[c] for c in np.unique(self.out[missing]).tolist()),
+            ))
+        return self._converted[1]
+
+    def drain_changes(self):
+        """(reloaded, [(op, uid), ...]) since the last call, then forget them.
+
+        op is "add" (line appended), "set" (changed in place) or "del"; after
+        load() every line is new, so only `reloaded` is reported.
+        """
+        reloaded, changes = self._reloaded, self._changes
+        self._reloaded, self._changes = False, {}
+        return reloaded, [(op, uid) for uid, op in changes.items()]
+
+    # ---------------- write ----------------
+    def _code(self, output_id) -> int:
+        code = self._codes.get(output_id)
+        if code is None:
+            code = self._codes[output_id] = len(self.output_ids)
+            self.output_ids.append(output_id)
+        return code
+
+    def append(self, output_id, item="", category="", unit="", qty=0.0, unit_cost=0.0,
+               currency="USD", total=None) -> str:
+        """Add a line (total defaults to qty x unit cost, rounded to cents); returns its uid."""
+        qty, unit_cost = _numbers([qty, unit_cost])
+        uid = generate_id()
+        self.out = np.append(self.out, np.int32(self._code(output_id)))
+        self.uid = np.append(self.uid, np.array([uid], dtype=object))
+        for f, v in zip(TEXT_FIELDS, (item, category, unit)):
+            setattr(self, f, np.append(getattr(self, f), _text([v])))
+        self.currency = np.append(self.currency, _currencies([currency]))
+        self.qty = np.append(self.qty, qty)
+        self.unit_cost = np.append(self.unit_cost, unit_cost)
+        self.total = np.append(self.total, round(qty * unit_cost, 2) if total is None else _numbers([total]))
+        self.version += 1
+        self._changes[uid] = "add"
+        return uid
+
+    def update(self, uid, **values) -> None:
+        """Set fields on one line; a new qty / unit cost recomputes its total."""
+        pos = self.position_of(uid)
+        if pos is None:
+            return
+        for f, v in values.items():
+            if f == "output_id":
+                self.out[pos] = self._code(v)
+            elif f == "currency":
+                self.currency[pos] = normalize_currency(v)
+            elif f in TEXT_FIELDS:
+                getattr(self, f)[pos] = "" if v is None else str(v).strip()
+            elif f in NUMBER_FIELDS:
+                getattr(self, f)[pos] = _numbers([v])[0]
+            else:
+                raise KeyError(f)
+        if ("qty" in values or "unit_cost" in values) and "total" not in values:
+            self.total[pos] = round(float(self.qty[pos] * self.unit_cost[pos]), 2)
+        self.version += 1
+        self._changes.setdefault(uid, "set")     # a pending "add" stays an add
+
+    def delete(self, *uids) -> None:
+        keep = ~np.isin(self.uid, list(uids))
+        if keep.all():
+            return
+        for uid in self.uid[~keep].tolist():
+            if self._changes.pop(uid, None) != "add":    # never journaled: nothing to delete
+                self._changes[uid] = "del"
+        for f in ("out", "uid") + TEXT_FIELDS + NUMBER_FIELDS:
+            setattr(self, f, getattr(self, f)[keep])
+        self.version += 1
+
+    def load(self, rows) -> None:
+        """Replace every line with `rows` (8-column lists, {uid: row} as saved in a draft,
+        or another BudgetTable)."""
+        if isinstance(rows, BudgetTable):
+            rows = rows.rows()
+        uids = None
+        if isinstance(rows, Mapping):
+            uids, rows = list(rows), list(rows.values())
+        rows = list(rows)
+        self.load_columns(**dict(zip(ROW_FIELDS, zip(*rows) if rows else [()] * len(ROW_FIELDS))),
+                          uid=uids)
+
+    def load_columns(self, uid=None, **columns) -> None:
+        """Replace every line from one sequence per ROW_FIELDS name (e.g. DataFrame columns);
+        new uids unless `uid` gives them."""
+        self.output_ids, self._codes = [], {}
+        self.out = np.array([self._code(o) for o in columns["output_id"]], dtype=np.int32)
+        self.uid = np.array(list(uid) if uid is not None else [generate_id() for _ in range(len(self.out))],
+                            dtype=object)
+        for f in TEXT_FIELDS:
+            setattr(self, f, _text(columns[f]))
+        self.currency = _currencies(columns["currency"])
+        for f in NUMBER_FIELDS:
+            setattr(self, f, _numbers(list(columns[f])))
+        self.version += 1
+        self._reloaded, self._changes = True, {}
+
+    def copy(self) -> "BudgetTable":
+        """Independent copy (for background exports)."""
+        other = BudgetTable()
+        other.output_ids, other._codes = list(self.output_ids), dict(self._codes)
+        for f in ("out", "uid") + TEXT_FIELDS + NUMBER_FIELDS:
+            setattr(other, f, getattr(self, f).copy())
+        other.version = self.version
+        return other
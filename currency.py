@@ -0,0 +1,123 @@
+# currency.py
+# FX rates for adding up budgets held in several currencies.
+#
+# Rates are maintained locally in fx_rates.csv (GLIDE_FX_RATES overrides the
+# path), one row per currency and the date the rate takes effect:
+#   currency,valid_from,usd_per_unit
+#   AED,1997-11-01,0.272294
+# A lookup "as of" a date uses the latest row on or before it, so adding a new
+# rate never changes totals reported for earlier dates. The file is re-read
+# only when its modification time or size changes, and every loaded table has
+# a `version` so callers can cache converted totals until the rates or their
+# own rows change. Conversion is vectorized: one rate lookup per distinct
+# currency, then a NumPy multiply over all amounts. Amounts in a currency
+# without a rate are never dropped silently: Converted.unconverted keeps them,
+# in their own currency, for the caller to show next to the total.
+import bisect
+import csv
+import datetime as dt
+import hashlib
+import os
+import threading
+from types import MappingProxyType
+from typing import Mapping, NamedTuple
+
+import numpy as np
+
+FX_RATES_PATH = os.environ.get("GLIDE_FX_RATES", os.path.join(os.path.dirname(__file__), "fx_rates.csv"))
+REPORTING_CURRENCY = os.environ.get("GLIDE_REPORTING_CURRENCY", "USD").upper()
+BASE_CURRENCY = "USD"             # the unit of usd_per_unit
+
+
+class Converted(NamedTuple):
+    """Amounts summed in one currency; lines in currencies without a rate are kept apart."""
+    currency: str
+    grand: float
+    by_key: Mapping                   # e.g. output id -> converted subtotal
+    unconverted: Mapping = MappingProxyType({})   # currency without a rate -> its amount (not in grand / by_key)
+    unconverted_keys: frozenset = frozenset()   # keys whose subtotal leaves such lines out
+
+
+def format_unconverted(unconverted: Mapping, fmt=lambda x: f"{x:,.2f}") -> str:
+    """'EUR 1,200.00, GBP 50.00' for a Converted.unconverted mapping."""
+    return ", ".join(f"{cur} {fmt(amount)}" for cur, amount in unconverted.items())
+
+
+def normalize_currency(code) -> str:
+    return (str(code or "").strip() or BASE_CURRENCY).upper()
+
+
+class FxRates:
+    """Dated rates per currency (usd_per_unit), ordered by valid_from."""
+
+    def __init__(self, rows, version: str = ""):
+        self._dates, self._rates = {}, {}
+        for cur, valid_from, rate in sorted(rows, key=lambda r: (r[0], r[1])):
+            self._dates.setdefault(cur, []).append(valid_from)
+            self._rates.setdefault(cur, []).append(rate)
+        self._dates.setdefault(BASE_CURRENCY, [dt.date.min])
+        self._rates.setdefault(BASE_CURRENCY, [1.0])
+        self.version = version or hashlib.sha256(repr(sorted(rows)).encode()).hexdigest()[:16]
+
+    @property
+    def currencies(self) -> list:
+        return sorted(self._rates)
+
+    def usd_per_unit(self, currency: str, as_of: dt.date | None = None):
+        """Rate in force on `as_of` (default today), or None if there is none."""
+        dates = self._dates.get(normalize_currency(currency))
+        if not dates:
+            return None
+        i = bisect.bisect_right(dates, as_of or dt.date.today()) - 1
+        return self._rates[normalize_currency(currency)][i] if i >= 0 else None
+
+    def factors(self, currencies, to: str = REPORTING_CURRENCY, as_of: dt.date | None = None) -> np.ndarray:
+        """Multiplier per element of `currencies` into `to` (NaN where a rate is missing)."""
+        currencies = np.asarray(currencies, dtype=object)
+        if not len(currencies):
+            return np.empty(0, dtype=np.float64)
+        labels, inverse = np.unique(currencies, return_inverse=True)
+        target = self.usd_per_unit(to, as_of)
+        per_label = np.array([
+            np.nan if (r := self.usd_per_unit(c, as_of)) is None or not target else r / target
+            for c in labels.tolist()
+        ], dtype=np.float64)
+        return per_label[inverse]
+
+    def convert(self, amounts, currencies, to: str = REPORTING_CURRENCY,
+                as_of: dt.date | None = None) -> np.ndarray:
+        """`amounts` in `to`; NaN where the currency has no rate."""
+        return np.asarray(amounts, dtype=np.float64) * self.factors(currencies, to, as_of)
+
+
+def read_rates(path: str) -> list:
+    """(currency, valid_from, usd_per_unit) rows; '#' lines and blank lines are skipped."""
+    rows = []
+    with open(path, newline="", encoding="utf-8") as fh:
+        lines = (line for line in fh if line.strip() and not line.lstrip().startswith("#"))
+        for rec in csv.DictReader(lines):
+            rows.append((normalize_currency(rec["currency"]),
+                         dt.date.fromisoformat(rec["valid_from"].strip()),
+                         float(rec["usd_per_unit"])))
+    return rows
+
+
+_cache = {}                       # path -> ((mtime_ns, size), FxRates)
+_cache_lock = threading.Lock()
+
+
+def load_rates(path: str = FX_RATES_PATH) -> FxRates:
+    """Rates from `path`, re-read only when the file changed (USD only if it is missing)."""
+    try:
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        stamp = None
+    with _cache_lock:
+        hit = _cache.get(path)
+        if hit and hit[0] == stamp:
+            return hit[1]
+    rates = FxRates(read_rates(path) if stamp else [])
+    with _cache_lock:
+        _cache[path] = (stamp, rates)
+    return rates
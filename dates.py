@@ -0,0 +1,175 @@
+# dates.py
+# Date parsing and DD/MMM/YYYY display shared by rendering, the exports and the
+# resume import (formatting.py re-exports parse_date_like / fmt_dd_mmm_yyyy).
+#
+# Values arrive as date / datetime / pandas Timestamp, or as text in one of
+# DATE_FORMATS. Text is parsed once per distinct string (bounded LRU) and the
+# format that last matched is tried first, so a source written in one format
+# costs one strptime per new value instead of walking the whole list.
+# Parsed dates are DisplayDate: a plain date that keeps its DD/MMM/YYYY text
+# after the first format, so cards re-rendered on every rerun do not call
+# strftime again; other dates go through a second LRU.
+# parse_series() is the column path for DataFrames: the format is sniffed from
+# a sample once, applied to the whole column with one pd.to_datetime, and only
+# cells it does not fit fall back to the other formats.
+# Both paths read NN/NN/YYYY day-first, as the formats have always been tried;
+# a cell is read month-first only when it cannot be day-first (first field > 12).
+import sys
+from datetime import date, datetime
+from functools import lru_cache
+
+DISPLAY_FORMAT = "%d/%b/%Y"       # 03/Sep/2025
+CACHE_SIZE = 8192                 # distinct strings / dates kept per LRU
+SNIFF_SAMPLE = 20                 # distinct values looked at to pick a column's format
+
+# Accepted date formats, in the order they are tried (with and without HH:MM:SS)
+DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%d/%m/%Y",
+    "%d/%m/%Y %H:%M:%S",
+    "%m/%d/%Y",
+    "%m/%d/%Y %H:%M:%S",
+    "%Y/%m/%d",
+    "%Y/%m/%d %H:%M:%S",
+    "%d/%b/%Y",            # 03/Sep/2025
+    "%d/%b/%Y %H:%M:%S",
+    "%d-%b-%Y",            # 03-Sep-2025
+    "%d-%b-%Y %H:%M:%S",
+)
+_BLANK = ("", "none", "nan", "nat")
+# month-first format -> the day-first one it must never be tried ahead of
+# (both match any NN/NN/YYYY whose fields are <= 12)
+_DAY_FIRST = {"%m/%d/%Y": "%d/%m/%Y", "%m/%d/%Y %H:%M:%S": "%d/%m/%Y %H:%M:%S"}
+
+
+class DisplayDate(date):
+    """A date that remembers its DD/MMM/YYYY text once formatted."""
+    __slots__ = ("_text",)
+
+    @property
+    def text(self) -> str:
+        try:
+            return self._text
+        except AttributeError:
+            self._text = self.strftime(DISPLAY_FORMAT)
+            return self._text
+
+
+def as_display(d):
+    """`d` (a date, or None) as a DisplayDate."""
+    if d is None or type(d) is DisplayDate:
+        return d
+    return DisplayDate(d.year, d.month, d.day)
+
+
+# ---------------- scalars ----------------
+_last_format = DATE_FORMATS[0]    # tried first; updated whenever another format matches
+
+
+def _strptime(s: str, fmt: str):
+    try:
+        return datetime.strptime(s, fmt)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_text(s: str):
+    global _last_format
+    hit = _strptime(s, _last_format)
+    if hit is None:
+        for fmt in DATE_FORMATS:
+            if fmt != _last_format and (hit := _strptime(s, fmt)) is not None:
+                if fmt not in _DAY_FIRST:
+                    _last_format = fmt
+                break
+    return as_display(hit.date()) if hit else None
+
+
+def parse_date(v):
+    """Return a datetime.date or None from common date formats or existing date/datetime/pandas types."""
+    if v is None:
+        return None
+    if isinstance(v, datetime):
+        return None if v != v else v.date()   # also pandas Timestamp (NaT != NaT)
+    if isinstance(v, date):
+        return v
+
+    # Handle pandas NaT / NaN (a pandas value implies pandas is already loaded)
+    pd = sys.modules.get("pandas")
+    if pd is not None:
+        try:
+            if pd.isna(v):
+                return None
+        except (TypeError, ValueError):
+            pass
+    if isinstance(v, float) and v != v:
+        return None
+
+    s = str(v).strip()
+    if s.lower() in _BLANK:
+        return None
+    return _parse_text(s)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _display(d: date) -> str:
+    return d.strftime(DISPLAY_FORMAT)
+
+
+def fmt_dd_mmm_yyyy(v) -> str:
+    """Return 'DD/MMM/YYYY' (e.g., 03/Sep/2025) or '' if not set/parsable."""
+    if type(v) is DisplayDate:
+        return v.text
+    d = parse_date(v)
+    if d is None:
+        return ""
+    return d.text if type(d) is DisplayDate else _display(d)
+
+
+# ---------------- columns ----------------
+def sniff_format(values):
+    """The DATE_FORMATS entry that parses the most of a sample of `values` (None if none does).
+
+    Never month-first: a mostly %m/%d/%Y sample gives %d/%m/%Y, so cells that
+    read both ways stay day-first and only the others fall back to month-first.
+    """
+    sample, seen = [], set()
+    for v in values:
+        if v not in seen:
+            seen.add(v)
+            sample.append(v)
+            if len(sample) == SNIFF_SAMPLE:
+                break
+    best, best_hits = None, 0
+    for fmt in DATE_FORMATS:
+        hits = sum(_strptime(s, fmt) is not None for s in sample)
+        if hits > best_hits:
+            best, best_hits = fmt, hits
+            if hits == len(sample):
+                break
+    return _DAY_FIRST.get(best, best)
+
+
+def parse_series(values):
+    """A pandas Series of text / dates as DisplayDate objects (None where blank or unparsable)."""
+    pd = sys.modules["pandas"]    # callers hand in a Series, so pandas is loaded
+    if pd.api.types.is_datetime64_any_dtype(values):
+        parsed = values
+    else:
+        text = values.where(values.notna(), "").astype(str).str.strip()
+        parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+        todo = ~text.str.lower().isin(_BLANK)
+        first = sniff_format(text[todo].tolist())
+        for fmt in ([first] if first else []) + [f for f in DATE_FORMATS if f != first]:
+            if not todo.any():
+                break
+            hit = pd.to_datetime(text[todo], format=fmt, errors="coerce")
+            hit = hit[hit.notna()]
+            parsed.loc[hit.index] = hit
+            todo.loc[hit.index] = False
+    days = parsed.dt.normalize()
+    # one DisplayDate per distinct day, shared by every cell that has it
+    lookup = {ts: as_display(ts.date()) for ts in days.dropna().unique()}
+    return days.map(lookup).astype(object).where(days.notna(), None)
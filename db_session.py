@@ -0,0 +1,48 @@
+# db_session.py
+# Database access for the Streamlit pages.
+#
+# One engine (and connection pool) per server process, cached with
+# st.cache_resource and migrated to the latest schema when it is created, and
+# one short-lived Session per script rerun. Creating the engine also starts the
+# daily overdue-period sweep (background.py).
+#
+#   with session_scope() as s:
+#       ...page body...
+#
+# The session is always closed when the rerun ends; anything left uncommitted
+# (including after st.stop() / st.rerun() or an exception) is rolled back.
+from contextlib import contextmanager
+
+import streamlit as st
+from sqlalchemy.orm import sessionmaker
+
+from background import start_overdue_sweeper
+from db import make_engine, migrate
+
+
+@st.cache_resource(show_spinner=False)
+def get_engine():
+    """Process-wide engine; the schema is created / upgraded once, on first use."""
+    engine = make_engine()
+    migrate(engine)
+    start_overdue_sweeper(engine)
+    return engine
+
+
+@st.cache_resource(show_spinner=False)
+def _session_factory():
+    return sessionmaker(bind=get_engine(), autoflush=False, autocommit=False)
+
+
+@contextmanager
+def session_scope():
+    """Session for one rerun: rolled back on any exit without commit, then closed."""
+    session = _session_factory()()
+    try:
+        yield session
+    except BaseException:
+        # includes Streamlit's stop / rerun control-flow exceptions
+        session.rollback()
+        raise
+    finally:
+        session.close()
@@ -0,0 +1,268 @@
+# drafts.py
+# Server-side drafts of the application form (app.py), so work survives a
+# closed tab or a server restart without the Excel download / re-upload.
+#
+# One draft per draft id, stored under DRAFT_DIR as two files:
+#   <id>.json    compacted snapshot  {"items": {kind: [item, ...]}, "budget": {uid: row}, "id_info": {...}}
+#   <id>.jsonl   journal, one change per line, appended after each edit:
+#                {"op": "load", "kind": k, "items": [...]}   every item of a kind replaced
+#                {"op": "add",  "kind": k, "item": {...}}    appended / moved to the end
+#                {"op": "set",  "kind": k, "item": {...}}    changed in place
+#                {"op": "del",  "kind": k, "id": ...}
+#                {"op": "budget", "rows": {uid: row}}        every budget line replaced
+#                {"op": "budget_add" / "budget_set", "uid": u, "row": [...]}  /  {"op": "budget_del", "uid": u}
+#                {"op": "id_info", "value": {...}}
+# Restoring reads the snapshot and replays the journal; once the journal has
+# COMPACT_EVERY lines it is folded into a new snapshot (written to a temp file
+# and renamed, so a crash leaves either the old or the new one). A journal
+# line torn by a crash is skipped. Dates are stored as {"$date": "YYYY-MM-DD"}
+# and come back as dates.DisplayDate.
+# Drafts hold the PI's contact details, so the applicant can delete theirs
+# (DraftStore.delete) and drafts not written for DRAFT_MAX_AGE_DAYS are removed
+# by prune_if_due(), at most once per PRUNE_EVERY seconds per process.
+import datetime as dt
+import json
+import os
+import re
+import threading
+import time
+
+from dates import DisplayDate
+from logframe_store import KINDS, generate_id
+
+DRAFT_DIR = os.environ.get("GLIDE_DRAFT_DIR", "drafts")
+DRAFT_MAX_AGE_DAYS = float(os.environ.get("GLIDE_DRAFT_MAX_AGE_DAYS", "30"))
+COMPACT_EVERY = 200
+PRUNE_EVERY = 60 * 60
+_DRAFT_ID = re.compile(r"^[0-9a-f]{16,64}$")
+_DRAFT_FILE = re.compile(r"^([0-9a-f]{16,64})\.jsonl?(\.tmp)?$")
+
+_locks = {}
+_locks_guard = threading.Lock()
+_journal_lines = {}               # draft id -> lines in its journal (this process' count)
+_last_prune = {}                  # draft root -> time of the last prune in this process
+
+
+def _lock(draft_id: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(draft_id, threading.Lock())
+
+
+def _scan_journal(path: str):
+    """(lines, whether the file ends with a newline) for a journal left by an earlier process."""
+    if not os.path.exists(path):
+        return 0, True
+    with open(path, "rb") as fh:
+        last, n = b"\n", 0
+        for last in fh:
+            n += 1
+    return n, last.endswith(b"\n")
+
+
+def _encode(obj):
+    if isinstance(obj, dt.datetime):
+        return {"$datetime": obj.isoformat()}
+    if isinstance(obj, dt.date):
+        return {"$date": obj.isoformat()}
+    raise TypeError(f"cannot store {type(obj).__name__} in a draft")
+
+
+def _decode(obj: dict):
+    if len(obj) == 1:
+        if "$date" in obj:
+            return DisplayDate.fromisoformat(obj["$date"])
+        if "$datetime" in obj:
+            return dt.datetime.fromisoformat(obj["$datetime"])
+    return obj
+
+
+def _dumps(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_encode)
+
+
+def _loads(text: str):
+    return json.loads(text, object_hook=_decode)
+
+
+def empty_draft() -> dict:
+    return {"items": {kind: [] for kind in KINDS}, "budget": {}, "id_info": None}
+
+
+def _budget_by_uid(rows) -> dict:
+    """{uid: row}; budgets saved before lines were journaled by uid are plain row lists."""
+    return dict(rows) if isinstance(rows, dict) else {generate_id(): row for row in rows}
+
+
+def _apply(state: dict, by_id: dict, rec: dict) -> None:
+    """Replay one journal record onto `state` (by_id: kind -> {id: item}, insertion ordered)."""
+    op = rec["op"]
+    if op == "load":
+        by_id[rec["kind"]] = {item["id"]: item for item in rec["items"]}
+    elif op == "add":
+        items = by_id[rec["kind"]]
+        items.pop(rec["item"]["id"], None)
+        items[rec["item"]["id"]] = rec["item"]
+    elif op == "set":
+        by_id[rec["kind"]][rec["item"]["id"]] = rec["item"]
+    elif op == "del":
+        by_id[rec["kind"]].pop(rec["id"], None)
+    elif op == "budget":
+        state["budget"] = _budget_by_uid(rec["rows"])
+    elif op == "budget_add":
+        state["budget"].pop(rec["uid"], None)
+        state["budget"][rec["uid"]] = rec["row"]
+    elif op == "budget_set":
+        state["budget"][rec["uid"]] = rec["row"]
+    elif op == "budget_del":
+        state["budget"].pop(rec["uid"], None)
+    elif op == "id_info":
+        state["id_info"] = rec["value"]
+
+
+class DraftStore:
+    """Snapshot + journal files per draft id under `root`."""
+
+    def __init__(self, root: str = DRAFT_DIR):
+        self.root = root
+
+    def _paths(self, draft_id: str):
+        if not _DRAFT_ID.match(draft_id or ""):
+            raise ValueError(f"invalid draft id {draft_id!r}")
+        base = os.path.join(self.root, draft_id)
+        return base + ".json", base + ".jsonl"
+
+    def exists(self, draft_id: str) -> bool:
+        return any(os.path.exists(p) for p in self._paths(draft_id))
+
+    def load(self, draft_id: str):
+        """The draft as {"items", "budget", "id_info"}, or None if there is none."""
+        snap_path, log_path = self._paths(draft_id)
+        with _lock(draft_id):
+            if not (os.path.exists(snap_path) or os.path.exists(log_path)):
+                return None
+            state, n_records = self._read(snap_path, log_path)
+            if n_records >= COMPACT_EVERY:
+                self._write_snapshot(draft_id, snap_path, log_path, state)
+        return state
+
+    def _read(self, snap_path, log_path):
+        state = empty_draft()
+        if os.path.exists(snap_path):
+            with open(snap_path, encoding="utf-8") as fh:
+                state.update(_loads(fh.read()))
+        state["budget"] = _budget_by_uid(state["budget"])
+        by_id = {kind: {item["id"]: item for item in state["items"].get(kind, [])} for kind in KINDS}
+        n_records = 0
+        if os.path.exists(log_path):
+            with open(log_path, encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        rec = _loads(line)
+                    except ValueError:
+                        continue               # torn write from a crash
+                    _apply(state, by_id, rec)
+                    n_records += 1
+        state["items"] = {kind: list(items.values()) for kind, items in by_id.items()}
+        return state, n_records
+
+    def append(self, draft_id: str, records: list) -> None:
+        """Append change records to the journal; compacts once it reaches COMPACT_EVERY lines."""
+        if not records:
+            return
+        snap_path, log_path = self._paths(draft_id)
+        os.makedirs(self.root, exist_ok=True)
+        with _lock(draft_id):
+            lead = ""
+            if draft_id not in _journal_lines:
+                _journal_lines[draft_id], clean = _scan_journal(log_path)
+                lead = "" if clean else "\n"          # end a line torn by a crash
+            with open(log_path, "a", encoding="utf-8") as fh:
+                fh.write(lead + "".join(_dumps(rec) + "\n" for rec in records))
+            _journal_lines[draft_id] += len(records)
+            if _journal_lines[draft_id] >= COMPACT_EVERY:
+                state, _ = self._read(snap_path, log_path)
+                self._write_snapshot(draft_id, snap_path, log_path, state)
+
+    def compact(self, draft_id: str, state: dict) -> None:
+        """Write `state` as the snapshot and empty the journal."""
+        snap_path, log_path = self._paths(draft_id)
+        os.makedirs(self.root, exist_ok=True)
+        with _lock(draft_id):
+            self._write_snapshot(draft_id, snap_path, log_path, state)
+
+    def _write_snapshot(self, draft_id, snap_path, log_path, state) -> None:
+        tmp = snap_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write(_dumps(state))
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, snap_path)
+        if os.path.exists(log_path):
+            os.remove(log_path)
+        _journal_lines[draft_id] = 0
+
+    def delete(self, draft_id: str) -> None:
+        with _lock(draft_id):
+            for path in self._paths(draft_id) + (self._paths(draft_id)[0] + ".tmp",):
+                if os.path.exists(path):
+                    os.remove(path)
+            _journal_lines.pop(draft_id, None)
+
+    def prune(self, max_age_days: float = DRAFT_MAX_AGE_DAYS, now: float = None) -> int:
+        """Delete drafts last written more than `max_age_days` ago; returns how many."""
+        cutoff = (now or time.time()) - max_age_days * 86400
+        newest = {}                                  # draft id -> latest mtime of its files
+        try:
+            entries = list(os.scandir(self.root))
+        except FileNotFoundError:
+            return 0
+        for entry in entries:
+            m = _DRAFT_FILE.match(entry.name)
+            if m:
+                try:
+                    mtime = entry.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+                newest[m.group(1)] = max(mtime, newest.get(m.group(1), 0))
+        stale = [did for did, mtime in newest.items() if mtime < cutoff]
+        for did in stale:
+            self.delete(did)
+        return len(stale)
+
+    def prune_if_due(self) -> int:
+        """prune(), unless this process already did so in the last PRUNE_EVERY seconds."""
+        now = time.time()
+        with _locks_guard:
+            if now - _last_prune.get(self.root, 0) < PRUNE_EVERY:
+                return 0
+            _last_prune[self.root] = now
+        return self.prune(now=now)
+
+
+# ---------------- changes of one session ----------------
+def pending_records(lf, budget, id_info, saved: dict) -> list:
+    """Journal records for what changed since the last call.
+
+    `saved` holds a copy of the id_info last written (kept in the session)
+    and is updated in place; logframe and budget changes come from the
+    store / table, budget lines keyed by uid.
+    """
+    reloaded, changes = lf.drain_changes()
+    records = [{"op": "load", "kind": kind, "items": lf.items(kind)} for kind in KINDS if kind in reloaded]
+    for op, kind, item_id in changes:
+        if op == "del":
+            records.append({"op": "del", "kind": kind, "id": item_id})
+        elif lf.get(item_id) is not None:
+            records.append({"op": op, "kind": kind, "item": lf.get(item_id)})
+    budget_reloaded, budget_changes = budget.drain_changes()
+    if budget_reloaded:
+        records.append({"op": "budget", "rows": budget.rows_by_uid()})
+    for op, uid in budget_changes:
+        if op == "del":
+            records.append({"op": "budget_del", "uid": uid})
+        elif (pos := budget.position_of(uid)) is not None:
+            records.append({"op": "budget_" + op, "uid": uid, "row": budget.row(pos)})
+    if id_info is not None and id_info != saved.get("id_info") and (any(id_info.values()) or "id_info" in saved):
+        saved["id_info"] = dict(id_info)
+        records.append({"op": "id_info", "value": id_info})
+    return records
@@ -0,0 +1,164 @@
+# excel_export.py
+# "Generate Excel File": the application workbook (Identification, Summary,
+# KPI Matrix, Workplan, Budget) built in openpyxl write-only mode.
+#
+# Rows are streamed sheet by sheet with their number formats already set on the
+# cells, so there is no in-memory object graph to walk a second time; the zip is
+# written straight into the download buffer. Per-sheet build times are recorded.
+import math
+import time
+from io import BytesIO
+from typing import NamedTuple
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+
+from currency import REPORTING_CURRENCY, format_unconverted, load_rates
+from formatting import fmt_dd_mmm_yyyy
+
+MONEY_FORMAT = "#,##0.00"
+
+IDENTIFICATION_ROWS = (
+    ("Project title", "title"),
+    ("Principal Investigator (PI) name", "pi_name"),
+    ("PI email", "pi_email"),
+    ("Institution / Organization", "institution"),
+    ("Project start date", "start_date"),
+    ("Project end date", "end_date"),
+    ("Contact person (optional)", "contact_name"),
+    ("Contact email", "contact_email"),
+    ("Contact phone", "contact_phone"),
+)
+
+
+class WorkbookExport(NamedTuple):
+    data: BytesIO                 # ready for st.download_button
+    timings: dict                 # {"Identification": seconds, ..., "save": seconds}
+
+
+def _money(ws, value):
+    cell = WriteOnlyCell(ws, value=value)
+    cell.number_format = MONEY_FORMAT
+    return cell
+
+
+# ---------------- sheets ----------------
+def _identification(ws, app):
+    id_info = app["id_info"] or {}
+    ws.append(["Field", "Value"])
+    for label, key in IDENTIFICATION_ROWS:
+        value = id_info.get(key, "")
+        ws.append([label, fmt_dd_mmm_yyyy(value) if key.endswith("_date") else value])
+    # read-only summary values
+    converted = app["budget"].converted(load_rates())
+    ws.append([f"Funding requested (from Budget, {converted.currency})", f"{converted.grand:,.2f}"])
+    if converted.unconverted:
+        ws.append(["Not included (no exchange rate)", format_unconverted(converted.unconverted)])
+    ws.append(["Outputs (count)", len(app["outputs"])])
+    ws.append(["KPIs (count)", len(app["kpis"])])
+
+
+def _summary(ws, app):
+    ws.append(["Level", "Text / Title", "Parent ID", "Assumptions"])
+    for row in app["impacts"]:
+        ws.append([row.get("level", "Goal"), row.get("name", ""), "", ""])
+    for row in app["outcomes"]:
+        ws.append([row.get("level", "Outcome"), row.get("name", ""), row.get("parent_id", ""), ""])
+    for row in app["outputs"]:
+        ws.append([row.get("level", "Output"), row.get("name", ""), row.get("parent_id", ""),
+                   row.get("assumptions", "")])
+
+
+def _kpi_matrix(ws, app):
+    ws.append(["Parent Level", "Parent (label)", "KPI", "Baseline", "Target",
+               "Start Date", "End Date", "Linked to Payment", "Means of Verification"])
+    out_nums, kpi_nums = app["numbering"].outputs, app["numbering"].kpis
+    output_title = {o["id"]: (o.get("name") or "Output") for o in app["outputs"]}
+    for k in app["kpis"]:  # keep order as-is
+        pid = k.get("parent_id", "")
+        ws.append([
+            "Output",
+            f"Output {out_nums.get(pid, '')} — {output_title.get(pid, '')}",
+            f"KPI {kpi_nums.get(k['id'], '')} — {k.get('name', '')}",
+            k.get("baseline", ""),
+            k.get("target", ""),
+            fmt_dd_mmm_yyyy(k.get("start_date")),
+            fmt_dd_mmm_yyyy(k.get("end_date")),
+            "Yes" if k.get("linked_payment") else "No",
+            k.get("mov", ""),
+        ])
+
+
+def _workplan(ws, app):
+    ws.append(["Activity ID", "Activity #", "Output", "Activity", "Owner", "Start", "End", "Status",
+               "% complete", "Linked KPIs", "Milestones", "Notes", "Dependencies"])
+    act_nums = app["numbering"].activities
+    id_to_output = {o["id"]: (o.get("name") or "Output") for o in app["outputs"]}
+    id_to_kpi = {k["id"]: (k.get("name") or "") for k in app["kpis"]}
+    for a in app["workplan"]:
+        ws.append([
+            a["id"],
+            act_nums.get(a["id"], ""),
+            id_to_output.get(a.get("output_id"), ""),
+            a.get("name", ""), a.get("owner", ""),
+            fmt_dd_mmm_yyyy(a.get("start")), fmt_dd_mmm_yyyy(a.get("end")),
+            a.get("status", ""), a.get("progress", 0),
+            ", ".join(id_to_kpi.get(i, "") for i in (a.get("kpi_ids") or [])),
+            " | ".join(a.get("milestones") or []),
+            a.get("notes", ""),
+            ", ".join(filter(None, a.get("dependencies") or [])),
+        ])
+
+
+def _budget(ws, app):
+    # columns: OutputID, Output, Item, Category, Unit, Qty, Unit Cost, Currency, Total,
+    # Total in the reporting currency ("no rate" where fx_rates.csv has none)
+    budget = app["budget"]
+    ws.append(["OutputID", "Output", "Item", "Category", "Unit", "Qty", "Unit Cost", "Currency", "Total",
+               f"Total ({REPORTING_CURRENCY})"])
+    id_to_output_name = {o["id"]: (o.get("name") or "Output") for o in app["outputs"]}
+    converted = load_rates().convert(budget.total, budget.currency).tolist()
+    for (out_id, item, cat, unit, qty, unit_cost, curr, total), conv in zip(budget.rows(), converted):
+        ws.append([out_id, id_to_output_name.get(out_id, ""), item, cat, unit,
+                   _money(ws, qty), _money(ws, unit_cost), curr, _money(ws, total),
+                   "no rate" if math.isnan(conv) else _money(ws, conv)])
+
+
+SHEETS = (
+    ("Identification", _identification),
+    ("Summary", _summary),
+    ("KPI Matrix", _kpi_matrix),
+    ("Workplan", _workplan),
+    ("Budget", _budget),
+)
+
+
+# ---------------- entry point ----------------
+def build_application_workbook(*, id_info, impacts, outcomes, outputs, kpis, workplan, budget,
+                               numbering, progress=None) -> WorkbookExport:
+    """Write the five application sheets in one pass; `numbering` is a logframe Numbering.
+
+    `progress(fraction, step)`, if given, is called before each sheet and before saving.
+    """
+    app = {
+        "id_info": id_info, "impacts": impacts, "outcomes": outcomes, "outputs": outputs,
+        "kpis": kpis, "workplan": workplan, "budget": budget, "numbering": numbering,
+    }
+    timings = {}
+    wb = Workbook(write_only=True)
+    n_steps = len(SHEETS) + 1
+    for i, (title, write) in enumerate(SHEETS):
+        if progress:
+            progress(i / n_steps, title)
+        t0 = time.perf_counter()
+        write(wb.create_sheet(title), app)
+        timings[title] = time.perf_counter() - t0
+
+    if progress:
+        progress(len(SHEETS) / n_steps, "save")
+    t0 = time.perf_counter()
+    buf = BytesIO()
+    wb.save(buf)
+    buf.seek(0)
+    timings["save"] = time.perf_counter() - t0
+    return WorkbookExport(buf, timings)
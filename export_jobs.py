@@ -0,0 +1,72 @@
+# export_jobs.py
+# The Export tab's background jobs (see jobs.py): snapshot the application,
+# key it by a hash of that snapshot, and build the Excel / Word file off the
+# script thread.
+#
+# Jobs must never touch st.session_state or the live LogframeStore (the
+# applicant keeps editing while they run), so submit_* copy what the build
+# needs first. The key is the content hash, so pressing "Generate" twice on an
+# unchanged application returns the running (or finished) job instead of
+# building the file again. Each session passes itself as the job's subscriber
+# (see jobs.py), so its Cancel does not stop another session's identical export.
+import copy
+import hashlib
+import json
+
+from currency import load_rates
+from jobs import get_job_runner
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+def _hash(obj) -> str:
+    blob = json.dumps(obj, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+# ---------------- Excel ----------------
+def excel_inputs(lf, id_info: dict, budget) -> dict:
+    """Deep copy of everything build_application_workbook reads (numbering as plain dicts)."""
+    nums = lf.numbering()
+    inputs = {kind: copy.deepcopy(lf.items(kind))
+              for kind in ("impacts", "outcomes", "outputs", "kpis", "workplan")}
+    inputs.update(
+        id_info=copy.deepcopy(id_info or {}),
+        budget=budget.copy(),
+        numbering=nums._replace(outputs=dict(nums.outputs), kpis=dict(nums.kpis),
+                                activities=dict(nums.activities)),
+    )
+    return inputs
+
+
+def build_excel(inputs: dict, progress=None) -> tuple:
+    """Job body: (xlsx bytes, {sheet: seconds})."""
+    from excel_export import build_application_workbook   # pulls in openpyxl
+
+    export = build_application_workbook(**inputs, progress=progress)
+    return export.data.getvalue(), export.timings
+
+
+def submit_excel(lf, id_info: dict, budget, subscriber=None):
+    inputs = excel_inputs(lf, id_info, budget)
+    key = "xlsx:" + _hash(dict(inputs, numbering=inputs["numbering"][1:],   # not the versions
+                               budget=inputs["budget"].rows(), fx=load_rates().version))
+    return get_job_runner().submit(key, build_excel, inputs, label="Excel workbook", subscriber=subscriber)
+
+
+# ---------------- Word ----------------
+def build_docx(payload: dict, progress=None) -> bytes:
+    """Job body: the logframe .docx bytes (from the content-hash cache when unchanged)."""
+    from logframe_docx import render_logframe_docx
+
+    return render_logframe_docx(payload, progress)
+
+
+def submit_docx(lf, subscriber=None):
+    """Raises ModuleNotFoundError when python-docx is missing (before anything is queued)."""
+    from logframe_docx import logframe_content_hash, logframe_payload
+
+    payload = logframe_payload(lf)
+    key = "docx:" + logframe_content_hash(payload)
+    return get_job_runner().submit(key, build_docx, payload, label="Word logframe", subscriber=subscriber)
@@ -0,0 +1,25 @@
+# formatting.py
+# Label / date / money helpers shared by app.py and the import/export modules.
+import re
+
+from dates import DATE_FORMATS, fmt_dd_mmm_yyyy, parse_date as parse_date_like  # noqa: F401  (re-exported)
+
+def strip_label_prefix(text: str, kind: str) -> str:
+    """
+    Remove labels like 'Activity 1.2 — ' or 'KPI 1.2.3: ' from a string.
+    Accepts separators '—', ':', or '-'.
+    """
+    if not isinstance(text, str):
+        return text
+    pat = rf'^\s*{kind}\s+\d+(?:\.\d+)*\s*[—:\-]\s*'
+    return re.sub(pat, '', text).strip()
+
+def fmt_money(val) -> str:
+    """Return number with thousands dot and 2 decimals, e.g., 1.234.567,89."""
+    try:
+        x = float(val)
+    except (TypeError, ValueError):
+        return ""
+    # First format in US style, then swap separators
+    s = f"{x:,.2f}"                  # -> 1,234,567.89
+    return s.replace(",", "␟").replace(".", ",").replace("␟", ".")
@@ -0,0 +1,315 @@
+# import_export.py
+# Table-level CSV / Excel import and export for any model in db.py.
+#
+#   df_from_query(session, Project, fields)      -> DataFrame of those columns
+#   to_csv_download(df, "projects.csv")          -> (bytes, file name) for st.download_button
+#   upsert_from_df(session, Project, df, ...)    -> (created, updated)
+#
+# Imports are validated column-wise (required / enum / date / numeric) before
+# anything is written, existing rows are found with chunked IN (...) lookups on
+# the id or the model's natural key (e.g. indicator_id + period_id for targets
+# and actuals), and rows go in through bulk_insert_mappings /
+# bulk_update_mappings in batches inside a single transaction. Exports are
+# written in row chunks.
+import csv
+from typing import Iterator
+
+import pandas as pd
+from sqlalchemy import (
+    Boolean, Date, DateTime, Enum as SAEnum, Float, Integer, UniqueConstraint, select, tuple_,
+)
+
+CHUNK_ROWS = 50_000        # rows per read / write chunk
+BATCH_SIZE = 5_000         # rows per bulk insert / update call
+LOOKUP_CHUNK = 500         # keys per IN (...) lookup of existing rows
+TRUE_STRINGS = {"true", "1", "yes", "y", "t"}
+
+
+class ImportValidationError(ValueError):
+    """Raised by upsert_from_df; `errors` is a DataFrame of (row, field, problem)."""
+
+    def __init__(self, errors: pd.DataFrame):
+        self.errors = errors
+        super().__init__(f"{len(errors)} problem(s) in {errors['row'].nunique()} row(s)")
+
+
+# ---------------- reading ----------------
+def iter_upload_chunks(file, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Yield DataFrames of at most `chunk_rows` rows from a CSV or XLSX upload/path."""
+    name = str(getattr(file, "name", file)).lower()
+    if name.endswith(".xlsx"):
+        from openpyxl import load_workbook
+
+        ws = load_workbook(file, read_only=True, data_only=True).worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+        header = [str(h).strip() if h is not None else "" for h in next(rows, ())]
+        buf = []
+        for row in rows:
+            buf.append(row)
+            if len(buf) >= chunk_rows:
+                yield pd.DataFrame(buf, columns=header, dtype=object)
+                buf = []
+        if buf or not header:
+            yield pd.DataFrame(buf, columns=header, dtype=object)
+        return
+    yield from pd.read_csv(file, chunksize=chunk_rows, dtype=object, skipinitialspace=True)
+
+
+def read_upload(file, chunk_rows: int = CHUNK_ROWS) -> pd.DataFrame:
+    """Whole CSV / XLSX upload as one DataFrame (read in chunks, values as text/objects)."""
+    chunks = list(iter_upload_chunks(file, chunk_rows))
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+
+# ---------------- export ----------------
+def _plain(df: pd.DataFrame) -> pd.DataFrame:
+    """Enum members -> their values (so CSV cells read 'planned', not 'Status.planned')."""
+    for col in df.columns:
+        first = df[col].dropna().head(1)
+        if len(first) and hasattr(first.iloc[0], "value"):
+            df[col] = df[col].map(lambda v: getattr(v, "value", v))
+    return df
+
+
+def _table_select(model, fields):
+    table = model.__table__
+    return select(*(table.c[f] for f in fields)).order_by(*table.primary_key.columns)
+
+
+def df_from_query(session, model, fields) -> pd.DataFrame:
+    """The given columns of every row of `model`, ordered by primary key, in one query."""
+    rows = session.connection().execute(_table_select(model, fields)).all()   # Core: no ORM row loading
+    return _plain(pd.DataFrame(rows, columns=list(fields)))
+
+
+def iter_csv(df: pd.DataFrame, chunk_rows: int = CHUNK_ROWS) -> Iterator[str]:
+    """CSV text of `df` in chunks of `chunk_rows` rows (header in the first chunk)."""
+    if df.empty:
+        yield df.to_csv(index=False)
+        return
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(index=False, header=(start == 0))
+
+
+def to_csv_download(df: pd.DataFrame, filename: str):
+    """(utf-8 CSV bytes, filename) for st.download_button."""
+    return "".join(iter_csv(df)).encode("utf-8"), filename
+
+
+def write_query_csv(session, model, fields, fh, chunk_rows: int = CHUNK_ROWS) -> int:
+    """Stream `fields` of every `model` row to a text file handle without loading the table."""
+    writer = csv.writer(fh)
+    writer.writerow(fields)
+    result = session.connection().execute(
+        _table_select(model, fields).execution_options(yield_per=chunk_rows)
+    )
+    n = 0
+    for part in result.partitions():
+        writer.writerows([getattr(v, "value", v) for v in row] for row in part)
+        n += len(part)
+    return n
+
+
+# ---------------- validation ----------------
+def _blank_to_na(s: pd.Series) -> pd.Series:
+    # text columns are `str` on pandas 3 and `object` before; xlsx mixes numbers in
+    if s.dtype == object or pd.api.types.is_string_dtype(s):
+        try:
+            stripped = s.str.strip()             # NaN for non-string cells (numbers from xlsx)
+        except AttributeError:                   # no strings in the column at all
+            return s
+        s = s.where(stripped.isna(), stripped)
+        s = s.mask(s == "")
+    return s
+
+
+def _parse_dates(s: pd.Series) -> pd.Series:
+    """Vectorised date parse: ISO first, then any remaining cells day-first."""
+    out = pd.to_datetime(s, errors="coerce", format="ISO8601")
+    rest = out.isna() & s.notna()
+    if rest.any():
+        out[rest] = pd.to_datetime(s[rest].astype(str), errors="coerce", format="mixed", dayfirst=True)
+    return out
+
+
+def _model_columns(model) -> dict:
+    return {c.key: c for c in model.__table__.columns}
+
+
+def _defaults(model):
+    """Required / enum / date fields implied by the model's columns."""
+    required, enums, dates = [], {}, []
+    for name, col in _model_columns(model).items():
+        if isinstance(col.type, SAEnum):
+            enums[name] = set(col.type.enums)
+        if isinstance(col.type, (Date, DateTime)):
+            dates.append(name)
+        if not col.nullable and not col.primary_key and col.default is None:
+            required.append(name)
+    return required, enums, dates
+
+
+def _validate(df, model, is_new, required_fields, enum_fields, date_fields):
+    """Coerce columns in place; returns a DataFrame of (row, field, problem)."""
+    cols = _model_columns(model)
+    problems = []
+
+    def flag(mask, field, problem):
+        if mask.any():
+            problems.append(pd.DataFrame({"row": df.index[mask] + 2, "field": field, "problem": problem}))
+
+    for f in required_fields:
+        if f in df:
+            flag(df[f].isna(), f, "required")
+        else:
+            flag(is_new, f, "required (column missing)")
+    for f, allowed in enum_fields.items():
+        if f in df:
+            flag(df[f].notna() & ~df[f].isin(allowed), f, f"not one of {sorted(allowed)}")
+    for f in date_fields:
+        if f in df:
+            parsed = _parse_dates(df[f])
+            flag(df[f].notna() & parsed.isna(), f, "not a date")
+            df[f] = parsed.dt.date if isinstance(cols[f].type, Date) else parsed.dt.to_pydatetime()
+    for f in df.columns:
+        typ = cols[f].type
+        if f in date_fields or isinstance(typ, SAEnum):
+            continue
+        if isinstance(typ, Boolean):
+            df[f] = df[f].map(lambda v: v if v is None or isinstance(v, bool) or pd.isna(v)
+                              else str(v).strip().lower() in TRUE_STRINGS)
+        elif isinstance(typ, (Integer, Float)):
+            num = pd.to_numeric(df[f], errors="coerce")
+            flag(df[f].notna() & num.isna(), f, "not a number")
+            if isinstance(typ, Integer):
+                fractional = num.notna() & (num % 1 != 0)
+                flag(fractional, f, "not a whole number")
+                if not fractional.any():
+                    num = num.astype("Int64")
+            df[f] = num
+    return (pd.concat(problems, ignore_index=True).sort_values(["row", "field"], ignore_index=True)
+            if problems else pd.DataFrame(columns=["row", "field", "problem"]))
+
+
+def _records(df: pd.DataFrame, enum_classes: dict) -> list:
+    out = df.astype(object).where(df.notna(), None)
+    for f, enum_cls in enum_classes.items():
+        if f in out:
+            out[f] = out[f].map({m.value: m for m in enum_cls}).where(out[f].notna(), None)
+    cols = list(out.columns)
+    return [dict(zip(cols, row)) for row in out.itertuples(index=False, name=None)]
+
+
+# ---------------- upsert ----------------
+def natural_key(model) -> tuple:
+    """Columns of the model's unique constraint (e.g. indicator_id, period_id), or () if it has none."""
+    for c in sorted((c for c in model.__table__.constraints if isinstance(c, UniqueConstraint)),
+                    key=lambda c: c.name or ""):
+        return tuple(col.key for col in c.columns)
+    return ()
+
+
+def _existing_ids(session, model, df: pd.DataFrame, key_fields, id_field: str) -> pd.Series:
+    """Id of the stored row each row of `df` matches on `key_fields` (NA where none).
+
+    Keys are looked up LOOKUP_CHUNK at a time with IN (...), so sparse or
+    scattered ids never pull in the rows between them.
+    """
+    cols = _model_columns(model)
+    keys = df[list(key_fields)].copy()
+    for k in key_fields:
+        if isinstance(cols[k].type, Integer):
+            keys[k] = pd.to_numeric(keys[k], errors="coerce").astype("Int64")
+    wanted = list(keys.dropna().drop_duplicates().astype(object).itertuples(index=False, name=None))
+
+    pk = getattr(model, id_field)
+    key_cols = [getattr(model, k) for k in key_fields]
+    match = key_cols[0] if len(key_cols) == 1 else tuple_(*key_cols)
+    found = []
+    for i in range(0, len(wanted), LOOKUP_CHUNK):
+        chunk = wanted[i:i + LOOKUP_CHUNK]
+        if len(key_cols) == 1:
+            chunk = [k[0] for k in chunk]
+        found += session.execute(select(*key_cols, pk.label("_id")).where(match.in_(chunk))).all()
+    found = pd.DataFrame(found, columns=[*key_fields, "_id"]).astype({"_id": "Int64"})
+    for k in key_fields:
+        if isinstance(cols[k].type, Integer):
+            found[k] = found[k].astype("Int64")
+    ids = keys.merge(found, how="left", on=list(key_fields), validate="many_to_one")["_id"]
+    ids.index = df.index
+    return ids
+
+
+def upsert_from_df(session, model, df: pd.DataFrame, id_field: str = "id", *,
+                   key_fields=None,
+                   enum_fields: dict | None = None, date_fields=None, required_fields=None,
+                   create_missing: bool = True, update_existing: bool = True,
+                   batch_size: int = BATCH_SIZE):
+    """Insert new rows and update existing ones from a DataFrame.
+
+    Rows are matched on `key_fields`; by default the model's natural key when
+    the file has all of its columns (so targets / actuals match on indicator_id
+    + period_id, whatever their id), else `id_field`. Unknown columns are
+    ignored. Required / enum / date fields default to what the model declares.
+    Nothing is written if any row fails validation (ImportValidationError).
+    Returns (created, updated).
+    """
+    cols = _model_columns(model)
+    req_d, enum_d, date_d = _defaults(model)
+    required_fields = list(req_d if required_fields is None else required_fields)
+    enum_fields = dict(enum_d if enum_fields is None else enum_fields)
+    date_fields = list(date_d if date_fields is None else date_fields)
+
+    df = df.rename(columns=lambda c: str(c).strip())
+    df = df[[c for c in df.columns if c in cols]].copy()
+    df.index = pd.RangeIndex(len(df))
+    for c in df.columns:
+        df[c] = _blank_to_na(df[c])
+    if df.empty:
+        return 0, 0
+
+    if key_fields is None:
+        natural = natural_key(model)
+        key_fields = natural if natural and all(k in df for k in natural) else (id_field,)
+    key_fields = tuple(key_fields)
+    if id_field in df:
+        df[id_field] = pd.to_numeric(df[id_field], errors="coerce").astype("Int64")
+    if all(k in df for k in key_fields):
+        matched = _existing_ids(session, model, df, key_fields, id_field)
+        is_existing = matched.notna()
+        # a row matched on its natural key is updated under the stored id
+        df[id_field] = matched.where(is_existing, df[id_field] if id_field in df else pd.NA)
+    else:
+        is_existing = pd.Series(False, index=df.index)
+    is_new = ~is_existing
+
+    errors = _validate(df, model, is_new, required_fields, enum_fields, date_fields)
+    if len(errors):
+        raise ImportValidationError(errors)
+
+    enum_classes = {f: cols[f].type.enum_class for f in enum_fields
+                    if f in df and getattr(cols[f].type, "enum_class", None)}
+    created = updated = 0
+    try:
+        if create_missing and is_new.any():
+            new = df[is_new]
+            if id_field in new:  # rows without an id get one from the database
+                with_id, without_id = new[new[id_field].notna()], new[new[id_field].isna()]
+                batches = [with_id, without_id.drop(columns=[id_field])]
+            else:
+                batches = [new]
+            for part in batches:
+                recs = _records(part, enum_classes)
+                for i in range(0, len(recs), batch_size):
+                    session.bulk_insert_mappings(model, recs[i:i + batch_size])
+                created += len(recs)
+        if update_existing and is_existing.any():
+            recs = _records(df[is_existing], enum_classes)
+            for i in range(0, len(recs), batch_size):
+                session.bulk_update_mappings(model, recs[i:i + batch_size])
+            updated = len(recs)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return created, updated
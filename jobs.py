@@ -0,0 +1,151 @@
+# jobs.py
+# Background jobs for the Streamlit server (the Export tab's Excel / Word builds).
+#
+# One JobRunner per server process (get_job_runner, via st.cache_resource) runs
+# jobs on a small thread pool, so the script run that submits a job finishes
+# straight away and the applicant can keep editing. Jobs are keyed by a content
+# hash: submitting a key that is queued, running or done returns that job
+# instead of doing the work again. A job function receives a
+# `progress(fraction, step)` callback; after cancel() that callback raises
+# JobCancelled, so the build stops at its next sheet / section.
+# Identical exports from different sessions share one job, so each submit
+# names its subscriber (the session) and cancel(subscriber) only withdraws that
+# one: the job is stopped once nobody is waiting for it any more.
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+log = logging.getLogger(__name__)
+
+JOB_WORKERS = 2
+JOB_KEEP_SECONDS = 30 * 60        # finished jobs (and their bytes) are kept this long
+JOB_KEEP_MAX = 64
+
+
+class JobCancelled(Exception):
+    """Raised inside a job by its progress callback after cancel()."""
+
+
+class Job:
+    """One submitted job; `result` is the job function's return value once it is done."""
+
+    QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+    def __init__(self, key: str, label: str):
+        self.key = key
+        self.label = label
+        self.status = Job.QUEUED
+        self.progress = 0.0
+        self.step = ""
+        self.result = None
+        self.error = None
+        self.started = self.finished = None
+        self._cancel = threading.Event()
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return self.status in (Job.QUEUED, Job.RUNNING)
+
+    @property
+    def seconds(self):
+        """Run time so far (or in total, once finished); None while queued."""
+        return (self.finished or time.time()) - self.started if self.started else None
+
+    @property
+    def cancelling(self) -> bool:
+        return self._cancel.is_set()
+
+    def subscribe(self, subscriber) -> bool:
+        """Add a waiter; False once the job is being cancelled (submit a new one instead)."""
+        with self._lock:
+            if self._cancel.is_set():
+                return False
+            if subscriber is not None:
+                self._subscribers.add(subscriber)
+            return True
+
+    def cancel(self, subscriber=None) -> bool:
+        """Withdraw `subscriber` (None: every one); the job stops when none is left. Returns whether it does."""
+        with self._lock:
+            if subscriber is None:
+                self._subscribers.clear()
+            else:
+                self._subscribers.discard(subscriber)
+            if not self._subscribers:
+                self._cancel.set()
+            return self._cancel.is_set()
+
+    def report(self, fraction: float, step: str = "") -> None:
+        """The progress callback handed to the job function."""
+        if self._cancel.is_set():
+            raise JobCancelled(self.label)
+        self.progress = max(0.0, min(1.0, fraction))
+        self.step = step
+
+
+class JobRunner:
+    """Thread pool plus a registry of jobs by key."""
+
+    def __init__(self, workers: int = JOB_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="glide-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            return self._jobs.get(key)
+
+    def submit(self, key: str, fn, *args, label: str = "", subscriber=None) -> Job:
+        """Run `fn(*args, progress=...)` in the pool unless a live or finished job has this key.
+
+        `subscriber` (e.g. a session id) is added to the job's waiters either way.
+        """
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(key)
+            if (job is not None and job.status not in (Job.FAILED, Job.CANCELLED)
+                    and job.subscribe(subscriber)):
+                return job
+            job = self._jobs[key] = Job(key, label or key)
+            job.subscribe(subscriber)
+        self._pool.submit(self._run, job, fn, args)
+        return job
+
+    def _run(self, job: Job, fn, args) -> None:
+        job.started = time.time()
+        result = error = None
+        try:
+            job.report(0.0, "starting")      # cancelled while still queued
+            job.status = Job.RUNNING
+            result = fn(*args, progress=job.report)
+            status = Job.DONE
+        except JobCancelled:
+            status = Job.CANCELLED
+        except Exception as e:
+            log.exception("job %s failed", job.label)
+            status, error = Job.FAILED, e
+        job.finished = time.time()
+        job.result, job.error = result, error
+        if status == Job.DONE:
+            job.progress, job.step = 1.0, "done"
+        job.status = status                 # last, so readers see a complete job
+
+    def _prune(self) -> None:
+        """Forget finished jobs older than JOB_KEEP_SECONDS, then the oldest beyond JOB_KEEP_MAX."""
+        now = time.time()
+        done = sorted((j for j in self._jobs.values() if not j.active), key=lambda j: j.finished)
+        excess = max(0, len(self._jobs) - JOB_KEEP_MAX)
+        for i, j in enumerate(done):
+            if i < excess or now - j.finished > JOB_KEEP_SECONDS:
+                del self._jobs[j.key]
+
+
+@st.cache_resource(show_spinner=False)
+def get_job_runner() -> JobRunner:
+    """The server's job runner (one thread pool per process)."""
+    return JobRunner()
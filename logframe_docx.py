@@ -0,0 +1,267 @@
+# logframe_docx.py
+# "Generate Word Logframe": Goal / Outcome banners plus one Output x KPI table.
+#
+# The document is built from a plain payload (see logframe_payload):
+#   {"goal": str, "outcome": str,
+#    "outputs": [{"label", "name", "assumptions",
+#                 "kpis": [{"label", "name", "baseline", "target", "start", "end", "mov"}]}]}
+# Rendered bytes are cached by a hash of that payload, so repeated downloads of
+# an unchanged logframe skip python-docx entirely. Calibri 11 is set once on the
+# Normal style and table rows are cloned from a pre-styled prototype row instead
+# of being formatted run by run.
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from copy import deepcopy
+from io import BytesIO
+
+from docx import Document
+from docx.enum.section import WD_ORIENT
+from docx.enum.table import WD_TABLE_ALIGNMENT
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import OxmlElement, parse_xml
+from docx.oxml.ns import nsdecls, qn
+from docx.shared import Cm, Pt
+
+from formatting import fmt_dd_mmm_yyyy
+
+PRIMARY_SHADE = "0A2F41"
+FONT = "Calibri"
+CACHE_SIZE = 32
+
+# run templates: plain, bold, and white bold (header cells)
+_RUN_XML = {
+    "plain":  f'<w:r {nsdecls("w")}><w:t xml:space="preserve"/></w:r>',
+    "bold":   f'<w:r {nsdecls("w")}><w:rPr><w:b/></w:rPr><w:t xml:space="preserve"/></w:r>',
+    "header": f'<w:r {nsdecls("w")}><w:rPr><w:b/><w:color w:val="FFFFFF"/></w:rPr>'
+              f'<w:t xml:space="preserve"/></w:r>',
+}
+_RUNS = {k: parse_xml(v) for k, v in _RUN_XML.items()}
+
+_cache = OrderedDict()            # content hash -> docx bytes
+_cache_lock = threading.Lock()
+
+
+def logframe_payload(lf) -> dict:
+    """Plain-data view of a LogframeStore's Goal/Outcome/Outputs/KPIs (numbered, sorted)."""
+    nums = lf.numbering()
+
+    def _sort_by_num(label):
+        if not label:
+            return (9999,)
+        try:
+            return tuple(int(x) for x in str(label).split("."))
+        except Exception:
+            return (9999,)
+
+    outputs = sorted(lf.items("outputs"), key=lambda o: _sort_by_num(nums.outputs.get(o["id"], "")))
+    return {
+        "goal": (lf.first("impacts") or {}).get("name", ""),
+        "outcome": (lf.first("outcomes") or {}).get("name", ""),
+        "outputs": [
+            {
+                "label": nums.outputs.get(out["id"], ""),
+                "name": out.get("name", ""),
+                "assumptions": out.get("assumptions", "") or "",
+                "kpis": [
+                    {
+                        "label": nums.kpis.get(k["id"], ""),
+                        "name": k.get("name", ""),
+                        "baseline": (k.get("baseline", "") or "").strip(),
+                        "target": (k.get("target", "") or "").strip(),
+                        "start": fmt_dd_mmm_yyyy(k.get("start_date")),
+                        "end": fmt_dd_mmm_yyyy(k.get("end_date")),
+                        "mov": (k.get("mov") or "").strip(),
+                    }
+                    for k in lf.children("kpis", out["id"])
+                ],
+            }
+            for out in outputs
+        ],
+    }
+
+
+def logframe_content_hash(payload: dict) -> str:
+    """Stable hash of the logframe content (what the document is built from)."""
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def render_logframe_docx(payload: dict, progress=None) -> bytes:
+    """Cached build: returns the stored bytes when the content hash was seen before."""
+    key = logframe_content_hash(payload)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    data = build_logframe_docx(payload, progress)
+    with _cache_lock:
+        _cache[key] = data
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return data
+
+
+# ---------------- low-level XML helpers ----------------
+def _add_run(p, text, kind="plain"):
+    """Styled run(s) of `text`; line breaks become <w:br/> as with python-docx add_run."""
+    lines = (text or "").replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    for i, line in enumerate(lines):
+        if i:
+            _add_break(p)
+        r = deepcopy(_RUNS[kind])
+        r[-1].text = line
+        p.append(r)
+
+
+def _add_break(p):
+    r = OxmlElement("w:r")
+    r.append(OxmlElement("w:br"))
+    p.append(r)
+
+
+def _shade(tc, hex_fill):
+    shd = OxmlElement("w:shd")
+    shd.set(qn("w:val"), "clear")
+    shd.set(qn("w:color"), "auto")
+    shd.set(qn("w:fill"), hex_fill)
+    tc.get_or_add_tcPr().append(shd)
+
+
+def _v_merge(tc, restart):
+    vm = OxmlElement("w:vMerge")
+    if restart:
+        vm.set(qn("w:val"), "restart")
+    tc.get_or_add_tcPr().append(vm)
+
+
+def _left(p):
+    pPr = p.get_or_add_pPr()
+    jc = OxmlElement("w:jc")
+    jc.set(qn("w:val"), "left")
+    pPr.append(jc)
+
+
+def _set_text(tc, text, kind="plain"):
+    _add_run(tc.p_lst[0], text, kind)
+
+
+# ---------------- document ----------------
+def _base_document():
+    doc = Document()
+    sec = doc.sections[0]
+    sec.orientation = WD_ORIENT.PORTRAIT
+    for side in ("top_margin", "bottom_margin", "left_margin", "right_margin"):
+        setattr(sec, side, Cm(2.54))
+
+    # Calibri 11 once, on the Normal style (every run inherits it)
+    normal = doc.styles["Normal"]
+    normal.font.name = FONT
+    normal.font.size = Pt(11)
+    rfonts = normal.element.get_or_add_rPr().get_or_add_rFonts()
+    for attr in ("w:ascii", "w:hAnsi", "w:cs"):
+        rfonts.set(qn(attr), FONT)
+    return doc
+
+
+def _add_banner_block(doc, label_text, content_text):
+    """2-row banner: shaded label row, unshaded content row."""
+    t = doc.add_table(rows=2, cols=4)
+    t.style = "Table Grid"
+    t.alignment = WD_TABLE_ALIGNMENT.LEFT
+    c0 = t.rows[0].cells[0].merge(t.rows[0].cells[3])
+    _shade(c0._tc, PRIMARY_SHADE)
+    c0.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.LEFT
+    _set_text(c0._tc, label_text.upper(), "header")
+    c1 = t.rows[1].cells[0].merge(t.rows[1].cells[3])
+    c1.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.LEFT
+    _set_text(c1._tc, content_text or "")
+    doc.add_paragraph("")
+
+
+def _kpi_cell(p, k):
+    label = k.get("label", "")
+    _add_run(p, f"KPI ({label}) — {k.get('name', '')}" if label else k.get("name", ""))
+    _add_break(p)
+    for title, key in (("Baseline", "baseline"), ("Target", "target")):
+        value = (k.get(key) or "").strip()
+        if value:
+            _add_run(p, f"{title}: ", "bold")
+            _add_run(p, value)
+            _add_break(p)
+    sd, ed = k.get("start") or "", k.get("end") or ""
+    if sd or ed:
+        _add_run(p, "Start: ", "bold")
+        _add_run(p, sd or "—")
+        _add_break(p)
+        _add_run(p, "End: ", "bold")
+        _add_run(p, ed or "—")
+
+
+def build_logframe_docx(payload: dict, progress=None) -> bytes:
+    """Build the logframe document (uncached); returns the .docx bytes.
+
+    `progress(fraction, step)`, if given, is called before each Output and before saving.
+    """
+    doc = _base_document()
+
+    # ---- GOAL & OUTCOME banners
+    if payload.get("goal"):
+        _add_banner_block(doc, "GOAL", payload["goal"])
+    if payload.get("outcome"):
+        _add_banner_block(doc, "OUTCOME", payload["outcome"])
+
+    # ---- ONE main table for all Outputs & KPIs
+    tbl = doc.add_table(rows=1, cols=4)
+    tbl.style = "Table Grid"
+    tbl.alignment = WD_TABLE_ALIGNMENT.LEFT
+    hdr = tbl.rows[0]._tr
+    for tc, lab in zip(hdr.tc_lst, ("Output", "KPI", "Means of Verification", "Key Assumptions")):
+        _left(tc.p_lst[0])
+        _set_text(tc, lab, "header")
+        _shade(tc, PRIMARY_SHADE)
+    hdr.get_or_add_trPr().append(OxmlElement("w:tblHeader"))   # repeat header row
+
+    # prototype body row (grid widths + left-aligned paragraphs), cloned per row
+    proto = tbl.add_row()._tr
+    for tc in proto.tc_lst:
+        _left(tc.p_lst[0])
+    tbl._tbl.remove(proto)
+
+    def new_row():
+        tr = deepcopy(proto)
+        tbl._tbl.append(tr)
+        return tr.tc_lst
+
+    outputs = payload.get("outputs", [])
+    for n, out in enumerate(outputs):
+        if progress:
+            progress(n / (len(outputs) + 1), f"Output {out.get('label', '')}")
+        out_title = f"Output {out.get('label', '')} — {out.get('name', '')}"
+        assumptions = out.get("assumptions") or "—"
+        kpis = out.get("kpis") or []
+
+        if not kpis:
+            cells = new_row()
+            for tc, text in zip(cells, (out_title, "—", "—", assumptions)):
+                _set_text(tc, text)
+            continue
+
+        for i, k in enumerate(kpis):
+            cells = new_row()
+            _kpi_cell(cells[1].p_lst[0], k)
+            _set_text(cells[2], (k.get("mov") or "").strip() or "—")
+            if i == 0:
+                _set_text(cells[0], out_title)
+                _set_text(cells[3], assumptions)
+            # Output & Assumptions span the KPI block
+            if len(kpis) > 1:
+                _v_merge(cells[0], restart=(i == 0))
+                _v_merge(cells[3], restart=(i == 0))
+
+    if progress:
+        progress(len(outputs) / (len(outputs) + 1), "save")
+    buf = BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
@@ -0,0 +1,256 @@
+# logframe_store.py
+# In-session store for the Goal -> Outcome -> Output -> KPI / Activity hierarchy.
+#
+# Items stay plain dicts (same shape as before), but they are indexed by id and
+# by parent so lookups, child listings, inserts and deletes no longer scan the
+# whole logframe on every rerun. Output / KPI / Activity numbers are kept here
+# too and only the sibling groups touched by a structural change are renumbered.
+# Changed ids are also recorded until drain_changes(), for the draft autosave.
+import uuid
+from types import MappingProxyType
+from typing import Mapping, NamedTuple
+
+# kinds, in hierarchy order (names match the old st.session_state lists)
+KINDS = ("impacts", "outcomes", "outputs", "kpis", "workplan")
+
+# field holding the parent id for each kind (goals have no parent)
+PARENT_FIELD = {
+    "outcomes": "parent_id",
+    "outputs":  "parent_id",
+    "kpis":     "parent_id",
+    "workplan": "output_id",
+}
+
+# numbered kinds -> kind whose numbers prefix theirs (outputs hang off outcomes)
+NUMBERED = {"outputs": "outcomes", "kpis": "outputs", "workplan": "outputs"}
+
+# kinds removed together with their parent (activities are kept, as before,
+# and simply show up as unassigned)
+CASCADE = {
+    "impacts":  ("outcomes",),
+    "outcomes": ("outputs",),
+    "outputs":  ("kpis",),
+}
+
+
+def generate_id():
+    return str(uuid.uuid4())[:8]
+
+
+class Numbering(NamedTuple):
+    """Read-only label maps ('n' for outputs, 'n.p' for KPIs / activities)."""
+    version: int
+    outputs: Mapping[str, str]
+    kpis: Mapping[str, str]
+    activities: Mapping[str, str]
+
+
+class LogframeStore:
+    """Ordered, indexed container for all logframe items of one application."""
+
+    def __init__(self):
+        self._items = {k: {} for k in KINDS}       # kind -> {id: item}   (insertion ordered)
+        self._children = {k: {} for k in KINDS}    # kind -> {parent_id: {child_id: None}}
+        self._kind_of = {}                         # id -> kind
+        self.version = 0                           # bumped on every structural change
+        self._changes = {}                         # id -> (op, kind) since drain_changes()
+        self._reloaded = set()                     # kinds replaced by load() since then
+
+        # numbering: kind -> {id: label}, plus the sibling groups awaiting renumbering
+        self._labels = {k: {} for k in NUMBERED}
+        self._dirty = set()                        # {(kind, parent_id)}
+        self._rebuild = False
+        self._numbering = Numbering(
+            0,
+            MappingProxyType(self._labels["outputs"]),
+            MappingProxyType(self._labels["kpis"]),
+            MappingProxyType(self._labels["workplan"]),
+        )
+
+    # ---------------- read ----------------
+    def items(self, kind: str) -> list:
+        """All items of a kind, in entry/import order."""
+        return list(self._items[kind].values())
+
+    def count(self, kind: str) -> int:
+        return len(self._items[kind])
+
+    def first(self, kind: str):
+        return next(iter(self._items[kind].values()), None)
+
+    def get(self, item_id):
+        kind = self._kind_of.get(item_id)
+        return self._items[kind].get(item_id) if kind else None
+
+    def kind_of(self, item_id):
+        return self._kind_of.get(item_id)
+
+    def children(self, kind: str, parent_id) -> list:
+        """Items of `kind` whose parent is `parent_id`, in entry order."""
+        ids = self._children[kind].get(parent_id)
+        if not ids:
+            return []
+        by_id = self._items[kind]
+        return [by_id[i] for i in ids]
+
+    def child_count(self, kind: str, parent_id) -> int:
+        return len(self._children[kind].get(parent_id) or ())
+
+    def drain_changes(self):
+        """(reloaded kinds, [(op, kind, id), ...]) since the last call, then forget them.
+
+        op is "add" (item appended, or moved to the end of its kind), "set"
+        (fields changed in place) or "del"; ids appear in the order of their
+        last add, so replaying the adds in order reproduces the item order.
+        """
+        reloaded, changes = self._reloaded, self._changes
+        self._reloaded, self._changes = set(), {}
+        return reloaded, [(op, kind, item_id) for item_id, (op, kind) in changes.items()]
+
+    def numbering(self) -> Numbering:
+        """Current numbering; renumbers only the groups changed since the last call."""
+        if self._numbering.version != self.version:
+            self._renumber()
+            self._numbering = self._numbering._replace(version=self.version)
+        return self._numbering
+
+    # ---------------- write ----------------
+    def add(self, kind: str, item: dict) -> dict:
+        """Append an item (must carry an 'id'); returns it."""
+        item_id = item["id"]
+        if item_id in self._kind_of:
+            self._remove_one(item_id)
+        self._items[kind][item_id] = item
+        self._kind_of[item_id] = kind
+        if kind in PARENT_FIELD:
+            self._link(kind, item.get(PARENT_FIELD[kind]), item_id)
+        self._touch(kind, item)
+        self._changed("add", kind, item_id)
+        self.version += 1
+        return item
+
+    def update(self, item_id, **values) -> None:
+        """Set fields on an item; a changed parent field moves it to the new parent."""
+        item = self.get(item_id)
+        if item is None:
+            return
+        kind = self._kind_of[item_id]
+        pfield = PARENT_FIELD.get(kind)
+        if pfield and pfield in values and values[pfield] != item.get(pfield):
+            self.move(item_id, values.pop(pfield))
+        item.update(values)
+        if self._changes.get(item_id, ("set",))[0] != "add":
+            self._changed("set", kind, item_id)
+
+    def move(self, item_id, new_parent_id) -> None:
+        """Re-parent an item; it goes to the end of its new parent's children."""
+        item = self.get(item_id)
+        kind = self._kind_of.get(item_id)
+        if item is None or kind not in PARENT_FIELD:
+            return
+        pfield = PARENT_FIELD[kind]
+        self._unlink(kind, item.get(pfield), item_id)
+        self._touch(kind, item)
+        item[pfield] = new_parent_id
+        # keep global order consistent with per-parent order
+        del self._items[kind][item_id]
+        self._items[kind][item_id] = item
+        self._link(kind, new_parent_id, item_id)
+        self._touch(kind, item)
+        self._changed("add", kind, item_id)
+        self.version += 1
+
+    def delete(self, item_id) -> None:
+        """Delete an item and its descendants (Goal->Outcome->Output->KPI)."""
+        kind = self._kind_of.get(item_id)
+        if kind is None:
+            return
+        for child_kind in CASCADE.get(kind, ()):
+            for child_id in list(self._children[child_kind].get(item_id) or ()):
+                self.delete(child_id)
+        self._remove_one(item_id)
+        self._changed("del", kind, item_id)
+        self.version += 1
+
+    def load(self, kind: str, items) -> None:
+        """Replace every item of a kind (used by the resume import)."""
+        for item_id in list(self._items[kind]):
+            self._kind_of.pop(item_id, None)
+        self._items[kind] = {}
+        self._children[kind] = {}
+        for item in items:
+            self.add(kind, item)
+        self._reloaded.add(kind)
+        self._changes = {i: c for i, c in self._changes.items() if c[1] != kind}
+        self._rebuild = True
+        self.version += 1
+
+    def clear(self) -> None:
+        for kind in KINDS:
+            self.load(kind, [])
+
+    # ---------------- internals ----------------
+    def _changed(self, op, kind, item_id):
+        self._changes.pop(item_id, None)            # re-insert: keeps the order of last adds
+        self._changes[item_id] = (op, kind)
+
+    def _link(self, kind, parent_id, item_id):
+        self._children[kind].setdefault(parent_id, {})[item_id] = None
+
+    def _unlink(self, kind, parent_id, item_id):
+        siblings = self._children[kind].get(parent_id)
+        if siblings is not None:
+            siblings.pop(item_id, None)
+            if not siblings:
+                del self._children[kind][parent_id]
+
+    def _remove_one(self, item_id):
+        kind = self._kind_of.pop(item_id)
+        item = self._items[kind].pop(item_id)
+        if kind in PARENT_FIELD:
+            self._unlink(kind, item.get(PARENT_FIELD[kind]), item_id)
+        self._touch(kind, item)
+        if kind in self._labels:
+            self._labels[kind].pop(item_id, None)
+
+    def _touch(self, kind, item):
+        """Mark the sibling group of `item` (and groups numbered after it) as stale."""
+        if kind in PARENT_FIELD and kind in NUMBERED:
+            self._dirty.add((kind, item.get(PARENT_FIELD[kind])))
+        # an outcome / output coming or going changes whether its children get numbers
+        for child_kind, numbered_by in NUMBERED.items():
+            if numbered_by == kind:
+                self._dirty.add((child_kind, item["id"]))
+
+    def _renumber(self):
+        if self._rebuild:
+            for labels in self._labels.values():
+                labels.clear()
+            self._dirty = {("outputs", oc_id) for oc_id in self._items["outcomes"]}
+            self._dirty.update(("outputs", pid) for pid in self._children["outputs"])
+            self._rebuild = False
+        # outputs first: a changed output number re-dirties its KPI / activity groups
+        for kind in ("outputs", "kpis", "workplan"):
+            groups = [pid for (k, pid) in self._dirty if k == kind]
+            self._dirty.difference_update((kind, pid) for pid in groups)
+            for parent_id in groups:
+                self._renumber_group(kind, parent_id)
+
+    def _renumber_group(self, kind, parent_id):
+        labels = self._labels[kind]
+        child_ids = self._children[kind].get(parent_id) or {}
+        if kind == "outputs":
+            prefix = "" if parent_id in self._items["outcomes"] else None
+        else:
+            prefix = self._labels["outputs"].get(parent_id)
+        for pos, child_id in enumerate(child_ids, start=1):
+            new = None if prefix is None else (f"{prefix}.{pos}" if prefix else f"{pos}")
+            if labels.get(child_id) == new:
+                continue
+            if new is None:
+                labels.pop(child_id, None)
+            else:
+                labels[child_id] = new
+            if kind == "outputs":
+                self._dirty.add(("kpis", child_id))
+                self._dirty.add(("workplan", child_id))
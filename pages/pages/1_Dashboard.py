@@ -1,6 +1,9 @@
 import streamlit as st
 from sqlalchemy import select
-from db import SessionLocal, Project, ReportingPeriod, BudgetLine, Indicator
+from currency import load_rates
+from db import Project, ReportingPeriod, portfolio_metrics
+from db_session import session_scope
+import profiling
 from ui.streamlit_portfolio_stats import render_portfolio_stats
 from ui.render_projects_list import render_projects_list
 from ui.render_recent_activity import render_recent_activity
@@ -8,20 +11,39 @@ from ui.render_recent_activity import render_recent_activity
 st.set_page_config(page_title="Portfolio Overview", layout="wide")
 st.title("Portfolio Overview")
 
-s = SessionLocal()
-projects     = s.execute(select(Project)).scalars().all()
-periods      = s.execute(select(ReportingPeriod)).scalars().all()
-budget_lines = s.execute(select(BudgetLine)).scalars().all()
-indicators   = s.execute(select(Indicator)).scalars().all()
+@st.cache_data(ttl=30, show_spinner=False)
+def load_metrics(fx_version: str, _rates):
+    """Portfolio totals/counts, aggregated in the database (refreshed every 30s or when the FX rates change).
 
-metrics = {
-    "totalPlanned": sum(b.planned_amount or 0 for b in budget_lines),
-    "totalActual":  sum(b.actual_amount  or 0 for b in budget_lines),
-}
-render_portfolio_stats(metrics, projects, periods, is_loading=False)
+    Cached on `fx_version` alone; `_rates` (unhashed) is the table that version names.
+    """
+    with session_scope() as s:
+        return portfolio_metrics(s, _rates)
 
-left, right = st.columns([2,1], gap="large")
-with left:
-    render_projects_list(projects, show_limit=5)
-with right:
-    render_recent_activity(periods, projects, limit=8)
+with profiling.script_run("Dashboard"):
+    rates = load_rates()
+    m = load_metrics(rates.version, rates)
+    metrics = {
+        "totalPlanned":   m.total_planned,
+        "totalActual":    m.total_actual,
+        "currency":       m.currency,
+        "unconverted":    m.unconverted,
+        "activeProjects": m.active_projects,
+        "openPeriods":    m.open_periods,
+    }
+    render_portfolio_stats(metrics, is_loading=False)
+
+    with session_scope() as s:
+        projects = s.execute(select(Project).limit(5)).scalars().all()
+        periods  = s.execute(
+            select(ReportingPeriod).order_by(ReportingPeriod.due_date.desc()).limit(8)
+        ).scalars().all()
+        period_projects = s.execute(
+            select(Project).where(Project.id.in_({rp.project_id for rp in periods}))
+        ).scalars().all()
+
+        left, right = st.columns([2,1], gap="large")
+        with left:
+            render_projects_list(projects, show_limit=5)
+        with right:
+            render_recent_activity(periods, period_projects, limit=8)
@@ -1,51 +1,67 @@
 # pages/5_Budgets.py
 import streamlit as st
 from sqlalchemy import select
-from db import SessionLocal, Project, Activity, BudgetLine
+from currency import REPORTING_CURRENCY, load_rates
+from db import Project, Activity, BudgetLine
+from db_session import session_scope
+import profiling
 
 st.set_page_config(page_title="Budgets", layout="wide")
 st.title("Budgets")
 
-s = SessionLocal()
+with profiling.script_run("Budgets"), session_scope() as s:
 
-# Choose project
-projects = s.execute(select(Project)).scalars().all()
-if not projects:
-    st.info("Create a project first.")
-    st.stop()
-p = st.selectbox("Project", projects, format_func=lambda x: x.title)
+    # Choose project
+    projects = s.execute(select(Project)).scalars().all()
+    if not projects:
+        st.info("Create a project first.")
+        st.stop()
+    p = st.selectbox("Project", projects, format_func=lambda x: x.title)
 
-# Activities for that project
-acts = s.execute(select(Activity).where(Activity.project_id == p.id)).scalars().all()
-if not acts:
-    st.warning("Add activities first on the Activities page.")
-    st.stop()
+    # Activities for that project
+    acts = s.execute(select(Activity).where(Activity.project_id == p.id)).scalars().all()
+    if not acts:
+        st.warning("Add activities first on the Activities page.")
+        st.stop()
 
-# Add budget line
-st.subheader("Add Budget Line")
-with st.form("new_bl", clear_on_submit=True):
-    a = st.selectbox("Activity", acts, format_func=lambda x: x.title)
-    fy = st.text_input("Fiscal year *", "FY25")
-    planned = st.number_input("Planned amount *", min_value=0.0, value=0.0, step=100.0)
-    actual  = st.number_input("Actual amount",  min_value=0.0, value=0.0, step=100.0)
-    if st.form_submit_button("Save"):
-        if not fy:
-            st.error("Fiscal year is required.")
-        else:
-            s.add(BudgetLine(project_id=p.id, activity_id=a.id, fiscal_year=fy,
-                             planned_amount=planned, actual_amount=actual))
-            s.commit()
-            st.success("Budget line added.")
-            st.experimental_rerun()
+    # Add budget line
+    st.subheader("Add Budget Line")
+    with st.form("new_bl", clear_on_submit=True):
+        a = st.selectbox("Activity", acts, format_func=lambda x: x.title)
+        fy = st.text_input("Fiscal year *", "FY25")
+        planned = st.number_input("Planned amount *", min_value=0.0, value=0.0, step=100.0)
+        actual  = st.number_input("Actual amount",  min_value=0.0, value=0.0, step=100.0)
+        currency = st.text_input("Currency (ISO 4217)", "USD", max_chars=3)
+        if st.form_submit_button("Save"):
+            if not fy:
+                st.error("Fiscal year is required.")
+            else:
+                s.add(BudgetLine(project_id=p.id, activity_id=a.id, fiscal_year=fy,
+                                 planned_amount=planned, actual_amount=actual,
+                                 currency=(currency.strip() or "USD").upper()))
+                s.commit()
+                st.success("Budget line added.")
+                st.rerun()
 
-# List budget lines + totals
-st.subheader("Budget Lines")
-bls = s.execute(select(BudgetLine).where(BudgetLine.project_id == p.id)).scalars().all()
-tot_planned = sum(b.planned_amount for b in bls)
-tot_actual  = sum(b.actual_amount  for b in bls)
-st.write(f"**Totals** — Planned: {tot_planned:,.0f} | Actual: {tot_actual:,.0f}")
+    # List budget lines + totals
+    st.subheader("Budget Lines")
+    bls = s.execute(select(BudgetLine).where(BudgetLine.project_id == p.id)).scalars().all()
+    rates = load_rates()
+    factors = rates.factors([b.currency for b in bls])
+    tot_planned = sum(b.planned_amount * f for b, f in zip(bls, factors) if f == f)   # NaN: no rate
+    tot_actual  = sum(b.actual_amount  * f for b, f in zip(bls, factors) if f == f)
+    st.write(f"**Totals ({REPORTING_CURRENCY})** — Planned: {tot_planned:,.0f} | Actual: {tot_actual:,.0f}")
+    missing = {}                                  # currency -> [planned, actual] without a rate
+    for b, f in zip(bls, factors):
+        if f != f:
+            sums = missing.setdefault(b.currency, [0.0, 0.0])
+            sums[0] += b.planned_amount or 0.0
+            sums[1] += b.actual_amount or 0.0
+    if missing:
+        st.error("No exchange rate in fx_rates.csv, so these lines are not in the totals: "
+                 + "; ".join(f"{cur} {p:,.0f} planned / {a:,.0f} actual" for cur, (p, a) in sorted(missing.items())))
 
-for b in bls:
-    act = next((x for x in acts if x.id == b.activity_id), None)
-    st.write(f"- {b.fiscal_year} | {act.title if act else b.activity_id} "
-             f"| Planned {b.planned_amount:,.0f} | Actual {b.actual_amount:,.0f}")
+    for b in bls:
+        act = next((x for x in acts if x.id == b.activity_id), None)
+        st.write(f"- {b.fiscal_year} | {act.title if act else b.activity_id} "
+                 f"| Planned {b.currency} {b.planned_amount:,.0f} | Actual {b.currency} {b.actual_amount:,.0f}")
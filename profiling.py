@@ -0,0 +1,254 @@
+# profiling.py
+# Phase timings and opt-in instrumentation for app.py and the pages.
+#
+#   streamlit run app.py -- --profile-startup
+#
+# prints one line per script run to stderr with the time spent in each phase
+# (imports, page setup, resume check, each tab, ...). The first run in the
+# process is reported as the cold start: it is the one that pays for first
+# imports and for filling the st.cache_resource entries.
+#
+#   streamlit run app.py -- --instrument        (or GLIDE_INSTRUMENT=1)
+#
+# also collects, per script run, the time spent in @timed functions / timer()
+# blocks and in every SQL statement (db.make_engine hooks the engine), shows it
+# in a sidebar debug panel (ui/debug_panel.py) and appends one JSON line per
+# run to GLIDE_INSTRUMENT_LOG (default instrumentation.jsonl). Statements run
+# many times in one rerun are listed as N+1 suspects.
+#
+# A rerun of a single @st.fragment (profiling.fragment()) is reported as its
+# own run; inside a full script run the fragment body is just a timer.
+# app.py calls begin_run() / end_run() around its top-level code; when
+# st.rerun(), st.stop() or an error skips end_run(), the session's next
+# begin_run() reports the open run as ended early (up to its last phase).
+#
+# Without --instrument, timed() returns functions unchanged, timer() is a
+# nullcontext and no engine hooks are installed.
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+PROFILE_STARTUP = "--profile-startup" in sys.argv[1:]
+INSTRUMENT = "--instrument" in sys.argv[1:] or os.environ.get("GLIDE_INSTRUMENT") == "1"
+INSTRUMENT_LOG = os.environ.get("GLIDE_INSTRUMENT_LOG", "instrumentation.jsonl")
+REPEATED_QUERY_MIN = 5          # same statement this often in one run -> N+1 suspect
+
+_cold_lock = threading.Lock()
+_cold_reported = False
+_log_lock = threading.Lock()
+_local = threading.local()      # .run: script run in progress on this thread; .profile: the same, if instrumented
+_open_lock = threading.Lock()
+_open_runs = {}                 # session -> its run not yet ended (begin_run .. end_run)
+
+
+class RunProfile:
+    """Wall-clock phases of one script run; call mark(name) at the end of each phase."""
+
+    def __init__(self, script: str = "app", fragment: bool = False):
+        self.script = script
+        self.fragment = fragment    # a fragment-only rerun, not the whole script
+        self.ended_early = False    # end_run() was skipped (st.rerun / st.stop / an error)
+        self.session = None         # key in _open_runs
+        self.t0 = self.last = time.perf_counter()
+        self.phases = []
+        self.timers = {}        # name -> [calls, seconds]
+        self.queries = {}       # SQL text -> [calls, seconds]
+
+    def mark(self, name: str) -> None:
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last))
+        self.last = now
+
+    def add_time(self, name: str, seconds: float) -> None:
+        entry = self.timers.setdefault(name, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    def add_query(self, statement: str, seconds: float) -> None:
+        entry = self.queries.setdefault(statement, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    @property
+    def total(self) -> float:
+        return self.last - self.t0
+
+    @property
+    def query_count(self) -> int:
+        return sum(n for n, _ in self.queries.values())
+
+    @property
+    def query_seconds(self) -> float:
+        return sum(sec for _, sec in self.queries.values())
+
+    def repeated_queries(self, min_calls: int = REPEATED_QUERY_MIN) -> list:
+        """(statement, calls, seconds) run at least `min_calls` times, most frequent first."""
+        rows = [(q, n, sec) for q, (n, sec) in self.queries.items() if n >= min_calls]
+        return sorted(rows, key=lambda r: -r[1])
+
+    def format(self, title: str) -> str:
+        parts = " | ".join(f"{name} {sec * 1000:.1f}" for name, sec in self.phases)
+        return f"[profile] {title} {self.total * 1000:.1f} ms: {parts}"
+
+    def to_dict(self) -> dict:
+        ms = lambda sec: round(sec * 1000, 2)
+        return {
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            "script": self.script,
+            "fragment": self.fragment,
+            "ended_early": self.ended_early,
+            "total_ms": ms(self.total),
+            "phases": {name: ms(sec) for name, sec in self.phases},
+            "timers": {name: {"calls": n, "ms": ms(sec)} for name, (n, sec) in self.timers.items()},
+            "queries": {
+                "count": self.query_count,
+                "ms": ms(self.query_seconds),
+                "repeated": [{"statement": q, "calls": n, "ms": ms(sec)}
+                             for q, n, sec in self.repeated_queries()],
+            },
+        }
+
+
+def current():
+    """The run being recorded on this thread (None when instrumentation is off)."""
+    return getattr(_local, "profile", None)
+
+
+def _session_key():
+    """The Streamlit session running on this thread (the thread itself outside Streamlit)."""
+    runner = sys.modules.get("streamlit.runtime.scriptrunner")
+    ctx = runner.get_script_run_ctx(suppress_warning=True) if runner else None
+    return ctx.session_id if ctx else threading.get_ident()
+
+
+def begin_run(script: str = "app", fragment: bool = False) -> RunProfile:
+    """Start timing a script run (call at the very top of the script).
+
+    A run this session began but never ended is reported first, as ended early.
+    """
+    profile = RunProfile(script, fragment)
+    profile.session = _session_key()
+    with _open_lock:
+        stale = _open_runs.get(profile.session)
+    if stale is not None:
+        stale.ended_early = True
+        end_run(stale)
+    with _open_lock:
+        _open_runs[profile.session] = profile
+    _local.run = profile
+    if INSTRUMENT:
+        _local.profile = profile
+    return profile
+
+
+def end_run(profile: RunProfile) -> None:
+    """Report the finished run: stderr line (--profile-startup), JSON log line (--instrument)."""
+    global _cold_reported
+    with _open_lock:
+        if _open_runs.get(profile.session) is profile:
+            del _open_runs[profile.session]
+    _local.run = None
+    if INSTRUMENT:
+        _local.profile = None
+        write_log(profile)
+    if not PROFILE_STARTUP:
+        return
+    if profile.fragment:
+        title = "fragment rerun"
+    else:
+        with _cold_lock:
+            cold, _cold_reported = not _cold_reported, True
+        title = "cold start" if cold else "rerun"
+    if profile.ended_early:
+        title += " (ended early)"
+    print(profile.format(title), file=sys.stderr, flush=True)
+
+
+def write_log(profile: RunProfile, path: str = None) -> None:
+    """Append the run to the JSON-lines log."""
+    line = json.dumps(profile.to_dict(), default=str)
+    with _log_lock, open(path or INSTRUMENT_LOG, "a", encoding="utf-8") as fh:
+        fh.write(line + "\n")
+
+
+@contextmanager
+def script_run(script: str):
+    """A whole page as one run: `with script_run("Reporting"), session_scope() as s:`.
+
+    The run is reported even when st.rerun() / st.stop() / an error ends it.
+    """
+    profile = begin_run(script)
+    try:
+        yield profile
+    finally:
+        profile.mark("page")
+        end_run(profile)
+        if INSTRUMENT:   # after st.stop() Streamlit may refuse new elements, so log first
+            from ui.debug_panel import render_debug_panel
+            render_debug_panel(profile)
+
+
+def fragment(name: str = None):
+    """Decorator for @st.fragment bodies: a fragment-only rerun is reported as its own run."""
+    def deco(func):
+        if not (INSTRUMENT or PROFILE_STARTUP):
+            return func
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if getattr(_local, "run", None) is not None:     # drawn by the full script run
+                with timer(f"fragment {label}"):
+                    return func(*args, **kwargs)
+            profile = begin_run(label, fragment=True)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.mark("fragment")
+                end_run(profile)
+        return wrapper
+    return deco
+
+
+# ---------------- timers ----------------
+@contextmanager
+def _timer(name):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile = current()
+        if profile is not None:
+            profile.add_time(name, time.perf_counter() - t0)
+
+
+def timer(name: str):
+    """Add the wall time of a `with` block to the current run under `name`."""
+    return _timer(name) if INSTRUMENT else nullcontext()
+
+
+def timed(name: str = None):
+    """Decorator form of timer(); the function is returned unchanged when instrumentation is off."""
+    def deco(func):
+        if not INSTRUMENT:
+            return func
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _timer(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def record_query(statement: str, seconds: float) -> None:
+    """Engine hook target (db.py): count one executed statement against the current run."""
+    profile = current()
+    if profile is not None:
+        profile.add_query(statement, seconds)
@@ -0,0 +1,195 @@
+# queries.py
+# Read / write helpers on top of db.py for the pages.
+#
+# Each loader fetches what a page needs in a single round trip (joins instead of
+# one query per row) and returns plain values, so the pages never trigger lazy
+# loads while rendering.
+from typing import NamedTuple
+
+import pandas as pd
+from sqlalchemy import String, select, and_, or_, func
+
+from db import (
+    Indicator, IndicatorTarget, IndicatorActual, IndicatorMapping, ReportingPeriod,
+    StrategicIndicator, Direction, ON_CONFLICT_INSERT,
+)
+
+
+class StrategicRollup(NamedTuple):
+    summary: pd.DataFrame         # per strategic indicator: checked, on_track
+    trend: pd.DataFrame           # per strategic indicator x period: checked, on_track, share
+
+
+class GridPage(NamedTuple):
+    rows: list                    # tuples, in `fields` order
+    total: int                    # rows matching the filters (all pages)
+    page: int                     # 1-based, clamped to the last page
+    pages: int
+
+
+class ReportingRow(NamedTuple):
+    indicator_id: int
+    name: str
+    unit: str
+    target: float | None          # None = no target row yet
+    actual: float | None          # None = no actual row yet
+
+
+# ---------------- reporting (targets & actuals) ----------------
+def load_reporting_values(session, project_id: int, period_id: int) -> dict:
+    """{indicator_id: ReportingRow} for every indicator of the project, in one query."""
+    t, a = IndicatorTarget, IndicatorActual
+    q = (
+        select(Indicator.id, Indicator.name, Indicator.unit, t.target_value, a.actual_value)
+        .outerjoin(t, and_(t.indicator_id == Indicator.id, t.period_id == period_id))
+        .outerjoin(a, and_(a.indicator_id == Indicator.id, a.period_id == period_id))
+        .where(Indicator.project_id == project_id)
+        .order_by(Indicator.id)
+    )
+    return {row[0]: ReportingRow(*row) for row in session.execute(q)}
+
+
+_UPSERT_CHUNK = 200   # rows matched per SELECT in the fallback (bound-parameter limits)
+
+
+def _upsert(session, model, rows, keys, value_col):
+    """INSERT ... ON CONFLICT (keys) DO UPDATE value_col, falling back to merge-by-key."""
+    if not rows:
+        return
+    insert = ON_CONFLICT_INSERT.get(session.get_bind().dialect.name)
+    if insert is not None:
+        stmt = insert(model).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=keys, set_={value_col: getattr(stmt.excluded, value_col)}
+        )
+        session.execute(stmt)
+        return
+    # other dialects: one SELECT for the existing rows (matched on every key), then update / add
+    existing = {}
+    for i in range(0, len(rows), _UPSERT_CHUNK):
+        match = or_(*(and_(*(getattr(model, k) == r[k] for k in keys)) for r in rows[i:i + _UPSERT_CHUNK]))
+        for obj in session.execute(select(model).where(match)).scalars():
+            existing[tuple(getattr(obj, k) for k in keys)] = obj
+    for r in rows:
+        obj = existing.get(tuple(r[k] for k in keys))
+        if obj is None:
+            session.add(model(**r))
+        else:
+            setattr(obj, value_col, r[value_col])
+
+
+def save_reporting_values(session, period_id: int, targets: dict, actuals: dict) -> int:
+    """Upsert {indicator_id: value} targets and actuals for one period in one transaction.
+
+    Returns the number of values written.
+    """
+    target_rows = [{"indicator_id": i, "period_id": period_id, "target_value": float(v)}
+                   for i, v in targets.items()]
+    actual_rows = [{"indicator_id": i, "period_id": period_id, "actual_value": float(v)}
+                   for i, v in actuals.items()]
+    try:
+        _upsert(session, IndicatorTarget, target_rows, ["indicator_id", "period_id"], "target_value")
+        _upsert(session, IndicatorActual, actual_rows, ["indicator_id", "period_id"], "actual_value")
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return len(target_rows) + len(actual_rows)
+
+
+# ---------------- strategic roll-up ----------------
+def strategic_rollup(session) -> StrategicRollup:
+    """On-track counts per strategic indicator (and per period) from one join.
+
+    A mapped indicator/period counts as checked when it has both a target and an
+    actual; it is on track when the actual meets the target in the strategic
+    indicator's Direction (>= for increase, <= for decrease).
+    """
+    m, t, a = IndicatorMapping, IndicatorTarget, IndicatorActual
+    q = (
+        select(
+            m.strategic_indicator_id.label("sid"), m.indicator_id, t.period_id,
+            StrategicIndicator.direction, ReportingPeriod.label.label("period"),
+            ReportingPeriod.end_date.label("period_end"),
+            t.target_value.label("target"), a.actual_value.label("actual"),
+        )
+        .join(StrategicIndicator, StrategicIndicator.id == m.strategic_indicator_id)
+        .join(Indicator, Indicator.id == m.indicator_id)
+        .join(t, t.indicator_id == m.indicator_id)
+        .join(a, and_(a.indicator_id == t.indicator_id, a.period_id == t.period_id))
+        .join(ReportingPeriod, ReportingPeriod.id == t.period_id)
+    )
+    df = pd.DataFrame(session.execute(q).all(),
+                      columns=["sid", "indicator_id", "period_id", "direction", "period",
+                               "period_end", "target", "actual"])
+    # the same indicator mapped twice to one KPI is still one check
+    df = df.drop_duplicates(["sid", "indicator_id", "period_id"])
+    increase = df["direction"] == Direction.increase.value     # str enum compares as its value
+    df["on_track"] = (increase & (df["actual"] >= df["target"])) | \
+                     (~increase & (df["actual"] <= df["target"]))
+
+    summary = (df.groupby("sid")["on_track"].agg(checked="size", on_track="sum")
+                 .astype(int))
+    trend = (df.groupby(["sid", "period_end", "period"], sort=True)["on_track"]
+               .agg(checked="size", on_track="sum")
+               .reset_index())
+    trend["on_track"] = trend["on_track"].astype(int)
+    trend["share"] = trend["on_track"] / trend["checked"]
+    return StrategicRollup(summary, trend)
+
+
+# ---------------- paginated grids ----------------
+def grid_filters(model, filters: dict) -> list:
+    """WHERE clauses from {field: value}.
+
+    list / set -> IN (empty = no filter); (lo, hi) -> inclusive range, either
+    bound may be None; str -> case-insensitive "contains" on text columns,
+    equality otherwise. None / "" values are ignored.
+    """
+    clauses = []
+    for field, value in (filters or {}).items():
+        col = model.__table__.c[field]
+        if value is None or value == "":
+            continue
+        if isinstance(value, (list, set, frozenset)):
+            if value:
+                clauses.append(col.in_(list(value)))
+        elif isinstance(value, tuple):
+            lo, hi = (tuple(value) + (None, None))[:2]
+            if lo is not None:
+                clauses.append(col >= lo)
+            if hi is not None:
+                clauses.append(col <= hi)
+        elif isinstance(value, str) and isinstance(col.type, String) and not hasattr(col.type, "enums"):
+            clauses.append(col.ilike(f"%{value}%"))
+        else:
+            clauses.append(col == value)
+    return clauses
+
+
+def grid_count(session, model, filters=None) -> int:
+    """Rows of `model` matching `filters` (one COUNT(*))."""
+    where = grid_filters(model, filters)
+    return session.execute(select(func.count()).select_from(model.__table__).where(*where)).scalar()
+
+
+def fetch_grid_page(session, model, fields, *, filters=None, sort=None, descending=False,
+                    page: int = 1, page_size: int = 50, total: int | None = None) -> GridPage:
+    """One page of `fields` from `model`: COUNT(*) + LIMIT/OFFSET with server-side sort and filters.
+
+    Pass `total` (from grid_count) when it is already known to skip the count.
+    """
+    table = model.__table__
+    where = grid_filters(model, filters)
+    if total is None:
+        total = grid_count(session, model, filters)
+    pages = max(1, -(-total // page_size))
+    page = min(max(1, page), pages)
+
+    order = []
+    if sort:
+        order.append(table.c[sort].desc() if descending else table.c[sort].asc())
+    order.extend(table.primary_key.columns)          # stable order between pages
+    q = (select(*(table.c[f] for f in fields)).where(*where).order_by(*order)
+         .limit(page_size).offset((page - 1) * page_size))
+    return GridPage(session.connection().execute(q).all(), total, page, pages)
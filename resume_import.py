@@ -0,0 +1,288 @@
+# resume_import.py
+# "Resume Previous Submission": turn an exported application workbook back into
+# logframe / workplan / budget / identification data.
+#
+# The workbook is read once (all sheets in a single read_excel pass) and every
+# column is normalised with vectorised pandas operations; parents are resolved
+# by name with index lookups instead of per-row dict walks.
+from dataclasses import dataclass, field
+from io import BytesIO
+
+import pandas as pd
+
+from budget_table import BudgetTable
+from dates import parse_series
+from logframe_store import generate_id
+
+TRUE_WORDS = ("yes", "y", "true", "1")
+
+RICH_WORKPLAN_COLUMNS = {
+    "Activity ID", "Output", "Activity", "Owner", "Start", "End", "Status", "% complete",
+    "Linked KPIs", "Milestones", "Notes", "Dependencies",
+}
+
+# Identification sheet "Field" -> id_info key
+ID_FIELDS = {
+    "Project title": "title",
+    "Principal Investigator (PI) name": "pi_name",
+    "PI email": "pi_email",
+    "Institution / Organization": "institution",
+    "Contact person (optional)": "contact_name",
+    "Contact email": "contact_email",
+    "Contact phone": "contact_phone",
+}
+ID_DATE_FIELDS = {
+    "Project start date": "start_date",
+    "Project end date": "end_date",
+}
+
+
+@dataclass
+class ResumeImport:
+    """Everything recovered from one workbook. None = sheet absent (keep current state)."""
+    impacts: list = field(default_factory=list)
+    outcomes: list = field(default_factory=list)
+    outputs: list = field(default_factory=list)
+    kpis: list = field(default_factory=list)
+    workplan: list | None = None
+    budget: BudgetTable | None = None
+    id_info: dict | None = None
+
+
+# ---------------- column helpers (vectorised) ----------------
+def _col(df: pd.DataFrame, name: str) -> pd.Series:
+    """Column as stripped strings ('' for blanks / missing column)."""
+    if name not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    s = df[name]
+    return s.where(s.notna(), "").astype(str).str.strip()
+
+
+def _num(df: pd.DataFrame, name: str) -> pd.Series:
+    if name not in df.columns:
+        return pd.Series(float("nan"), index=df.index)
+    return pd.to_numeric(df[name], errors="coerce")
+
+
+def _dates(df: pd.DataFrame, name: str) -> pd.Series:
+    """Bulk-parse a date column (format sniffed once per column, see dates.parse_series)."""
+    return parse_series(_col(df, name))
+
+
+def _strip_label(s: pd.Series, kind: str) -> pd.Series:
+    # same pattern as formatting.strip_label_prefix, applied to the whole column
+    return s.str.replace(rf"^\s*{kind}\s+\d+(?:\.\d+)*\s*[—:\-]\s*", "", regex=True).str.strip()
+
+
+def _name_index(items: list) -> pd.Series:
+    """name -> id lookup (last one wins on duplicate names, like the old dict build)."""
+    if not items:
+        return pd.Series(dtype=object)
+    df = pd.DataFrame({"name": [(x.get("name") or "").strip() for x in items],
+                       "id": [x["id"] for x in items]})
+    return df.drop_duplicates("name", keep="last").set_index("name")["id"]
+
+
+def _new_ids(n: int) -> list:
+    return [generate_id() for _ in range(n)]
+
+
+def _records(df: pd.DataFrame) -> list:
+    """Rows as dicts, with NaN / NaT turned into None."""
+    df = df.astype(object)
+    return df.where(df.notna(), None).to_dict("records")
+
+
+# ---------------- sheets ----------------
+def _read_summary(df: pd.DataFrame, result: ResumeImport) -> None:
+    lvl = _col(df, "Level").str.lower()
+    text = _col(df, "Text / Title")
+    parent = _col(df, "Parent ID")   # may hold old UUID or a name (older files)
+
+    goals = df.index[lvl == "goal"]
+    outcomes = df.index[lvl == "outcome"]
+    outputs = df.index[lvl == "output"]
+
+    g = pd.DataFrame({"id": _new_ids(len(goals)), "level": "Goal", "name": text[goals].values})
+    o = pd.DataFrame({"id": _new_ids(len(outcomes)), "level": "Outcome",
+                      "name": text[outcomes].values, "parent_id": None})
+    p = pd.DataFrame({"id": _new_ids(len(outputs)), "level": "Output",
+                      "name": _strip_label(text[outputs], "Output").replace("", "Output").values,
+                      "parent_id": None,
+                      "assumptions": _col(df, "Assumptions")[outputs].values})
+
+    # parents: match the raw "Parent ID" cell against names, else the single parent
+    goals_by_text = g[g["name"] != ""].drop_duplicates("name", keep="last").set_index("name")["id"]
+    outcomes_by_text = o[o["name"] != ""].drop_duplicates("name", keep="last").set_index("name")["id"]
+    single_goal = g["id"].iloc[0] if len(g) == 1 else None
+    single_outcome = o["id"].iloc[0] if len(o) == 1 else None
+    o["parent_id"] = parent[outcomes].map(goals_by_text).values
+    o["parent_id"] = o["parent_id"].where(o["parent_id"].notna(), single_goal)
+    p["parent_id"] = parent[outputs].map(outcomes_by_text).values
+    p["parent_id"] = p["parent_id"].where(p["parent_id"].notna(), single_outcome)
+
+    # only one Goal and one Outcome are allowed: keep the first, re-attach Outputs
+    if len(g) > 1:
+        g = g.iloc[:1]
+    if len(o) > 1:
+        o = o.iloc[:1]
+        p["parent_id"] = o["id"].iloc[0]
+    if len(g) and len(o):
+        o["parent_id"] = g["id"].iloc[0]
+
+    result.impacts = _records(g)
+    result.outcomes = _records(o)
+    result.outputs = _records(p)
+
+
+def _read_kpis(df: pd.DataFrame, result: ResumeImport) -> None:
+    by_name = _name_index(result.outputs)
+    label = _col(df, "Parent (label)")                       # e.g. "Output 1 — Title"
+    tail = label.str.split("—", n=1).str[-1].str.strip()
+    parent_id = tail.map(by_name)
+    parent_id = parent_id.where(parent_id.notna(), label.map(by_name))
+
+    k = pd.DataFrame({
+        "level": "KPI",
+        "name": _col(df, "KPI").str.replace(r"^\s*KPI\s+[\w\.\-]+\s*[—:\-]\s*", "", regex=True).str.strip(),
+        "parent_id": parent_id,
+        "baseline": _col(df, "Baseline"),
+        "target": _col(df, "Target"),
+        "start_date": _dates(df, "Start Date"),
+        "end_date": _dates(df, "End Date"),
+        "linked_payment": _col(df, "Linked to Payment").str.lower().isin(TRUE_WORDS),
+        "mov": _col(df, "Means of Verification"),
+    })
+    k = k[k["parent_id"].notna()]          # only keep KPIs we could attach
+    k.insert(0, "id", _new_ids(len(k)))
+    result.kpis = _records(k)
+
+
+def _split_lists(s: pd.Series, sep: str) -> pd.Series:
+    """'a, b' -> ['a', 'b'] per cell (empty parts dropped)."""
+    return pd.Series([[t.strip() for t in parts if t.strip()] for parts in s.str.split(sep)],
+                     index=s.index, dtype=object)
+
+
+def _read_workplan(df: pd.DataFrame, result: ResumeImport) -> None:
+    df = df.rename(columns=lambda c: str(c).strip())
+    n = len(df)
+
+    if RICH_WORKPLAN_COLUMNS.issubset(df.columns):
+        kpis_by_name = _name_index(result.kpis)
+        kpi_ids = set(kpis_by_name.values)
+
+        ids = _col(df, "Activity ID")
+        missing = ids == ""
+        ids[missing] = _new_ids(int(missing.sum()))
+
+        # KPI names -> ids (export wrote names); unknown names are dropped
+        kpi_lookup = kpis_by_name.to_dict()
+        linked = _split_lists(_col(df, "Linked KPIs"), ",").apply(
+            lambda names: [kpi_lookup[n] for n in names if n in kpi_lookup])
+
+        # dependencies: keep ids that look like ids (crude but safe; as before)
+        deps = _split_lists(_col(df, "Dependencies"), ",").apply(
+            lambda ds: [d for d in ds if d in kpi_ids or len(d) >= 6])
+
+        status = _col(df, "Status")
+        w = pd.DataFrame({
+            "id": ids,
+            "output_id": _col(df, "Output").map(_name_index(result.outputs)),
+            "name": _col(df, "Activity"),
+            "owner": _col(df, "Owner"),
+            "start": _dates(df, "Start"),
+            "end": _dates(df, "End"),
+            "status": status.where(status != "", "planned"),
+            "progress": _num(df, "% complete").fillna(0).astype(int),
+            "kpi_ids": linked,
+            "milestones": _split_lists(_col(df, "Milestones"), "|"),
+            "dependencies": deps,
+            "notes": _col(df, "Notes"),
+        })
+    else:
+        # SIMPLE legacy format: Activity | Owner | Start Date | End Date | Milestone
+        # No Output/KPI info in this shape; if there is exactly one Output, attach to it.
+        only_output_id = result.outputs[0]["id"] if len(result.outputs) == 1 else None
+        milestone = _col(df, "Milestone")
+        w = pd.DataFrame({
+            "id": _new_ids(n),
+            "output_id": only_output_id,
+            "name": _col(df, "Activity"),
+            "owner": _col(df, "Owner"),
+            "start": _dates(df, "Start Date"),
+            "end": _dates(df, "End Date"),
+            "status": "planned",
+            "progress": 0,
+            "kpi_ids": [[] for _ in range(n)],
+            "milestones": milestone.apply(lambda m: [m] if m else []),
+            "dependencies": [[] for _ in range(n)],
+            "notes": "",
+        }, index=df.index)
+
+    result.workplan = _records(w)
+
+
+def _read_budget(df: pd.DataFrame, result: ResumeImport) -> None:
+    df = df.rename(columns=lambda c: str(c).strip())
+
+    # 1) Prefer Output name; 2) fall back to OutputID only if it is a current id
+    out_id = _col(df, "Output").map(_name_index(result.outputs))
+    raw_id = _col(df, "OutputID")
+    raw_id = raw_id.where(raw_id.isin({o["id"] for o in result.outputs}))
+    out_id = out_id.where(out_id.notna(), raw_id)
+
+    qty = _num(df, "Qty").fillna(0.0)
+    uc = _num(df, "Unit Cost").fillna(0.0)
+    tot = _num(df, "Total")
+    cur = _col(df, "Currency")
+
+    b = pd.DataFrame({
+        "out_id": out_id,
+        "item": _col(df, "Item"),
+        "cat": _col(df, "Category"),
+        "unit": _col(df, "Unit"),
+        "qty": qty.astype(float),
+        "uc": uc.astype(float),
+        "cur": cur.where(cur != "", "USD"),
+        "tot": tot.where(tot.notna() & (tot != 0), qty * uc).astype(float),
+    })
+    # Only keep rows we can link to an Output and that have an item
+    b = b[b["out_id"].notna() & (b["item"] != "")]
+    if len(b):
+        result.budget = BudgetTable()
+        result.budget.load_columns(output_id=b["out_id"], item=b["item"], category=b["cat"],
+                                   unit=b["unit"], qty=b["qty"], unit_cost=b["uc"],
+                                   currency=b["cur"], total=b["tot"])
+
+
+def _read_identification(df: pd.DataFrame, result: ResumeImport) -> None:
+    if not {"Field", "Value"}.issubset(df.columns):
+        result.id_info = {}
+        return
+    kv = pd.Series(_col(df, "Value").values, index=_col(df, "Field").values)
+    kv = kv[~kv.index.duplicated(keep="last")]
+    info = {key: kv.get(label, "") for label, key in ID_FIELDS.items()}
+    dates = _dates(pd.DataFrame({"v": kv.reindex(list(ID_DATE_FIELDS)).values}), "v")
+    info.update({key: d for key, d in zip(ID_DATE_FIELDS.values(), dates)})
+    result.id_info = info
+
+
+# ---------------- entry point ----------------
+def read_resume_workbook(data: bytes) -> ResumeImport:
+    """Parse an exported application workbook (bytes) into a ResumeImport."""
+    sheets = pd.read_excel(BytesIO(data), sheet_name=None, dtype=object)
+    if "Summary" not in sheets:
+        raise ValueError("Worksheet named 'Summary' not found")
+
+    result = ResumeImport()
+    _read_summary(sheets["Summary"], result)
+    if "KPI Matrix" in sheets:
+        _read_kpis(sheets["KPI Matrix"], result)
+    if "Workplan" in sheets:
+        _read_workplan(sheets["Workplan"], result)
+    if "Budget" in sheets:
+        _read_budget(sheets["Budget"], result)
+    if "Identification" in sheets:
+        _read_identification(sheets["Identification"], result)
+    return result
@@ -0,0 +1,78 @@
+# tests/test_budget_table.py
+import numpy as np
+import pytest
+
+from budget_table import BudgetTable
+
+ROWS = [
+    ["o1", "Laptop", "Equipment", "each", 2, 900.0, "USD", 1800.0],
+    ["o1", "Fuel", "Travel", "litre", 100, 1.5, "usd", 150.0],
+    ["o2", "Trainer", "Personnel", "day", 10, 250.0, "", 2500.0],
+    ["o2", "Room", "Services", "day", "3", "bad", "EUR", None],
+]
+
+
+def test_rows_round_trip_and_normalise():
+    b = BudgetTable.from_rows(ROWS)
+    assert len(b) == 4
+    assert b.rows()[1] == ["o1", "Fuel", "Travel", "litre", 100.0, 1.5, "USD", 150.0]
+    assert b.rows()[2][6] == "USD"                          # blank currency means USD
+    assert b.rows()[3][4:] == [3.0, 0.0, "EUR", 0.0]        # unparsable numbers become 0
+    assert BudgetTable.from_rows(b.rows()).rows() == b.rows()
+
+
+def test_totals_by_output_category_and_currency():
+    t = BudgetTable.from_rows(ROWS).totals()
+    assert t.grand == pytest.approx(4450.0)
+    assert t.by_output == {"o1": 1950.0, "o2": 2500.0}
+    assert t.by_category["Equipment"] == 1800.0 and t.by_category["Services"] == 0.0
+    assert t.by_currency == {"EUR": 0.0, "USD": 4450.0}
+
+
+def test_totals_are_cached_per_version():
+    b = BudgetTable.from_rows(ROWS)
+    first = b.totals()
+    assert b.totals() is first
+    uid = b.append("o3", "Printing", "Supplies", "page", 1000, 0.05)
+    assert b.totals() is not first
+    assert b.totals().by_output["o3"] == 50.0
+    b.update(uid, qty=2000)                                 # total follows qty x unit cost
+    assert b.totals().by_output["o3"] == 100.0
+    b.update(uid, total=7)                                  # an explicit total wins
+    assert b.row(b.position_of(uid))[7] == 7.0
+
+
+def test_update_move_and_delete():
+    b = BudgetTable.from_rows(ROWS)
+    uids = b.uid.tolist()
+    b.update(uids[0], output_id="o2", currency=" eur ")
+    assert b.row(0)[0] == "o2" and b.row(0)[6] == "EUR"
+    assert b.positions("o2").tolist() == [0, 2, 3]
+    b.delete(uids[1], uids[2])
+    assert b.uid.tolist() == [uids[0], uids[3]]
+    assert b.positions("o1").tolist() == [] and b.positions("nope").tolist() == []
+    with pytest.raises(KeyError):
+        b.update(uids[0], colour="red")
+
+
+def test_drain_changes():
+    b = BudgetTable.from_rows(ROWS)
+    assert b.drain_changes() == (True, [])                 # load: the whole table
+    uids = b.uid.tolist()
+    new = b.append("o1", "Pens")
+    b.update(new, qty=5)                                    # still an add
+    b.update(uids[0], item="Laptop 2")
+    b.delete(uids[1])
+    gone = b.append("o1", "Temp")
+    b.delete(gone)                                          # never journaled: dropped
+    assert b.drain_changes() == (False, [("add", new), ("set", uids[0]), ("del", uids[1])])
+    assert b.drain_changes() == (False, [])
+
+
+def test_copy_is_independent():
+    b = BudgetTable.from_rows(ROWS)
+    c = b.copy()
+    b.update(b.uid[0], qty=1)
+    b.append("o9", "More")
+    assert c.rows() == BudgetTable.from_rows(ROWS).rows()
+    assert isinstance(c.total, np.ndarray) and c.total is not b.total
@@ -0,0 +1,76 @@
+# tests/test_currency.py
+import datetime as dt
+import math
+import os
+
+import pytest
+
+from budget_table import BudgetTable
+from currency import FX_RATES_PATH, FxRates, format_unconverted, load_rates, read_rates
+
+D = dt.date
+RATES = FxRates([
+    ("USD", D(1900, 1, 1), 1.0),
+    ("AED", D(1997, 11, 1), 0.272294),
+    ("EUR", D(2025, 1, 2), 1.03),
+    ("EUR", D(2025, 7, 1), 1.17),
+])
+
+
+def test_rate_in_force_on_a_date():
+    assert RATES.usd_per_unit("eur", D(2025, 3, 1)) == 1.03
+    assert RATES.usd_per_unit("EUR", D(2025, 7, 1)) == 1.17     # from valid_from on
+    assert RATES.usd_per_unit("EUR", D(2024, 12, 31)) is None   # before the first row
+    assert RATES.usd_per_unit("GBP", D(2025, 3, 1)) is None
+    assert RATES.usd_per_unit("", D(2025, 3, 1)) == 1.0         # blank means USD
+
+
+def test_convert_between_currencies():
+    amounts = RATES.convert([100, 100, 100, 100], ["USD", "EUR", "AED", "GBP"], "USD", D(2025, 3, 1))
+    assert amounts[:3].tolist() == pytest.approx([100, 103, 27.2294])
+    assert math.isnan(amounts[3])
+    in_aed = RATES.convert([1], ["EUR"], "AED", D(2025, 3, 1))
+    assert in_aed[0] == pytest.approx(1.03 / 0.272294)
+    assert RATES.convert([], [], "USD").tolist() == []
+
+
+def test_budget_keeps_unconverted_lines_apart():
+    b = BudgetTable.from_rows([
+        ["o1", "Laptop", "Equipment", "each", 1, 1000.0, "USD", 1000.0],
+        ["o1", "Hotel", "Travel", "night", 2, 100.0, "EUR", 200.0],
+        ["o2", "Taxi", "Travel", "trip", 3, 20.0, "GBP", 60.0],
+    ])
+    c = b.converted(RATES, "USD", D(2025, 3, 1))
+    assert c.grand == pytest.approx(1206.0)
+    assert c.by_key == pytest.approx({"o1": 1206.0, "o2": 0.0})
+    assert dict(c.unconverted) == {"GBP": 60.0}
+    assert c.unconverted_keys == {"o2"}
+    assert format_unconverted(c.unconverted) == "GBP 60.00"
+    assert b.converted(RATES, "USD", D(2025, 3, 1)) is c            # cached
+    assert b.converted(RATES, "USD", D(2025, 8, 1)).grand == pytest.approx(1234.0)
+
+
+def test_version_follows_the_rows():
+    same = FxRates([("EUR", D(2025, 1, 2), 1.03)])
+    assert same.version == FxRates([("EUR", D(2025, 1, 2), 1.03)]).version
+    assert same.version != FxRates([("EUR", D(2025, 1, 2), 1.04)]).version
+
+
+def test_shipped_rates_file():
+    rows = read_rates(FX_RATES_PATH)
+    assert {cur for cur, _, _ in rows} >= {"USD", "EUR"}
+    assert load_rates(FX_RATES_PATH) is load_rates(FX_RATES_PATH)    # re-read only when it changes
+
+
+def test_rates_file_is_reread_when_it_changes(tmp_path):
+    path = tmp_path / "fx.csv"
+    path.write_text("# comment\ncurrency,valid_from,usd_per_unit\nEUR,2025-01-02,1.03\n", encoding="utf-8")
+    first = load_rates(str(path))
+    assert first.usd_per_unit("EUR", D(2025, 3, 1)) == 1.03
+    path.write_text("currency,valid_from,usd_per_unit\nEUR,2025-01-02,1.03\nEUR,2025-02-01,1.10\n",
+                    encoding="utf-8")
+    os.utime(path, ns=(0, 10**18))
+    second = load_rates(str(path))
+    assert second is not first and second.version != first.version
+    assert second.usd_per_unit("EUR", D(2025, 3, 1)) == 1.10
+    assert load_rates(str(tmp_path / "missing.csv")).currencies == ["USD"]
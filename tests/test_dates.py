@@ -0,0 +1,78 @@
+# tests/test_dates.py
+import datetime as dt
+
+import pandas as pd
+import pytest
+
+import dates
+from dates import DisplayDate, fmt_dd_mmm_yyyy, parse_date, parse_series, sniff_format
+
+D = dt.date
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches(monkeypatch):
+    """Each test starts from the default format order and empty LRUs."""
+    monkeypatch.setattr(dates, "_last_format", dates.DATE_FORMATS[0])
+    dates._parse_text.cache_clear()
+    dates._display.cache_clear()
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2025-09-03", D(2025, 9, 3)),
+    ("2025-09-03 14:30:00", D(2025, 9, 3)),
+    ("03/09/2025", D(2025, 9, 3)),           # NN/NN/YYYY is day-first
+    ("09/13/2025", D(2025, 9, 13)),          # month-first only when it cannot be day-first
+    ("2025/09/03", D(2025, 9, 3)),
+    ("03/Sep/2025", D(2025, 9, 3)),
+    ("03-Sep-2025", D(2025, 9, 3)),
+    ("  03/Sep/2025 ", D(2025, 9, 3)),
+])
+def test_parse_text(text, expected):
+    got = parse_date(text)
+    assert got == expected and type(got) is DisplayDate
+
+
+@pytest.mark.parametrize("value", [None, "", "  ", "nan", "NaT", "None", float("nan"), pd.NaT, "31/31/2025", "soon"])
+def test_blank_or_unparsable(value):
+    assert parse_date(value) is None
+    assert fmt_dd_mmm_yyyy(value) == ""
+
+
+def test_date_types_pass_through():
+    assert parse_date(D(2025, 1, 2)) == D(2025, 1, 2)
+    assert parse_date(dt.datetime(2025, 1, 2, 23, 59)) == D(2025, 1, 2)
+    assert parse_date(pd.Timestamp("2025-01-02 10:00")) == D(2025, 1, 2)
+
+
+def test_month_first_match_does_not_flip_later_cells():
+    assert parse_date("09/13/2025") == D(2025, 9, 13)
+    assert parse_date("03/04/2025") == D(2025, 4, 3)      # still day-first afterwards
+
+
+def test_display_text():
+    assert fmt_dd_mmm_yyyy("2025-09-03") == "03/Sep/2025"
+    assert fmt_dd_mmm_yyyy(D(2025, 9, 3)) == "03/Sep/2025"
+    d = DisplayDate(2025, 9, 3)
+    assert d.text == "03/Sep/2025" and d.text is d.text   # formatted once
+    assert dates.as_display(D(2025, 9, 3)) == d and dates.as_display(None) is None
+
+
+def test_sniff_format_never_picks_month_first():
+    assert sniff_format(["2025-01-02", "2025-03-04"]) == "%Y-%m-%d"
+    assert sniff_format(["01/13/2025", "02/14/2025", "03/04/2025"]) == "%d/%m/%Y"
+    assert sniff_format(["soon", "later"]) is None
+
+
+def test_series_matches_the_scalar_path():
+    values = ["2025-01-02", "03/04/2025", "04/13/2025", "05/Jun/2025", "", None, "soon",
+              "2025-01-02 08:00:00", "03-Sep-2025"]
+    parsed = parse_series(pd.Series(values))
+    assert parsed.tolist() == [parse_date(v) for v in values]
+    assert all(type(v) is DisplayDate for v in parsed.dropna())
+    assert parsed[0] is parsed[7]                          # one object per distinct day
+
+
+def test_series_of_datetimes():
+    s = pd.Series(pd.to_datetime(["2025-01-02 10:00", None]))
+    assert parse_series(s).tolist() == [D(2025, 1, 2), None]
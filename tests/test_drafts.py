@@ -0,0 +1,114 @@
+# tests/test_drafts.py
+import datetime as dt
+import os
+import time
+
+import pytest
+
+import drafts
+from budget_table import BudgetTable
+from dates import DisplayDate
+from drafts import DraftStore, pending_records
+from logframe_store import KINDS, LogframeStore
+
+DRAFT_ID = "0123456789abcdef"
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(drafts, "_journal_lines", {})
+    return DraftStore(str(tmp_path))
+
+
+class Session:
+    """The parts of one app.py session that autosave_draft() journals."""
+
+    def __init__(self, store):
+        self.store, self.lf, self.budget, self.id_info, self.saved = store, LogframeStore(), BudgetTable(), None, {}
+
+    def autosave(self):
+        self.store.append(DRAFT_ID, pending_records(self.lf, self.budget, self.id_info, self.saved))
+
+    def restored(self):
+        """A fresh session restored from the draft, like app.restore_draft()."""
+        draft = self.store.load(DRAFT_ID)
+        other = Session(self.store)
+        for kind in KINDS:
+            other.lf.load(kind, draft["items"][kind])
+        other.budget.load(draft["budget"])
+        other.id_info = draft["id_info"]
+        return other
+
+
+def _same(a: Session, b: Session):
+    assert {k: a.lf.items(k) for k in KINDS} == {k: b.lf.items(k) for k in KINDS}
+    assert a.budget.rows_by_uid() == b.budget.rows_by_uid()
+    assert a.id_info == b.id_info
+
+
+def test_replay_restores_items_budget_and_id_info(store):
+    s = Session(store)
+    s.lf.add("impacts", {"id": "g", "name": "Goal"})
+    s.lf.add("outcomes", {"id": "oc", "parent_id": "g", "name": "Outcome"})
+    for i in range(3):
+        s.lf.add("outputs", {"id": f"o{i}", "parent_id": "oc", "name": f"Output {i}"})
+    keep = s.budget.append("o0", "Laptop", "Equipment", "each", 2, 900.0)
+    gone = s.budget.append("o1", "Fuel", "Travel", "litre", 100, 1.5, "eur")
+    s.id_info = {"title": "Project", "start": DisplayDate(2025, 3, 1)}
+    s.autosave()
+
+    s.lf.update("o0", name="Renamed")
+    s.lf.update("o2", parent_id=None)                     # moved: replayed as an add at the end
+    s.lf.delete("o1")
+    s.budget.update(keep, qty=3)
+    s.budget.delete(gone)
+    s.budget.append("o2", "Room", "Services", "day", 1, 50.0)
+    s.id_info = dict(s.id_info, title="Project 2")
+    s.autosave()
+
+    restored = s.restored()
+    _same(s, restored)
+    assert [o["id"] for o in restored.lf.items("outputs")] == ["o0", "o2"]
+    assert type(restored.id_info["start"]) is DisplayDate
+
+
+def test_whole_reload_is_one_record(store):
+    s = Session(store)
+    s.lf.load("kpis", [{"id": "k1", "parent_id": "o1", "name": "KPI"}])
+    s.budget.load([["o1", "Item", "Other", "each", 1, 5.0, "USD", 5.0]])
+    s.autosave()
+    with open(os.path.join(store.root, DRAFT_ID + ".jsonl"), encoding="utf-8") as fh:
+        ops = [line.split('"op":"')[1].split('"')[0] for line in fh]
+    assert ops == ["load", "budget"]
+    _same(s, s.restored())
+
+
+def test_compaction_and_torn_line(store, monkeypatch):
+    monkeypatch.setattr(drafts, "COMPACT_EVERY", 5)
+    s = Session(store)
+    for i in range(7):
+        s.lf.add("impacts", {"id": f"g{i}", "name": f"Goal {i}", "due": dt.date(2025, 1, i + 1)})
+        s.autosave()
+    snap, log = (os.path.join(store.root, DRAFT_ID + ext) for ext in (".json", ".jsonl"))
+    assert os.path.exists(snap)                           # folded after 5 records
+    with open(log, "a", encoding="utf-8") as fh:
+        fh.write('{"op":"add","kind":"imp')                 # a write cut short by a crash
+    drafts._journal_lines.clear()                         # ... and a new server process
+    s.lf.add("impacts", {"id": "g7", "name": "After the crash"})
+    s.autosave()
+    _same(s, s.restored())
+
+
+def test_delete_and_prune(store):
+    s = Session(store)
+    s.lf.add("impacts", {"id": "g", "name": "Goal"})
+    s.autosave()
+    assert store.exists(DRAFT_ID)
+    assert store.prune(max_age_days=1) == 0
+    assert store.prune(max_age_days=1, now=time.time() + 2 * 86400) == 1
+    assert not store.exists(DRAFT_ID) and store.load(DRAFT_ID) is None
+
+    s.autosave()                                          # nothing changed: nothing written
+    assert not store.exists(DRAFT_ID)
+    with pytest.raises(ValueError):
+        store.load("../etc/passwd")
@@ -0,0 +1,70 @@
+# tests/test_import_export.py
+import pandas as pd
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from benchmarks.generators import synthetic_portfolio
+from db import IndicatorTarget, Project, make_engine
+from import_export import ImportValidationError, _blank_to_na, upsert_from_df
+
+PROJECT_REQUIRED = ["title", "start_date", "end_date", "manager_user", "funder"]
+
+
+@pytest.fixture
+def session(tmp_path):
+    url = f"sqlite:///{tmp_path / 'glide.db'}"
+    synthetic_portfolio(url, projects=3)
+    engine = make_engine(url)
+    with Session(engine) as s:
+        yield s
+    engine.dispose()
+
+
+def _projects(**overrides):
+    df = pd.DataFrame({"title": ["A", "B"], "start_date": ["2025-01-01"] * 2,
+                       "end_date": ["31/12/2025"] * 2, "manager_user": ["m"] * 2, "funder": ["f"] * 2})
+    return df.assign(**overrides)
+
+
+def test_blank_to_na_on_text_columns():
+    # pandas 3 reads text as the "str" dtype, older pandas as object
+    for s in (pd.Series(["  a ", " ", "", None]), pd.Series(["  a ", " ", "", None], dtype=object)):
+        assert _blank_to_na(s).tolist()[0] == "a"
+        assert _blank_to_na(s).isna().tolist() == [False, True, True, True]
+    mixed = pd.Series([1.5, " ", "x"], dtype=object)       # numbers and text from one xlsx column
+    assert _blank_to_na(mixed).isna().tolist() == [False, True, False]
+
+
+def test_blank_required_field_is_rejected(session):
+    before = session.scalar(select(func.count()).select_from(Project))
+    with pytest.raises(ImportValidationError) as err:
+        upsert_from_df(session, Project, _projects(title=["A", "   "]), required_fields=PROJECT_REQUIRED)
+    assert err.value.errors.to_dict("records") == [{"row": 3, "field": "title", "problem": "required"}]
+    assert session.scalar(select(func.count()).select_from(Project)) == before
+
+
+def test_projects_insert_then_update_by_id(session):
+    created, updated = upsert_from_df(session, Project, _projects(), required_fields=PROJECT_REQUIRED)
+    assert (created, updated) == (2, 0)
+    row = session.scalars(select(Project).where(Project.title == "B")).one()
+    created, updated = upsert_from_df(session, Project, pd.DataFrame({"id": [row.id], "title": ["B2"]}),
+                                      required_fields=PROJECT_REQUIRED)
+    assert (created, updated) == (0, 1)
+    session.expire_all()
+    assert session.get(Project, row.id).title == "B2"
+
+
+def test_targets_match_on_indicator_and_period(session):
+    stored = session.scalars(select(IndicatorTarget).order_by(IndicatorTarget.id).limit(2)).all()
+    count = session.scalar(select(func.count()).select_from(IndicatorTarget))
+    df = pd.DataFrame({
+        "id": [None, 10**6],                                  # missing / wrong ids
+        "indicator_id": [str(t.indicator_id) for t in stored],
+        "period_id": [t.period_id for t in stored],
+        "target_value": [11, 22],
+    })
+    assert upsert_from_df(session, IndicatorTarget, df) == (0, 2)
+    session.expire_all()
+    assert [session.get(IndicatorTarget, t.id).target_value for t in stored] == [11, 22]
+    assert session.scalar(select(func.count()).select_from(IndicatorTarget)) == count
@@ -0,0 +1,94 @@
+# tests/test_jobs.py
+import threading
+
+import pytest
+
+import export_jobs
+from budget_table import BudgetTable
+from jobs import Job, JobRunner
+from logframe_store import LogframeStore
+
+
+def _wait(job, timeout=5):
+    for _ in range(int(timeout / 0.01)):
+        if not job.active:
+            return job
+        threading.Event().wait(0.01)
+    raise AssertionError(f"{job.label} still {job.status}")
+
+
+@pytest.fixture
+def runner():
+    r = JobRunner(workers=2)
+    yield r
+    r._pool.shutdown(wait=True, cancel_futures=True)
+
+
+def test_same_key_runs_once(runner):
+    release, calls = threading.Event(), []
+
+    def work(x, progress):
+        calls.append(x)
+        release.wait(5)
+        return x * 2
+
+    first = runner.submit("k", work, 21, subscriber="a")
+    again = runner.submit("k", work, 21, subscriber="b")      # while running
+    assert again is first
+    release.set()
+    assert _wait(first).status == Job.DONE and first.result == 42
+    assert runner.submit("k", work, 21) is first               # finished: served from the registry
+    assert calls == [21]
+
+
+def test_failed_or_cancelled_key_runs_again(runner):
+    def boom(progress):
+        raise ValueError("nope")
+
+    failed = _wait(runner.submit("k", boom))
+    assert failed.status == Job.FAILED and isinstance(failed.error, ValueError)
+    retry = runner.submit("k", lambda progress: "ok")
+    assert retry is not failed and _wait(retry).result == "ok"
+
+
+def test_cancel_waits_for_every_subscriber(runner):
+    release = threading.Event()
+
+    def work(progress):
+        while not release.wait(0.01):
+            progress(0.5, "working")
+        return "done"
+
+    job = runner.submit("k", work, subscriber="a")
+    runner.submit("k", work, subscriber="b")
+    assert job.cancel("a") is False           # "b" still waits
+    assert not job.cancelling
+    assert job.cancel("b") is True
+    assert _wait(job).status == Job.CANCELLED
+    release.set()
+    # a cancelled key is not handed out again
+    assert runner.submit("k", lambda progress: "new") is not job
+
+
+def _application(name):
+    lf = LogframeStore()
+    lf.add("impacts", {"id": "g", "name": name})
+    lf.add("outcomes", {"id": "oc", "parent_id": "g", "name": "Outcome"})
+    lf.add("outputs", {"id": "o1", "parent_id": "oc", "name": "Output"})
+    budget = BudgetTable()
+    budget.append("o1", "Item", "Supplies", "each", 2, 10.0)
+    return lf, budget
+
+
+def test_excel_export_is_keyed_by_content(runner, monkeypatch):
+    monkeypatch.setattr(export_jobs, "get_job_runner", lambda: runner)
+    monkeypatch.setattr(export_jobs, "build_excel", lambda inputs, progress: b"xlsx")
+
+    lf, budget = _application("Goal")
+    same_lf, same_budget = _application("Goal")          # separate objects, same content
+    job = export_jobs.submit_excel(lf, {"title": "P"}, budget, subscriber="a")
+    assert export_jobs.submit_excel(same_lf, {"title": "P"}, same_budget, subscriber="b") is job
+
+    lf.update("g", name="Other goal")
+    assert export_jobs.submit_excel(lf, {"title": "P"}, budget) is not job
+    assert export_jobs.submit_excel(same_lf, {"title": "Q"}, same_budget) is not job
@@ -0,0 +1,97 @@
+# tests/test_logframe_store.py
+import random
+
+from logframe_store import LogframeStore
+
+
+def _store():
+    """Goal g > Outcome oc > Outputs o1, o2; KPIs k1, k2 under o1 and k3 under o2; activity a1 under o2."""
+    lf = LogframeStore()
+    lf.add("impacts", {"id": "g", "name": "Goal"})
+    lf.add("outcomes", {"id": "oc", "parent_id": "g", "name": "Outcome"})
+    lf.add("outputs", {"id": "o1", "parent_id": "oc", "name": "Output 1"})
+    lf.add("outputs", {"id": "o2", "parent_id": "oc", "name": "Output 2"})
+    lf.add("kpis", {"id": "k1", "parent_id": "o1", "name": "KPI 1"})
+    lf.add("kpis", {"id": "k2", "parent_id": "o1", "name": "KPI 2"})
+    lf.add("kpis", {"id": "k3", "parent_id": "o2", "name": "KPI 3"})
+    lf.add("workplan", {"id": "a1", "output_id": "o2", "name": "Activity 1"})
+    return lf
+
+
+def _labels(lf):
+    n = lf.numbering()
+    return dict(n.outputs), dict(n.kpis), dict(n.activities)
+
+
+def test_numbers_outputs_then_kpis_and_activities():
+    outputs, kpis, activities = _labels(_store())
+    assert outputs == {"o1": "1", "o2": "2"}
+    assert kpis == {"k1": "1.1", "k2": "1.2", "k3": "2.1"}
+    assert activities == {"a1": "2.1"}
+
+
+def test_delete_renumbers_the_following_siblings_and_cascades():
+    lf = _store()
+    lf.numbering()
+    lf.delete("o1")
+    outputs, kpis, activities = _labels(lf)
+    assert outputs == {"o2": "1"}
+    assert kpis == {"k3": "1.1"}           # k1 / k2 went with their output
+    assert activities == {"a1": "1.1"}
+    assert lf.get("k1") is None
+
+
+def test_move_renumbers_both_groups():
+    lf = _store()
+    lf.numbering()
+    lf.update("k1", parent_id="o2")
+    _, kpis, _ = _labels(lf)
+    assert kpis == {"k2": "1.1", "k3": "2.1", "k1": "2.2"}
+
+
+def test_output_without_outcome_is_unnumbered():
+    lf = _store()
+    lf.add("outputs", {"id": "o3", "parent_id": None, "name": "Loose"})
+    lf.add("kpis", {"id": "k4", "parent_id": "o3", "name": "KPI 4"})
+    outputs, kpis, _ = _labels(lf)
+    assert "o3" not in outputs and "k4" not in kpis
+
+
+def test_numbering_is_cached_until_a_structural_change():
+    lf = _store()
+    first = lf.numbering()
+    assert lf.numbering() is first
+    lf.update("k1", name="Renamed")        # not structural
+    assert lf.numbering() is first
+    lf.add("kpis", {"id": "k9", "parent_id": "o2", "name": "KPI 9"})
+    assert lf.numbering() is not first
+    assert lf.numbering().kpis["k9"] == "2.2"
+
+
+def test_incremental_numbering_matches_a_full_rebuild():
+    rng = random.Random(7)
+    lf = _store()
+    for step in range(300):
+        lf.numbering()
+        outputs = [o["id"] for o in lf.items("outputs")]
+        op = rng.random()
+        if op < 0.3 or not outputs:
+            lf.add("outputs", {"id": f"o{step}x", "parent_id": "oc", "name": ""})
+        elif op < 0.6:
+            kind, field = rng.choice([("kpis", "parent_id"), ("workplan", "output_id")])
+            lf.add(kind, {"id": f"i{step}", field: rng.choice(outputs), "name": ""})
+        elif op < 0.8:
+            children = lf.items("kpis") + lf.items("workplan")
+            if children:
+                lf.delete(rng.choice(children)["id"])
+        elif op < 0.9:
+            kpis = lf.items("kpis")
+            if kpis:
+                lf.update(rng.choice(kpis)["id"], parent_id=rng.choice(outputs))
+        else:
+            lf.delete(rng.choice(outputs))
+
+    rebuilt = LogframeStore()
+    for kind in ("impacts", "outcomes", "outputs", "kpis", "workplan"):
+        rebuilt.load(kind, [dict(i) for i in lf.items(kind)])
+    assert _labels(lf) == _labels(rebuilt)
@@ -0,0 +1,26 @@
+# ui/debug_panel.py
+import streamlit as st
+
+def _ms(sec):
+    return f"{sec * 1000:,.1f} ms"
+
+def render_debug_panel(profile, top=10):
+    """Sidebar summary of one instrumented run (profiling.RunProfile): phases, timers, SQL."""
+    with st.sidebar.expander(f"⏱ Debug · {profile.script} · {_ms(profile.total)}", expanded=False):
+        if profile.phases:
+            st.markdown("**Phases**\n\n" + "\n".join(f"- {name}: {_ms(sec)}" for name, sec in profile.phases))
+        if profile.timers:
+            rows = sorted(profile.timers.items(), key=lambda kv: -kv[1][1])
+            st.markdown("**Timers**\n\n" + "\n".join(
+                f"- {name}: {_ms(sec)} ({n}×)" for name, (n, sec) in rows[:top]))
+        st.markdown(f"**SQL:** {profile.query_count} statement(s), {_ms(profile.query_seconds)}")
+        repeated = profile.repeated_queries()
+        if repeated:
+            st.warning(f"{len(repeated)} statement(s) repeated in this run (possible N+1):")
+            for q, n, sec in repeated[:top]:
+                st.caption(f"{n}× · {_ms(sec)}")
+                st.code(q, language="sql")
+        slow = sorted(profile.queries.items(), key=lambda kv: -kv[1][1])[:3]
+        for q, (n, sec) in slow:
+            st.caption(f"slowest · {_ms(sec)} over {n}×")
+            st.code(q, language="sql")
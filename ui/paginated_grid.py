@@ -0,0 +1,72 @@
+# ui/paginated_grid.py
+import pandas as pd
+import streamlit as st
+from sqlalchemy import Date, DateTime, Enum as SAEnum, select
+
+from queries import fetch_grid_page, grid_count
+
+PAGE_SIZES = (25, 50, 100, 250)
+
+def _distinct_small(session, col, limit=50):
+    """Distinct values of a column if there are few of them (for a multiselect), else None."""
+    vals = session.execute(select(col).distinct().order_by(col).limit(limit + 1)).scalars().all()
+    return vals if len(vals) <= limit else None
+
+def _filter_widgets(session, model, filter_fields, key):
+    """One widget per field, chosen by column type; returns {field: value} for queries.grid_filters."""
+    filters = {}
+    if not filter_fields:
+        return filters
+    cols = st.columns(len(filter_fields))
+    for box, field in zip(cols, filter_fields):
+        col = model.__table__.c[field]
+        label = field.replace("_", " ").capitalize()
+        if isinstance(col.type, SAEnum):
+            filters[field] = box.multiselect(label, list(col.type.enums), key=f"{key}_f_{field}")
+        elif isinstance(col.type, (Date, DateTime)):
+            rng = box.date_input(label, value=(), key=f"{key}_f_{field}")
+            if len(rng) == 2:
+                filters[field] = (rng[0], rng[1])
+            elif len(rng) == 1:
+                filters[field] = (rng[0], None)
+        else:
+            options = _distinct_small(session, col)
+            if options is not None:
+                filters[field] = box.multiselect(label, options, key=f"{key}_f_{field}")
+            else:
+                filters[field] = box.text_input(label, key=f"{key}_f_{field}", placeholder="contains…")
+    return filters
+
+def render_paginated_grid(session, model, fields, *, key, filter_fields=(), page_size=50):
+    """Server-side paged, sorted and filtered table of `fields` from any db.py model."""
+    filters = _filter_widgets(session, model, filter_fields, key)
+
+    c1, c2, c3, c4 = st.columns([2, 1, 1, 1])
+    sort = c1.selectbox("Sort by", list(fields), key=f"{key}_sort")
+    descending = c2.toggle("Descending", key=f"{key}_desc")
+    size = c3.selectbox("Rows / page", PAGE_SIZES,
+                        index=PAGE_SIZES.index(page_size) if page_size in PAGE_SIZES else 1,
+                        key=f"{key}_size")
+
+    total = grid_count(session, model, filters)
+    pages = max(1, -(-total // size))
+    # back to page 1 whenever the query changes; never past the last page
+    sig = repr((filters, sort, descending, size))
+    if st.session_state.get(f"{key}_sig") != sig:
+        st.session_state[f"{key}_sig"] = sig
+        st.session_state[f"{key}_page"] = 1
+    elif st.session_state.get(f"{key}_page", 1) > pages:
+        st.session_state[f"{key}_page"] = pages
+    page_no = c4.number_input("Page", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+
+    page = fetch_grid_page(session, model, fields, filters=filters, sort=sort,
+                           descending=descending, page=page_no, page_size=size, total=total)
+    df = pd.DataFrame(page.rows, columns=list(fields))
+    for f in fields:
+        if isinstance(model.__table__.c[f].type, SAEnum):
+            df[f] = df[f].map(lambda v: getattr(v, "value", v))
+    st.dataframe(df, use_container_width=True, hide_index=True)
+    first = (page.page - 1) * size + 1 if page.total else 0
+    st.caption(f"Rows {first:,}–{first + len(df) - 1 if page.total else 0:,} of {page.total:,} "
+               f"· page {page.page} / {page.pages}")
+    return page
@@ -2,12 +2,12 @@
 import streamlit as st
 import datetime as dt
 import re
-from db import SessionLocal, Project, Status, generate_reporting_periods
+from db import Project, Status, generate_reporting_periods
 
 EMAIL_RE = re.compile(r"[^@]+@[^@]+\.[^@]+")
 
-def project_form(existing: Project | None = None):
-    s = SessionLocal()
+def project_form(s, existing: Project | None = None):
+    """Create/edit form; `s` is the page's session (the one `existing` was loaded in)."""
     st.subheader("Edit Project" if existing else "Create New Project")
     with st.form("project_form", clear_on_submit=(existing is None)):
         colA, colB = st.columns(2)
@@ -51,6 +51,6 @@ def render_project_card(p, on_edit=None, details_url: str | None = None):
         if details_url:
             a1.link_button("View Details ↗", details_url, type="secondary", use_container_width=True)
         else:
-            a1.button("View Details", disabled=True, use_container_width=True)
+            a1.button("View Details", key=f"details_{p.id}", disabled=True, use_container_width=True)
         if on_edit:
             a2.button("✏️", key=f"edit_{p.id}", help="Edit Project", on_click=lambda: on_edit(p))
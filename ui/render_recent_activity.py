@@ -27,9 +27,8 @@ def render_recent_activity(periods, projects, limit=8):
     s = sorted(periods, key=lambda rp: rp.due_date or date.min, reverse=True)[:limit]
 
     for rp in s:
-        status = rp.status.value if hasattr(rp, "status") else rp.status
-        is_overdue = (rp.due_date and date.today() > rp.due_date and status == "open")
-        actual = "overdue" if is_overdue else status
+        # 'overdue' is stored by the background sweep (db.mark_overdue_periods)
+        actual = rp.status.value if hasattr(rp.status, "value") else rp.status
         with st.container():
             st.markdown("---")
             top = st.columns([5,1])
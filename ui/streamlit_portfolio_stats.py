@@ -7,7 +7,8 @@ def _skeleton_card():
     c.caption("loading…")
     return c
 
-def render_portfolio_stats(metrics, projects, periods, is_loading=False):
+def render_portfolio_stats(metrics, projects=(), periods=(), is_loading=False):
+    """Four KPI cards; counts come from `metrics` when the caller aggregated them in SQL."""
     if is_loading:
         cols = st.columns(4)
         for i in range(4):
@@ -17,14 +18,19 @@ def render_portfolio_stats(metrics, projects, periods, is_loading=False):
 
     total_planned = metrics.get("totalPlanned", 0.0)
     total_actual  = metrics.get("totalActual", 0.0)
+    currency      = metrics.get("currency", "USD")
     # support enum or string statuses
     def sv(x): return x.value if hasattr(x, "value") else x
-    active_projects = sum(1 for p in projects if sv(getattr(p, "status", "")) == "in_progress")
-    open_periods    = sum(1 for rp in periods if sv(getattr(rp, "status", "")) == "open")
+    active_projects = metrics.get("activeProjects")
+    if active_projects is None:
+        active_projects = sum(1 for p in projects if sv(getattr(p, "status", "")) == "in_progress")
+    open_periods = metrics.get("openPeriods")
+    if open_periods is None:
+        open_periods = sum(1 for rp in periods if sv(getattr(rp, "status", "")) == "open")
 
     cards = [
-        ("Total Planned Budget", f"${total_planned:,.0f}"),
-        ("Total Actual Spend",   f"${total_actual:,.0f}"),
+        ("Total Planned Budget", f"{currency} {total_planned:,.0f}"),
+        ("Total Actual Spend",   f"{currency} {total_actual:,.0f}"),
         ("Active Projects",      f"{active_projects}"),
         ("Open Reporting Periods", f"{open_periods}")
     ]
@@ -38,3 +44,7 @@ def render_portfolio_stats(metrics, projects, periods, is_loading=False):
                 f"<span style='font-size:26px; font-weight:700'>{value}</span>",
                 unsafe_allow_html=True
             )
+    if metrics.get("unconverted"):
+        st.error("No exchange rate in fx_rates.csv, so these budget lines are not in the totals: "
+                 + "; ".join(f"{cur} {planned:,.0f} planned / {actual:,.0f} actual"
+                             for cur, planned, actual in metrics["unconverted"]))